@@ -0,0 +1,209 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, NamedTuple, Sequence
+
+from pyrogram.errors import FloodWait, MessageIdInvalid, ReactionInvalid, RPCError
+from pyrogram.raw.functions.messages import SendReaction
+from pyrogram.raw.types import InputPeerChannel, InputPeerUser
+from pyrogram.types import Chat, Message, MessageReactions, Reaction, User
+
+import src.constants
+from benchmarks.stub_client import StubNetwork, make_chat, make_message, make_user
+
+# returns a latency in seconds drawn with a given random generator
+Latency = Callable[[random.Random], float]
+
+
+def constant(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """
+    Returns a long-tailed latency, the way network round-trips are distributed
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class Fault(NamedTuple):
+    """
+    Makes `rate` of the requests of a method fail with an error,
+    `value` is the number of seconds to wait for FloodWait
+    """
+
+    method: str
+    error: type[RPCError]
+    rate: float
+    value: int = 0
+
+
+class FakeBackend(StubNetwork):
+    """
+    Stands in for Telegram with latency distributions, injected faults
+    and reaction state of each posted message
+
+    A FloodWait blocks the method for `value` seconds, as Telegram does
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        *,
+        latency: Latency = constant(0.0),
+        latencies: dict[str, Latency] | None = None,
+        faults: Sequence[Fault] = (),
+        chat_emoticons: dict[int, str | Sequence[str] | None] | None = None,
+        is_premium: bool = True,
+        seed: int = 0,
+    ) -> None:
+        super().__init__()
+        self.default_latency: Latency = latency
+        self.latencies: dict[str, Latency] = latencies or {}
+        self.faults: dict[str, list[Fault]] = {}
+        for fault in faults:
+            self.faults.setdefault(fault.method, []).append(fault)
+        self.chat_emoticons: dict[int, str | Sequence[str] | None] = (
+            chat_emoticons or {}
+        )
+        self.is_premium: bool = is_premium
+        self.rng: random.Random = random.Random(seed)  # nosec
+        self.flood_deadlines: dict[str, float] = {}
+        self.errors: Counter = Counter()
+        # posted messages, reaction counts and own reactions per (chat id, message id)
+        self.messages: dict[tuple[int, int], Message] = {}
+        self.reaction_counts: dict[tuple[int, int], Counter] = {}
+        self.chosen: dict[tuple[int, int], tuple[str, ...]] = {}
+
+    def install(self, custom_client: Any) -> None:
+        super().install(custom_client=custom_client)
+        custom_client.get_me = self.get_me
+        return None
+
+    def post(self, message: Message) -> None:
+        """
+        Makes a message known to the backend, as if it was sent to its chat
+        """
+        key: tuple[int, int] = (message.chat.id, message.id)
+        self.messages[key] = message
+        self.reaction_counts[key] = Counter(
+            {
+                reaction.emoji: reaction.count or 1
+                for reaction in getattr(message.reactions, "reactions", None) or ()
+                if reaction.emoji
+            }
+        )
+        return None
+
+    async def _request(self, method_name: str) -> None:
+        self.calls[method_name] += 1
+        latency: Latency = self.latencies.get(method_name, self.default_latency)
+        delay: float = latency(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        remaining: float = self.flood_deadlines.get(method_name, 0.0) - time.monotonic()
+        if remaining > 0:
+            self._fail(method_name, FloodWait(value=math.ceil(remaining)))
+
+        for fault in self.faults.get(method_name, ()):
+            if self.rng.random() >= fault.rate:
+                continue
+            if fault.error is FloodWait:
+                self.flood_deadlines[method_name] = time.monotonic() + fault.value
+                self._fail(method_name, FloodWait(value=fault.value))
+            self._fail(method_name, fault.error())
+        return None
+
+    def _fail(self, method_name: str, error: RPCError) -> None:
+        self.errors[f"{method_name}:{type(error).__name__}"] += 1
+        raise error
+
+    async def get_me(self) -> User:
+        await self._request("GetMe")
+        user: User = make_user(user_id=1)
+        user.is_premium = self.is_premium
+        return user
+
+    async def get_chat(self, chat_id: int) -> Chat:
+        await self._request("GetChat")
+        return make_chat(
+            chat_id=chat_id,
+            emoticons=self.chat_emoticons.get(chat_id, src.constants.VALID_EMOTICONS),
+        )
+
+    async def get_messages(
+        self, chat_id: int, message_ids: int | list[int]
+    ) -> Message | list[Message]:
+        """
+        Returns fresh copies of posted messages, unknown ones come back empty
+        """
+        await self._request("GetMessages")
+        if isinstance(message_ids, list):
+            return [
+                self._fresh_message(chat_id=chat_id, message_id=message_id)
+                for message_id in message_ids
+            ]
+        return self._fresh_message(chat_id=chat_id, message_id=message_ids)
+
+    def _fresh_message(self, chat_id: int, message_id: int) -> Message:
+        key: tuple[int, int] = (chat_id, message_id)
+        message: Message | None = self.messages.get(key, None)
+        if message is None:
+            return Message(id=message_id, empty=True)
+
+        fresh_message: Message = make_message(
+            chat_id=chat_id, message_id=message_id, sender_id=message.from_user.id
+        )
+        fresh_message.reactions = MessageReactions(  # type: ignore
+            reactions=[
+                Reaction(emoji=emoticon, count=count)
+                for emoticon, count in self.reaction_counts[key].items()
+            ]
+        )
+        return fresh_message
+
+    async def invoke(self, query: Any) -> None:
+        await self._request(type(query).__name__)
+        if isinstance(query, SendReaction):
+            self._send_reaction(query=query)
+        return None
+
+    def _send_reaction(self, query: SendReaction) -> None:
+        """
+        Replaces own reactions on a message, as Telegram does
+        """
+        chat_id: int = self._chat_id_from_peer(peer=query.peer)
+        key: tuple[int, int] = (chat_id, query.msg_id)
+        if key not in self.messages:
+            self._fail("SendReaction", MessageIdInvalid())
+
+        emoticons: tuple[str, ...] = tuple(
+            getattr(reaction, "emoticon", "") for reaction in query.reaction or ()
+        )
+        allowed: str | Sequence[str] | None = self.chat_emoticons.get(
+            chat_id, src.constants.VALID_EMOTICONS
+        )
+        if allowed != "all" and not set(emoticons) <= set(allowed or ()):
+            self._fail("SendReaction", ReactionInvalid())
+
+        counts: Counter = self.reaction_counts[key]
+        counts.subtract(self.chosen.get(key, ()))
+        counts.update(emoticons)
+        self.reaction_counts[key] = +counts
+        self.chosen[key] = emoticons
+        return None
+
+    @staticmethod
+    def _chat_id_from_peer(peer: Any) -> int:
+        if isinstance(peer, InputPeerChannel):
+            return -peer.channel_id
+        if isinstance(peer, InputPeerUser):
+            return peer.user_id
+        return 0
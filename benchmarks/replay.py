@@ -0,0 +1,347 @@
+"""
+Replays a stream recorded with `record_file` through MessageEmojiManager offline
+
+    python -m benchmarks.replay logs/stream.jsonl --speed 10 --rate-limit 5
+
+Requests are answered with the recorded outcomes: latencies, FloodWaits and errors.
+At `--speed` N the message gaps, latencies, waits and the update interval are
+divided by N and the rate limits are multiplied by N, reported latencies are
+scaled back to the recorded time
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from functools import partial
+from pathlib import Path
+from typing import Any, Sequence
+
+import pyrogram.errors
+from loguru import logger
+from pyrogram.errors import FloodWait
+from pyrogram.types import Chat, Message
+
+import src.constants
+from benchmarks.run import latency_stats, write_report
+from benchmarks.stub_client import StubNetwork, make_chat, make_message
+from src.custom_client import CustomClient
+from src.deferred_queue import DeferredQueue
+from src.message_emoji_manager import MessageEmojiManager
+from src.rate_limiter import RateLimiter
+from src.user_settings import UserSettings
+
+
+class Recording:
+    """
+    Messages, request outcomes and chat reactions read from a recorded stream
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+        self.responses: dict[str, deque[dict]] = {}
+        self.chat_emoticons: dict[int, str | list[str] | None] = {}
+        self.statuses: dict[int, src.constants.FriendshipStatus] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Recording":
+        recording: Recording = cls()
+        with open(path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    recording.add(record=json.loads(line))
+        return recording
+
+    def add(self, record: dict) -> None:
+        if record["type"] == "message":
+            self.messages.append(record)
+            if record["status"] is not None:
+                self.statuses[record["sender"]] = src.constants.FriendshipStatus(
+                    record["status"]
+                )
+            self.chat_emoticons.setdefault(record["chat"], "all")
+        elif record["type"] == "rpc":
+            self.responses.setdefault(record["method"], deque()).append(record)
+            if "reactions" in record:
+                self.chat_emoticons[record["chat"]] = record["reactions"]
+        return None
+
+    @property
+    def duration(self) -> float:
+        return self.messages[-1]["t"] - self.messages[0]["t"] if self.messages else 0.0
+
+
+class ReplayNetwork(StubNetwork):
+    """
+    Answers requests with recorded outcomes in the recorded order,
+    the requests beyond the recording succeed at once
+    """
+
+    def __init__(self, recording: Recording, speed: float) -> None:
+        super().__init__()
+        self.speed: float = speed
+        self.responses: dict[str, deque[dict]] = {
+            method: deque(responses)
+            for method, responses in recording.responses.items()
+        }
+        self.chat_emoticons: dict[int, str | list[str] | None] = (
+            recording.chat_emoticons
+        )
+        self.messages: dict[tuple[int, int], Message] = {}
+        self.outcomes: Counter = Counter()
+
+    async def _request(self, method_name: str) -> None:
+        self.calls[method_name] += 1
+        responses: deque[dict] | None = self.responses.get(method_name, None)
+        response: dict = responses.popleft() if responses else {"outcome": "ok"}
+        self.outcomes[f"{method_name}:{response['outcome']}"] += 1
+        if response.get("latency"):
+            await asyncio.sleep(response["latency"] / self.speed)
+
+        if response["outcome"] == "FloodWait":
+            flood_wait: FloodWait = FloodWait(value=response["value"])
+            # FloodWait keeps whole seconds only
+            flood_wait.value = response["value"] / self.speed
+            raise flood_wait
+
+        error: Any = getattr(pyrogram.errors, response["outcome"], None)
+        if isinstance(error, type) and issubclass(error, pyrogram.errors.RPCError):
+            raise error()
+        return None
+
+    async def get_chat(self, chat_id: int) -> Chat:
+        await self._request("GetChat")
+        return make_chat(
+            chat_id=chat_id, emoticons=self.chat_emoticons.get(chat_id, "all")
+        )
+
+    async def get_messages(
+        self, chat_id: int, message_ids: int | list[int]
+    ) -> Message | list[Message]:
+        await self._request("GetMessages")
+        if isinstance(message_ids, list):
+            return [self._message(chat_id, message_id) for message_id in message_ids]
+        return self._message(chat_id, message_ids)
+
+    def _message(self, chat_id: int, message_id: int) -> Message:
+        return self.messages.get((chat_id, message_id), None) or make_message(
+            chat_id=chat_id, message_id=message_id, sender_id=1
+        )
+
+
+def make_replay_settings(
+    recording: Recording, args: argparse.Namespace
+) -> UserSettings:
+    """
+    Returns settings with the recorded chats and targets and the tuned limits
+    """
+    return UserSettings(
+        api_id=1,
+        api_hash="0" * 32,
+        msg_queue_size=args.msg_queue_size,
+        update_timeout=args.update_timeout,
+        update_jitter=0,
+        update_batch_size=args.update_batch_size,
+        chats_allowed={
+            chat_id: f"Chat {chat_id}"
+            for chat_id in recording.chat_emoticons
+            if chat_id < 0
+        },
+        targets={
+            user_id: (f"Target {user_id}", status)
+            for user_id, status in recording.statuses.items()
+        }
+        or {0: ("Nobody", src.constants.FriendshipStatus.ENEMY)},
+        emoticons_for_enemies=("🤡", "💩", "🖕", "🤮"),
+        emoticons_for_friends=("👍", "❤", "🔥", "🫡"),
+        sender_concurrency=args.sender_concurrency,
+        snapshot_interval=0,
+        warmup_concurrency=0,
+        rate_limit=args.rate_limit,
+        rate_limit_per_chat=args.rate_limit_per_chat,
+        rate_limit_burst=args.rate_limit_burst,
+        deferred_queue_size=args.deferred_queue_size,
+        deferred_max_age=args.deferred_max_age,
+    )
+
+
+def speed_up(custom_client: CustomClient, speed: float) -> None:
+    """
+    Replaces time-dependent parts of a client with ones running `speed` times faster
+    """
+    user_settings: UserSettings = custom_client.user_settings
+    custom_client.rate_limiter = RateLimiter(
+        rate=user_settings.rate_limit * speed,
+        chat_rate=user_settings.rate_limit_per_chat * speed,
+        burst=user_settings.rate_limit_burst,
+        recovery_time=600 / speed,
+        max_chats=user_settings.chat_cache_size,
+    )
+    custom_client.deferred_queue = DeferredQueue(
+        max_size=user_settings.deferred_queue_size,
+        max_age=user_settings.deferred_max_age / speed,
+    )
+    return None
+
+
+async def drain(deferred_queue: DeferredQueue, interval: float = 0.01) -> None:
+    """
+    Waits until parked items are resumed, for at most `max_age`
+    as older items are dropped anyway
+    """
+    deadline: float = time.monotonic() + deferred_queue.max_age
+    while len(deferred_queue) and time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+    return None
+
+
+def to_message(record: dict) -> Message:
+    return make_message(
+        chat_id=record["chat"],
+        message_id=record["message"],
+        sender_id=record["sender"],
+        reactions=record["reactions"],
+    )
+
+
+async def replay(recording: Recording, args: argparse.Namespace) -> dict:
+    """
+    Feeds recorded messages at the recorded pace and runs updates on schedule
+    """
+    speed: float = args.speed
+    manager: MessageEmojiManager = MessageEmojiManager()
+    custom_client: CustomClient = CustomClient(
+        name="replay", user_settings=make_replay_settings(recording, args)
+    )
+    network: ReplayNetwork = ReplayNetwork(recording=recording, speed=speed)
+    network.install(custom_client=custom_client)
+    speed_up(custom_client=custom_client, speed=speed)
+
+    respond_latencies: list[float] = []
+    update_latencies: list[float] = []
+
+    async def respond(message: Message) -> None:
+        started_at: float = time.perf_counter()
+        await manager.respond(custom_client=custom_client, message=message)
+        respond_latencies.append((time.perf_counter() - started_at) * speed)
+        return None
+
+    async def update_periodically() -> None:
+        while True:
+            await asyncio.sleep(custom_client.user_settings.update_timeout / speed)
+            started_at: float = time.perf_counter()
+            await manager.update(custom_client=custom_client)
+            update_latencies.append((time.perf_counter() - started_at) * speed)
+
+    custom_client.reaction_sender.start(
+        handler=partial(manager.send_response, custom_client)
+    )
+    custom_client.deferred_queue.start(
+        resume=partial(manager.resume_response, custom_client)
+    )
+    updater: asyncio.Task = asyncio.create_task(update_periodically())
+    handlers: list[asyncio.Task] = []
+    started_at: float = time.perf_counter()
+    first_at: float = recording.messages[0]["t"] if recording.messages else 0.0
+    for record in recording.messages:
+        message: Message = to_message(record=record)
+        network.messages[(record["chat"], record["message"])] = message
+        delay: float = (
+            started_at + (record["t"] - first_at) / speed - time.perf_counter()
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # pyrogram runs handlers concurrently as well
+        handlers.append(asyncio.create_task(respond(message=message)))
+    await asyncio.gather(*handlers)
+    await custom_client.reaction_sender.stop()
+    # reactions parked by FloodWait are resumed and sent inline after the sender
+    await drain(deferred_queue=custom_client.deferred_queue)
+    await custom_client.deferred_queue.stop()
+    updater.cancel()
+    await asyncio.gather(updater, return_exceptions=True)
+    elapsed: float = time.perf_counter() - started_at
+
+    return {
+        "messages": len(recording.messages),
+        "recorded_seconds": round(recording.duration, 3),
+        "replayed_seconds": round(elapsed, 3),
+        "respond": latency_stats(respond_latencies, elapsed=elapsed * speed),
+        "update": latency_stats(update_latencies, elapsed=elapsed * speed),
+        "requests": dict(network.calls),
+        "outcomes": dict(network.outcomes),
+        "cache_hit_rate": {
+            "chat_info_map": round(custom_client.chat_info_map.hit_rate, 3),
+            "chat_peer_map": round(custom_client.chat_peer_map.hit_rate, 3),
+            "msg_store": round(custom_client.msg_store.hit_rate, 3),
+        },
+        "reaction_sender": {
+            "processed": custom_client.reaction_sender.processed,
+            "dropped": custom_client.reaction_sender.dropped,
+            "latency_avg_s": round(
+                custom_client.reaction_sender.latency_avg * speed, 3
+            ),
+            "latency_max_s": round(
+                custom_client.reaction_sender.latency_max * speed, 3
+            ),
+        },
+        "deferred_queue": {
+            "parked": custom_client.deferred_queue.parked,
+            "resumed": custom_client.deferred_queue.resumed,
+            "dropped": custom_client.deferred_queue.dropped,
+        },
+        "rate_limiter_delays": custom_client.rate_limiter.delays,
+    }
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    defaults: dict[str, Any] = {
+        name: field.default for name, field in UserSettings.model_fields.items()
+    }
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Replay a recorded stream with recorded request outcomes"
+    )
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--msg-queue-size", type=int, default=100)
+    parser.add_argument("--update-timeout", type=int, default=30)
+    parser.add_argument("--update-batch-size", type=int, default=1)
+    for name in (
+        "rate_limit",
+        "rate_limit_per_chat",
+        "deferred_max_age",
+    ):
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=float, default=defaults[name]
+        )
+    for name in (
+        "rate_limit_burst",
+        "sender_concurrency",
+        "deferred_queue_size",
+    ):
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=int, default=defaults[name]
+        )
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args(argv)
+
+
+async def main(argv: Sequence[str] | None = None) -> Path:
+    args: argparse.Namespace = parse_args(argv)
+    # per-reaction log lines would dominate the measurements
+    logger.remove()
+
+    recording: Recording = Recording.load(path=args.recording)
+    result: dict = await replay(recording=recording, args=args)
+    print(
+        f"{result['messages']} messages in {result['replayed_seconds']} s: "
+        f"respond p99 {result['respond'].get('p99_us')} us, "
+        f"requests {result['requests']}"
+    )
+
+    return write_report(name="replay", args=args, results=result)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    asyncio.run(main())
@@ -0,0 +1,348 @@
+"""
+Benchmarks MessageEmojiManager hot paths against a fake Telegram backend
+
+    python -m benchmarks.run --chats 1 100 --targets 1 100 --hit-ratios 1 0.5
+    python -m benchmarks.run --latency 0.05 --floodwait-rate 0.01
+
+Results are written as JSON to benchmarks/results/ to compare runs
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import subprocess  # nosec
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from statistics import quantiles
+from typing import Any, Awaitable, Callable, Sequence
+
+from loguru import logger
+from pyrogram.errors import FloodWait, MessageIdInvalid, ReactionInvalid
+
+from benchmarks.fake_backend import FakeBackend, Fault, constant, lognormal
+from benchmarks.stub_client import make_settings, make_stream
+from src.custom_client import CustomClient
+from src.message_emoji_manager import MessageEmojiManager
+from src.user_settings import UserSettings
+
+RESULTS_DIR: Path = Path(__file__).parent / "results"
+
+
+class Scenario:
+    """
+    A synthetic workload: chat and target counts, queue size and cache hit ratio
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        chats: int,
+        targets: int,
+        msg_queue_size: int,
+        hit_ratio: float,
+        messages: int,
+        target_ratio: float,
+        latency: float,
+        seed: int,
+        faults: Sequence[Fault] = (),
+    ) -> None:
+        self.chats: int = chats
+        self.targets: int = targets
+        self.msg_queue_size: int = msg_queue_size
+        self.hit_ratio: float = hit_ratio
+        self.messages: int = messages
+        self.target_ratio: float = target_ratio
+        self.latency: float = latency
+        self.seed: int = seed
+        self.faults: Sequence[Fault] = faults
+
+    def to_dict(self) -> dict:
+        scenario: dict = dict(vars(self))
+        scenario["faults"] = [
+            {"method": fault.method, "error": fault.error.__name__, "rate": fault.rate}
+            for fault in self.faults
+        ]
+        return scenario
+
+    def client(self) -> tuple[CustomClient, FakeBackend]:
+        """
+        Returns a fresh client talking to a fake backend for the scenario,
+        latencies are log-normal around `latency` seconds
+        """
+        user_settings: UserSettings = make_settings(
+            chats=self.chats,
+            targets=self.targets,
+            msg_queue_size=self.msg_queue_size,
+        )
+        custom_client: CustomClient = CustomClient(
+            name="benchmark", user_settings=user_settings
+        )
+        fake_backend: FakeBackend = FakeBackend(
+            latency=(
+                lognormal(median=self.latency, sigma=0.5)
+                if self.latency
+                else constant(0.0)
+            ),
+            faults=self.faults,
+            seed=self.seed,
+        )
+        fake_backend.install(custom_client=custom_client)
+        return custom_client, fake_backend
+
+
+def latency_stats(latencies: Sequence[float], elapsed: float) -> dict:
+    """
+    Returns throughput and latency percentiles in microseconds
+    """
+    if len(latencies) < 2:
+        return {"ops": len(latencies), "ops_per_s": 0.0}
+
+    percentiles: list[float] = quantiles(latencies, n=100, method="inclusive")
+    return {
+        "ops": len(latencies),
+        "ops_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_us": round(percentiles[49] * 1e6, 2),
+        "p90_us": round(percentiles[89] * 1e6, 2),
+        "p99_us": round(percentiles[98] * 1e6, 2),
+        "max_us": round(max(latencies) * 1e6, 2),
+    }
+
+
+async def measure(func: Callable[[Any], Awaitable[None]], items: Sequence[Any]) -> dict:
+    """
+    Awaits a function for each item and returns its latency stats
+    """
+    latencies: list[float] = []
+    started_at: float = time.perf_counter()
+    for item in items:
+        item_started_at: float = time.perf_counter()
+        await func(item)
+        latencies.append(time.perf_counter() - item_started_at)
+    return latency_stats(latencies, elapsed=time.perf_counter() - started_at)
+
+
+async def measure_allocations(
+    func: Callable[[Any], Awaitable[None]], items: Sequence[Any]
+) -> dict:
+    """
+    Returns memory allocated while awaiting a function for each item
+    """
+    tracemalloc.start()
+    try:
+        before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        for item in items:
+            await func(item)
+        after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats: list[tracemalloc.StatisticDiff] = after.compare_to(before, "filename")
+    return {
+        "allocated_kib_per_op": round(
+            sum(max(stat.size_diff, 0) for stat in stats) / 1024 / len(items), 3
+        ),
+        "blocks_per_op": round(
+            sum(max(stat.count_diff, 0) for stat in stats) / len(items), 3
+        ),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def measure_sync(func: Callable[[], Any], repeat: int) -> dict:
+    """
+    Calls a function `repeat` times and returns the mean time of a call
+    """
+    started_at: float = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed: float = time.perf_counter() - started_at
+    return {"ops": repeat, "mean_ns": round(elapsed / repeat * 1e9, 1)}
+
+
+async def run_scenario(scenario: Scenario) -> dict:
+    """
+    Runs respond, update and the helper benchmarks of a scenario
+    """
+    manager: MessageEmojiManager = MessageEmojiManager()
+    custom_client, fake_backend = scenario.client()
+    messages = make_stream(
+        user_settings=custom_client.user_settings,
+        size=scenario.messages,
+        target_ratio=scenario.target_ratio,
+        seed=scenario.seed,
+    )
+    rng: random.Random = random.Random(scenario.seed)  # nosec
+
+    async def respond(message: Any) -> None:
+        # a miss makes the chat info and the peer to be requested again
+        if rng.random() >= scenario.hit_ratio:
+            custom_client.forget_chat(chat_id=message.chat.id)
+            custom_client.chat_peer_map.pop(message.chat.id, None)
+        fake_backend.post(message=message)
+        await manager.respond(custom_client=custom_client, message=message)
+        return None
+
+    async def update(_: Any) -> None:
+        await manager.update(custom_client=custom_client)
+        return None
+
+    result: dict = {"scenario": scenario.to_dict()}
+    result["respond"] = await measure(respond, messages)
+    result["update"] = await measure(update, range(scenario.messages))
+    result["requests"] = dict(fake_backend.calls)
+    result["errors"] = dict(fake_backend.errors)
+    result["cache_hit_rate"] = {
+        "chat_info_map": round(custom_client.chat_info_map.hit_rate, 3),
+        "chat_peer_map": round(custom_client.chat_peer_map.hit_rate, 3),
+        "msg_store": round(custom_client.msg_store.hit_rate, 3),
+    }
+
+    allocation_items: Sequence[Any] = messages[: min(len(messages), 1000)]
+    result["respond_allocations"] = await measure_allocations(respond, allocation_items)
+
+    chat_id: int = messages[0].chat.id
+    target_id: int = next(iter(custom_client.user_settings.targets))
+    emoticons_allowed: Sequence[str] = manager._chat_emoticons_from_chat_id(
+        custom_client=custom_client, chat_id=chat_id
+    )
+    repeat: int = max(scenario.messages, 1000)
+    result["get_response_emoticons"] = measure_sync(
+        lambda: manager._get_response_emoticons(
+            custom_client=custom_client,
+            chat_id=chat_id,
+            emoticons_allowed=emoticons_allowed,
+            sender_id=target_id,
+        ),
+        repeat=repeat,
+    )
+    result["chat_emoticons_from_chat_id"] = measure_sync(
+        lambda: manager._chat_emoticons_from_chat_id(
+            custom_client=custom_client, chat_id=chat_id
+        ),
+        repeat=repeat,
+    )
+    result["convert_emoticons_to_emojis"] = measure_sync(
+        lambda: manager._convert_emoticons_to_emojis(emoticons=("👍", "❤", "🔥")),
+        repeat=repeat,
+    )
+    return result
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(  # nosec
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(name: str, args: argparse.Namespace, results: Any) -> Path:
+    """
+    Writes results with the run metadata to `--output` or a new file in RESULTS_DIR
+    """
+    output: Path = args.output or (
+        RESULTS_DIR / f"{name}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report: dict = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: str(value) for key, value in vars(args).items()},
+        },
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results are written to {output}")
+    return output
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Benchmark respond/update against a fake Telegram backend"
+    )
+    parser.add_argument("--chats", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--targets", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--msg-queue-sizes", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--hit-ratios", type=float, nargs="+", default=[1.0, 0.5])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--target-ratio", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--floodwait-rate", type=float, default=0.0)
+    parser.add_argument("--floodwait-seconds", type=int, default=5)
+    parser.add_argument("--reaction-invalid-rate", type=float, default=0.0)
+    parser.add_argument("--message-id-invalid-rate", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args(argv)
+
+
+async def main(argv: Sequence[str] | None = None) -> Path:
+    args: argparse.Namespace = parse_args(argv)
+    # per-reaction log lines would dominate the measurements
+    logger.remove()
+
+    faults: list[Fault] = [
+        fault
+        for fault in (
+            Fault(
+                method="SendReaction",
+                error=FloodWait,
+                rate=args.floodwait_rate,
+                value=args.floodwait_seconds,
+            ),
+            Fault(
+                method="SendReaction",
+                error=ReactionInvalid,
+                rate=args.reaction_invalid_rate,
+            ),
+            Fault(
+                method="SendReaction",
+                error=MessageIdInvalid,
+                rate=args.message_id_invalid_rate,
+            ),
+        )
+        if fault.rate
+    ]
+    results: list[dict] = []
+    for chats, targets, msg_queue_size, hit_ratio in itertools.product(
+        args.chats, args.targets, args.msg_queue_sizes, args.hit_ratios
+    ):
+        scenario: Scenario = Scenario(
+            chats=chats,
+            targets=targets,
+            msg_queue_size=msg_queue_size,
+            hit_ratio=hit_ratio,
+            messages=args.messages,
+            target_ratio=args.target_ratio,
+            latency=args.latency,
+            seed=args.seed,
+            faults=faults,
+        )
+        result: dict = await run_scenario(scenario=scenario)
+        results.append(result)
+        print(
+            f"chats={chats} targets={targets} msg_queue_size={msg_queue_size} "
+            f"hit_ratio={hit_ratio}: "
+            f"respond {result['respond'].get('ops_per_s')} msg/s "
+            f"p99 {result['respond'].get('p99_us')} us, "
+            f"update {result['update'].get('ops_per_s')} op/s"
+        )
+
+    return write_report(name="bench", args=args, results=results)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Any, Sequence
+
+from pyrogram.enums import ChatType
+from pyrogram.raw.types import InputPeerChannel, InputPeerUser
+from pyrogram.types import (
+    Chat,
+    ChatReactions,
+    Message,
+    MessageReactions,
+    Reaction,
+    User,
+)
+
+import src.constants
+from src.custom_client import CustomClient
+from src.user_settings import UserSettings
+
+
+class StubNetwork:
+    """
+    Replaces the Telegram requests of a client with local stubs
+
+    Every request takes `latency` seconds and is counted by its method name
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency: float = latency
+        self.calls: Counter = Counter()
+
+    def install(self, custom_client: CustomClient) -> None:
+        """
+        Patches network methods of a given client
+        """
+        custom_client.get_chat = self.get_chat  # type: ignore
+        custom_client.resolve_peer = self.resolve_peer  # type: ignore
+        custom_client.invoke = self.invoke  # type: ignore
+        custom_client.get_messages = self.get_messages  # type: ignore
+        custom_client.get_users = self.get_users  # type: ignore
+        custom_client.is_premium = True
+        custom_client.emoticon_picker = custom_client._sample
+        return None
+
+    async def _request(self, method_name: str) -> None:
+        self.calls[method_name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return None
+
+    async def get_chat(self, chat_id: int) -> Chat:
+        await self._request("GetChat")
+        return make_chat(chat_id=chat_id)
+
+    async def resolve_peer(self, peer_id: int) -> Any:
+        await self._request("ResolvePeer")
+        if peer_id > 0:
+            return InputPeerUser(user_id=peer_id, access_hash=0)
+        return InputPeerChannel(channel_id=-peer_id, access_hash=0)
+
+    async def invoke(self, query: Any) -> None:
+        await self._request(type(query).__name__)
+        return None
+
+    async def get_messages(
+        self, chat_id: int, message_ids: int | list[int]
+    ) -> Message | list[Message]:
+        await self._request("GetMessages")
+        if isinstance(message_ids, list):
+            return [
+                make_message(chat_id=chat_id, message_id=message_id, sender_id=1)
+                for message_id in message_ids
+            ]
+        return make_message(chat_id=chat_id, message_id=message_ids, sender_id=1)
+
+    async def get_users(self, user_ids: Sequence[int]) -> list[User]:
+        await self._request("GetUsers")
+        return [make_user(user_id=user_id) for user_id in user_ids]
+
+
+def make_settings(chats: int, targets: int, msg_queue_size: int) -> UserSettings:
+    """
+    Returns settings with a given number of allowed chats and targets,
+    the limits are lifted, so the stubs are measured and not the rate limiter
+    """
+    friendship_statuses: tuple[src.constants.FriendshipStatus, ...] = (
+        src.constants.FriendshipStatus.ENEMY,
+        src.constants.FriendshipStatus.FRIEND,
+    )
+    return UserSettings(
+        api_id=1,
+        api_hash="0" * 32,
+        msg_queue_size=msg_queue_size,
+        update_timeout=5,
+        update_jitter=0,
+        chats_allowed={-(1000 + i): f"Chat {i}" for i in range(chats)},
+        # odd targets are friends, even ones are enemies
+        targets={
+            user_id: (f"Target {user_id}", friendship_statuses[user_id % 2])
+            for user_id in range(1, targets + 1)
+        },
+        emoticons_for_enemies=("🤡", "💩", "🖕", "🤮"),
+        emoticons_for_friends=("👍", "❤", "🔥", "🫡"),
+        sender_concurrency=0,
+        snapshot_interval=0,
+        warmup_concurrency=0,
+        rate_limit=1e9,
+        rate_limit_per_chat=1e9,
+        rate_limit_burst=1_000_000,
+    )
+
+
+def make_user(user_id: int) -> User:
+    return User(id=user_id, first_name=f"User {user_id}")
+
+
+def make_chat(
+    chat_id: int,
+    emoticons: str | Sequence[str] | None = src.constants.VALID_EMOTICONS,
+) -> Chat:
+    """
+    Returns a supergroup with given reactions: "all", a list or None if disabled
+    """
+    available_reactions: ChatReactions | None = None
+    if emoticons == "all":
+        available_reactions = ChatReactions(all_are_enabled=True)
+    elif emoticons is not None:
+        available_reactions = ChatReactions(
+            reactions=[Reaction(emoji=emoticon) for emoticon in emoticons]
+        )
+    # pyrogram annotates optional attributes as required ones
+    chat_kwargs: dict = {
+        "id": chat_id,
+        "type": ChatType.SUPERGROUP,
+        "title": f"Chat {chat_id}",
+        "username": f"chat{-chat_id}",
+        "available_reactions": available_reactions,
+    }
+    return Chat(**chat_kwargs)
+
+
+def make_message(
+    chat_id: int,
+    message_id: int,
+    sender_id: int,
+    reactions: Sequence[str] = ("🤡",),
+) -> Message:
+    # pyrogram annotates optional attributes as required ones
+    message_kwargs: dict = {
+        "id": message_id,
+        "chat": make_chat(chat_id=chat_id),
+        "from_user": make_user(user_id=sender_id),
+        "date": datetime.now(),
+        "reactions": MessageReactions(
+            reactions=[Reaction(emoji=emoticon, count=1) for emoticon in reactions]
+        ),
+    }
+    return Message(**message_kwargs)
+
+
+def make_stream(
+    user_settings: UserSettings, size: int, target_ratio: float, seed: int
+) -> list[Message]:
+    """
+    Returns synthetic messages spread over allowed chats,
+    `target_ratio` of them are sent by targets
+    """
+    rng: random.Random = random.Random(seed)  # nosec
+    chat_ids: list[int] = list(user_settings.chats_allowed or {})
+    target_ids: list[int] = list(user_settings.targets)
+    messages: list[Message] = []
+    for message_id in range(1, size + 1):
+        sender_id: int = (
+            rng.choice(target_ids)
+            if rng.random() < target_ratio
+            else 10_000_000 + message_id
+        )
+        messages.append(
+            make_message(
+                chat_id=rng.choice(chat_ids),
+                message_id=message_id,
+                sender_id=sender_id,
+            )
+        )
+    return messages
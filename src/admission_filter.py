@@ -0,0 +1,66 @@
+from pyrogram import Client
+from pyrogram.filters import Filter
+from pyrogram.raw.types import UpdateChannel, UpdateChat, UpdateMessageReactions
+from pyrogram.types import Message, Update
+
+from src.user_settings import UserSettings
+
+
+class AdmissionFilter(Filter):
+    """
+    Admits only messages from targets in allowed chats at handler-dispatch time
+    """
+
+    def __init__(self, user_settings: UserSettings) -> None:
+        self.chats_allowed: frozenset[int] = frozenset()
+        self.targets: frozenset[int] = frozenset()
+        self.rebuild(user_settings=user_settings)
+
+    def rebuild(self, user_settings: UserSettings) -> None:
+        """
+        Compiles allow-lists from user settings
+        """
+        self.chats_allowed = frozenset(user_settings.chats_allowed or ())
+        self.targets = frozenset(user_settings.targets)
+        return None
+
+    def admits(self, message: Message) -> bool:
+        """
+        Determines whether the message is from a target in an allowed chat
+        """
+        from_user = getattr(message, "from_user", None)
+        if from_user is None or from_user.id not in self.targets:
+            return False
+
+        chat = getattr(message, "chat", None)
+        if chat is None:
+            return False
+
+        # private chats with targets are always allowed
+        return chat.id > 0 or chat.id in self.chats_allowed
+
+    # async to be checked on the event loop instead of the executor
+    async def __call__(self, client: Client, update: Update) -> bool:
+        return self.admits(message=update)  # type: ignore
+
+
+# pylint: disable=R0903
+class ChatUpdateFilter(Filter):
+    """
+    Admits only raw updates signalling that chat settings (e.g. reactions) changed
+    """
+
+    # async to be checked on the event loop instead of the executor
+    async def __call__(self, client: Client, update: Update) -> bool:
+        # raw handlers pass raw updates despite the annotation
+        return isinstance(update, (UpdateChannel, UpdateChat))
+
+
+# pylint: disable=R0903
+class ReactionUpdateFilter(Filter):
+    """
+    Admits only raw updates with new reactions of a message
+    """
+
+    async def __call__(self, client: Client, update: Update) -> bool:
+        return isinstance(update, UpdateMessageReactions)
@@ -0,0 +1,90 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from src.loggers import logger
+from src.metrics import Metrics
+
+
+def process_age() -> float | None:
+    """
+    Returns seconds since the process started, i.e. the interpreter startup
+    and the imports so far, or None where /proc is not available
+    """
+    try:
+        with open("/proc/self/stat", mode="r", encoding="utf-8") as file:
+            # the command may contain spaces, the fields after it don't
+            fields: list[str] = file.read().rsplit(")", 1)[1].split()
+        # starttime is the 22nd field, in clock ticks since the system boot
+        started_at: float = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return max(time.clock_gettime(time.CLOCK_BOOTTIME) - started_at, 0.0)
+    except (OSError, IndexError, ValueError, AttributeError):
+        return None
+
+
+class BootReport:
+    """
+    Times the boot phases of the app, e.g. config, session, warmup,
+    and reports them once the app is ready
+
+    The phases of several accounts run concurrently,
+    the slowest account is reported for each phase
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.perf_counter) -> None:
+        self.timer: Callable[[], float] = timer
+        self.started_at: float = timer()
+        # phase -> seconds in the order the phases started
+        self.phases: dict[str, float] = {}
+        self.ready_in: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = max(self.phases.get(name, 0.0), seconds)
+        return None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as a boot phase
+        """
+        self.phases.setdefault(name, 0.0)
+        started_at: float = self.timer()
+        try:
+            yield
+        finally:
+            self.add(name=name, seconds=self.timer() - started_at)
+
+    def ready(self) -> None:
+        """
+        Logs the startup report, the total includes the imports
+        """
+        self.ready_in = self.phases.get("imports", 0.0) + (
+            self.timer() - self.started_at
+        )
+        logger.success(f"Startup report|{self.format()}")
+        return None
+
+    def format(self) -> str:
+        phases: str = ", ".join(
+            f"{name} {seconds:.3f} s" for name, seconds in self.phases.items()
+        )
+        return f"ready in {self.ready_in or 0.0:.3f} s: {phases}"
+
+    def samples(self) -> list[str]:
+        """
+        Returns the phase durations in Prometheus text format
+        """
+        lines: list[str] = Metrics.format_samples(
+            "boot_phase_seconds",
+            "gauge",
+            {
+                Metrics.labels(phase=name): seconds
+                for name, seconds in self.phases.items()
+            },
+        )
+        if self.ready_in is not None:
+            lines.extend(
+                Metrics.format_samples("boot_seconds", "gauge", {"": self.ready_in})
+            )
+        return lines
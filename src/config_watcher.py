@@ -0,0 +1,203 @@
+import asyncio
+import os
+from typing import Sequence
+
+import yaml
+from pydantic import ValidationError
+
+from src.custom_client import CustomClient
+from src.custom_scheduler import CustomScheduler
+from src.loggers import logger
+from src.metrics import Metrics
+from src.user_settings import UserSettings
+
+
+class ConfigWatcher:
+    """
+    Reloads the config file once it changes and applies the new settings
+    to running clients without a restart
+
+    The file is validated off the event loop, an invalid file is reported
+    and the clients keep their settings. The settings of a client are swapped
+    at once and the structures derived from them are rebuilt in the same step,
+    so handlers never see a half-applied config
+    """
+
+    # the other settings size caches, queues and connections at startup
+    RELOADABLE: frozenset[str] = frozenset(
+        {
+            "targets",
+            "chats_allowed",
+            "emoticons_for_enemies",
+            "emoticons_for_friends",
+            "update_timeout",
+            "update_jitter",
+            "update_batch_size",
+        }
+    )
+
+    def __init__(
+        self,
+        config_file: str,
+        custom_clients: Sequence[CustomClient],
+        accounts: dict[str, UserSettings],
+    ) -> None:
+        self.config_file: str = config_file
+        self.custom_clients: dict[str, CustomClient] = {
+            custom_client.name: custom_client for custom_client in custom_clients
+        }
+        # the settings as they were read, before per-process overrides
+        self.accounts: dict[str, UserSettings] = dict(accounts)
+        self._mtime: int | None = self._stat()
+        self.reloads: int = 0
+        self.failures: int = 0
+
+    def _stat(self) -> int | None:
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+
+    async def check(self) -> bool:
+        """
+        Reloads the config if the file has changed since the last check,
+        returns True if the new settings were applied
+        """
+        mtime: int | None = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        try:
+            accounts: dict[str, UserSettings] = await asyncio.to_thread(
+                UserSettings.accounts_from_config, config_file=self.config_file
+            )
+        except (
+            ValidationError,
+            OSError,
+            yaml.YAMLError,
+            AttributeError,
+            TypeError,
+        ) as e:
+            self.failures += 1
+            self._count(outcome="failed")
+            logger.error(f"Config reload failed, the settings are kept! {e}")
+            return False
+
+        self.reload(accounts=accounts)
+        return True
+
+    def reload(self, accounts: dict[str, UserSettings]) -> None:
+        """
+        Applies validated settings to the clients of their accounts
+        """
+        for name in accounts.keys() - self.accounts.keys():
+            logger.warning(f"Account {name} is added. Restart to run it.")
+        for name, custom_client in self.custom_clients.items():
+            user_settings: UserSettings | None = accounts.get(name, None)
+            if user_settings is None:
+                logger.warning(f"Account {name} is removed. Restart to stop it.")
+                continue
+
+            restart_only: list[str] = [
+                field
+                for field in UserSettings.model_fields.keys() - self.RELOADABLE
+                if getattr(user_settings, field) != getattr(self.accounts[name], field)
+            ]
+            if restart_only:
+                logger.warning(
+                    f"Restart to apply {', '.join(sorted(restart_only))}|{name}"
+                )
+            changed: set[str] = self.apply(
+                custom_client=custom_client, user_settings=user_settings
+            )
+            if changed:
+                logger.success(
+                    f"Settings reloaded: {', '.join(sorted(changed))}|{name}"
+                )
+        self.accounts = dict(accounts)
+        self.reloads += 1
+        self._count(outcome="applied")
+        return None
+
+    @classmethod
+    def apply(
+        cls, custom_client: CustomClient, user_settings: UserSettings
+    ) -> set[str]:
+        """
+        Swaps the reloadable settings of a client and rebuilds what depends on
+        the changed ones, returns the names of the changed settings
+        """
+        old_settings: UserSettings = custom_client.user_settings
+        changed: set[str] = {
+            field
+            for field in cls.RELOADABLE
+            if getattr(user_settings, field) != getattr(old_settings, field)
+        }
+        if not changed:
+            return changed
+
+        new_settings: UserSettings = old_settings.model_copy(
+            update={field: getattr(user_settings, field) for field in changed}
+        )
+        custom_client.user_settings = new_settings
+        if changed & {"targets", "chats_allowed"}:
+            custom_client.admission_filter.rebuild(user_settings=new_settings)
+            custom_client.recorder.targets = new_settings.targets
+            cls._forget_removed(
+                custom_client=custom_client,
+                old_settings=old_settings,
+                new_settings=new_settings,
+            )
+        if changed & {"emoticons_for_enemies", "emoticons_for_friends"}:
+            custom_client.emoticon_index.clear()
+        if changed & {"targets", "emoticons_for_enemies", "emoticons_for_friends"}:
+            # messages skipped for the old emoticons or statuses may be updatable now
+            custom_client.msg_store.reset()
+        if changed & {"update_timeout", "update_jitter"}:
+            cls._reschedule(custom_client=custom_client)
+        return changed
+
+    @staticmethod
+    def _forget_removed(
+        custom_client: CustomClient,
+        old_settings: UserSettings,
+        new_settings: UserSettings,
+    ) -> None:
+        """
+        Forgets remembered messages of removed targets and chats,
+        so updates don't react to them anymore
+        """
+        for sender_id in old_settings.targets.keys() - new_settings.targets.keys():
+            custom_client.msg_store.remove_sender(sender_id=sender_id)
+        for chat_id in set(old_settings.chats_allowed or ()) - set(
+            new_settings.chats_allowed or ()
+        ):
+            # private chats with targets are always allowed
+            if chat_id < 0:
+                custom_client.msg_store.remove_chat(chat_id=chat_id)
+        return None
+
+    @staticmethod
+    def _reschedule(custom_client: CustomClient) -> None:
+        """
+        Replaces the update trigger of a client if its update job is running
+        """
+        if custom_client.scheduler.get_job(job_id=custom_client.name) is None:
+            return None
+
+        custom_client.scheduler.reschedule_job(
+            job_id=custom_client.name,
+            trigger=CustomScheduler.make_trigger(
+                user_settings=custom_client.user_settings
+            ),
+        )
+        return None
+
+    def _count(self, outcome: str) -> None:
+        # the clients may share the registry, one sample per account is enough
+        for custom_client in self.custom_clients.values():
+            custom_client.metrics.inc(
+                "config_reloads_total", labels=Metrics.labels(outcome=outcome)
+            )
+        return None
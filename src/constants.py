@@ -31,9 +31,7 @@ VALID_EMOTICONS = (
     "🥴",
     "😍",
     "🐳",
-    "❤",
-    "‍",
-    "🔥",
+    "❤‍🔥",
     "🌚",
     "🌭",
     "💯",
@@ -53,9 +51,7 @@ VALID_EMOTICONS = (
     "😭",
     "🤓",
     "👻",
-    "👨",
-    "‍",
-    "💻",
+    "👨‍💻",
     "👀",
     "🎃",
     "🙈",
@@ -80,12 +76,8 @@ VALID_EMOTICONS = (
     "🙊",
     "😎",
     "👾",
+    "🤷‍♂",
     "🤷",
-    "‍",
-    "♂",
-    "🤷",
-    "🤷",
-    "‍",
-    "♀",
+    "🤷‍♀",
     "😡",
 )
@@ -1,19 +1,38 @@
 import random
-from collections import deque
 from typing import Callable, Sequence
 
-from cachetools import LRUCache
 from pyrogram import Client
 from pyrogram.types import User
 
+from src.admission_filter import AdmissionFilter
 from src.custom_scheduler import CustomScheduler
+from src.deferred_queue import DeferredQueue
+from src.emoticon_index import EmoticonIndex
+from src.log_summary import LogSummary
+from src.message_store import MessageStore
+from src.metrics import Metrics
+from src.rate_limiter import RateLimiter
+from src.reaction_mirror import ReactionMirror
+from src.reaction_sender import ReactionSender
+from src.single_flight import SingleFlight
+from src.stats_cache import StatsTTLCache
+from src.stream_recorder import StreamRecorder
+from src.tracer import Tracer
 from src.user_settings import UserSettings
 
 
 # pylint: disable=R0901,R0902
 class CustomClient(Client):
+    # pylint: disable=R0913
     def __init__(
-        self, name: str, user_settings: UserSettings, sleep_threshold: int = 10
+        self,
+        name: str,
+        user_settings: UserSettings,
+        sleep_threshold: int = 10,
+        *,
+        chat_info_map: StatsTTLCache | None = None,
+        metrics: Metrics | None = None,
+        scheduler: CustomScheduler | None = None,
     ) -> None:
         self.user_settings: UserSettings = user_settings
         super().__init__(
@@ -22,17 +41,101 @@ class CustomClient(Client):
             api_hash=self.user_settings.api_hash,
             sleep_threshold=sleep_threshold,
         )
-        self.chat_info_map: dict = {}
-        self.chat_emoticons_map: dict = {}
-        self.chat_peer_map: dict = {}
+        self.admission_filter: AdmissionFilter = AdmissionFilter(
+            user_settings=self.user_settings
+        )
+        # the peers are per account, chat info is the same for everyone
+        self.chat_info_map: StatsTTLCache = (
+            chat_info_map if chat_info_map is not None else self._chat_cache()
+        )
+        # clients of the accounts sharing chat info, this one included,
+        # derive their own reaction settings from it
+        self.chat_info_clients: list[CustomClient] = [self]
+        self.chat_emoticons_map: StatsTTLCache = self._chat_cache()
+        self.chat_peer_map: StatsTTLCache = self._chat_cache()
+        # two entries per chat: for friends and for enemies
+        self.emoticon_index: EmoticonIndex = EmoticonIndex(
+            maxsize=2 * self.user_settings.chat_cache_size
+        )
+        self.in_flight: SingleFlight = SingleFlight()
+        # FloodWait deadlines per (RPC method, chat id or None for any chat)
+        self.flood_deadlines: dict[tuple[str, int | None], float] = {}
         self.is_premium: bool | None = None
+        self.log_summary: LogSummary = LogSummary()
         self.emoticon_picker: Callable[[Sequence[str]], Sequence[str]] | None = None
-        self.msg_queue: deque = deque(maxlen=self.user_settings.msg_queue_size)
-        self.msg_keeper: LRUCache = LRUCache(maxsize=self.user_settings.msg_queue_size)
-        self.scheduler: CustomScheduler = CustomScheduler(
+        self.msg_store: MessageStore = MessageStore(
+            maxsize=self.user_settings.msg_queue_size,
+            chat_maxsize=self.user_settings.msg_queue_size_per_chat,
+            sender_maxsize=self.user_settings.msg_queue_size_per_target,
+        )
+        self.reaction_mirror: ReactionMirror = ReactionMirror(
+            maxsize=self.user_settings.msg_queue_size
+        )
+        self.metrics: Metrics = metrics or Metrics()
+        self.tracer: Tracer = Tracer(
+            sample_rate=self.user_settings.trace_sample_rate,
+            path=self.user_settings.trace_file,
+        )
+        self.recorder: StreamRecorder = StreamRecorder(
+            path=self.user_settings.record_file,
+            targets=self.user_settings.targets,
+            message_cache_size=self.user_settings.msg_queue_size,
+        )
+        self.rate_limiter: RateLimiter = RateLimiter(
+            rate=self.user_settings.rate_limit,
+            chat_rate=self.user_settings.rate_limit_per_chat,
+            burst=self.user_settings.rate_limit_burst,
+            max_chats=self.user_settings.chat_cache_size,
+        )
+        self.reaction_sender: ReactionSender = ReactionSender(
+            concurrency=self.user_settings.sender_concurrency,
+            queue_size=self.user_settings.sender_queue_size,
+            metrics=self.metrics,
+        )
+        self.deferred_queue: DeferredQueue = DeferredQueue(
+            max_size=self.user_settings.deferred_queue_size,
+            max_age=self.user_settings.deferred_max_age,
+        )
+        self.scheduler: CustomScheduler = scheduler or CustomScheduler(
             user_settings=self.user_settings
         )
 
+    def _chat_cache(self) -> StatsTTLCache:
+        """
+        Returns a bounded cache for chat metadata
+        """
+        return StatsTTLCache(
+            maxsize=self.user_settings.chat_cache_size,
+            ttl=self.user_settings.chat_cache_ttl,
+        )
+
+    def forget_chat(self, chat_id: int) -> None:
+        """
+        Forgets memoized info of a chat with a given id, the peer stays valid
+        """
+        self.chat_info_map.pop(chat_id, None)
+        self.forget_shared_chat_reactions(chat_id=chat_id)
+        return None
+
+    def forget_shared_chat_reactions(self, chat_id: int) -> None:
+        """
+        Forgets reaction settings of a chat derived from the shared chat info
+        by every account, e.g. when the chat info is replaced
+        """
+        for custom_client in self.chat_info_clients:
+            custom_client.forget_chat_reactions(chat_id=chat_id)
+        return None
+
+    def forget_chat_reactions(self, chat_id: int) -> None:
+        """
+        Forgets memoized reaction settings of a chat with a given id
+        """
+        self.chat_emoticons_map.pop(chat_id, None)
+        self.emoticon_index.invalidate(chat_id)
+        # messages skipped for the old settings may be updatable now
+        self.msg_store.reset_chat(chat_id)
+        return None
+
     async def set_emoticon_picker(self) -> None:
         """
         Depending on the Telegram Premium status selects
@@ -1,3 +1,12 @@
+from collections import Counter
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    JobEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
@@ -7,7 +16,28 @@ from src.user_settings import UserSettings
 class CustomScheduler(AsyncIOScheduler):
     def __init__(self, user_settings: UserSettings, **options):
         super().__init__(**options)
-        self.trigger = IntervalTrigger(
+        self.trigger: IntervalTrigger = self.make_trigger(user_settings=user_settings)
+        # job runs and skips per job id
+        self.runs: Counter = Counter()
+        self.skips: Counter = Counter()
+        self.add_listener(self._count_run, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+        self.add_listener(self._count_skip, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+
+    @staticmethod
+    def make_trigger(user_settings: UserSettings) -> IntervalTrigger:
+        """
+        Returns the update trigger for an account, one scheduler may run
+        the updates of several accounts
+        """
+        return IntervalTrigger(
             seconds=user_settings.update_timeout,
             jitter=user_settings.update_jitter,
         )
+
+    def _count_run(self, event: JobEvent) -> None:
+        self.runs[event.job_id] += 1
+        return None
+
+    def _count_skip(self, event: JobEvent) -> None:
+        self.skips[event.job_id] += 1
+        return None
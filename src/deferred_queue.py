@@ -0,0 +1,115 @@
+import asyncio
+import heapq
+import time
+from itertools import count
+from typing import Any, Callable, Coroutine
+
+from src.loggers import logger
+
+
+# pylint: disable=R0902
+class DeferredQueue:
+    """
+    Parks operations hit by FloodWait until their resume time
+
+    A single timer fires at the earliest resume time and resumes all due items.
+    Items older than `max_age` are dropped instead of being resumed
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_age: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size: int = max_size
+        self.max_age: float = max_age
+        self.timer: Callable[[], float] = timer
+        # (resume_at, insertion order, created_at, item)
+        self._heap: list[tuple[float, int, float, Any]] = []
+        self._order: count = count()
+        self._timer_handle: asyncio.TimerHandle | None = None
+        self._resume: Callable[[Any], Coroutine[Any, Any, None]] | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.parked: int = 0
+        self.resumed: int = 0
+        self.dropped: int = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def is_running(self) -> bool:
+        return self._resume is not None
+
+    def start(self, resume: Callable[[Any], Coroutine[Any, Any, None]]) -> None:
+        """
+        Starts resuming parked items with a given coroutine function
+        """
+        self._resume = resume
+        self._schedule()
+        return None
+
+    async def stop(self) -> None:
+        """
+        Stops the timer, forgets parked items and waits for resumed ones
+        """
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
+            self._timer_handle = None
+        if self._heap:
+            logger.error(f"Deferred operations were dropped at shutdown|{len(self)}")
+        self.dropped += len(self._heap)
+        self._heap.clear()
+        self._resume = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        return None
+
+    def defer(self, item: Any, resume_at: float, created_at: float) -> bool:
+        """
+        Parks an item until a given resume time
+        Returns False if the queue is not running or full and the item is dropped
+        """
+        if not self.is_running or len(self._heap) >= self.max_size:
+            self.dropped += 1
+            return False
+
+        heapq.heappush(self._heap, (resume_at, next(self._order), created_at, item))
+        self.parked += 1
+        # only an item that became the earliest one needs the timer to be moved
+        if self._heap[0][3] is item:
+            self._schedule()
+        return True
+
+    def _schedule(self) -> None:
+        """
+        Sets the timer to the earliest resume time
+        """
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
+            self._timer_handle = None
+        if not self._heap:
+            return None
+
+        delay: float = max(0.0, self._heap[0][0] - self.timer())
+        self._timer_handle = asyncio.get_running_loop().call_later(delay, self._fire)
+        return None
+
+    def _fire(self) -> None:
+        """
+        Resumes due items, drops stale ones and sets the timer to the next item
+        """
+        self._timer_handle = None
+        now: float = self.timer()
+        while self._heap and self._heap[0][0] <= now and self._resume is not None:
+            _, _, created_at, item = heapq.heappop(self._heap)
+            if now - created_at > self.max_age:
+                self.dropped += 1
+                continue
+
+            self.resumed += 1
+            task: asyncio.Task = asyncio.create_task(self._resume(item))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._schedule()
+        return None
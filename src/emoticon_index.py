@@ -0,0 +1,63 @@
+from typing import Sequence
+
+from cachetools import LRUCache
+
+from src.emoticon_registry import emoticon_registry
+
+
+class EmoticonIndex:
+    """
+    Memoizes response emoticons per (chat, friendship status) as bitmasks
+    of the emoticon registry
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._index: LRUCache = LRUCache(maxsize=maxsize)
+
+    def get(self, chat_id: int, is_friend: bool) -> tuple[str, ...] | None:
+        """
+        Returns memoized response emoticons or None if they are not built yet
+        """
+        mask: int | None = self.get_mask(chat_id=chat_id, is_friend=is_friend)
+        if mask is None:
+            return None
+
+        return emoticon_registry.decode(mask)
+
+    def get_mask(self, chat_id: int, is_friend: bool) -> int | None:
+        return self._index.get((chat_id, is_friend), None)
+
+    def build(
+        self,
+        chat_id: int,
+        is_friend: bool,
+        emoticons_allowed: Sequence[str],
+        emoticons_from_friendship: Sequence[str],
+    ) -> tuple[str, ...]:
+        """
+        Calculates the intersection of allowed and preset emoticons
+        and memoizes it for a given chat and friendship status
+        """
+        mask: int = emoticon_registry.mask(emoticons_allowed) & emoticon_registry.mask(
+            emoticons_from_friendship
+        )
+        self._index[(chat_id, is_friend)] = mask
+        return emoticon_registry.decode(mask)
+
+    def invalidate(self, chat_id: int) -> None:
+        """
+        Forgets response emoticons of a chat whose reaction settings have changed
+        """
+        self._index.pop((chat_id, True), None)
+        self._index.pop((chat_id, False), None)
+        return None
+
+    def clear(self) -> None:
+        """
+        Forgets all response emoticons (e.g. when preset emoticons have changed)
+        """
+        self._index.clear()
+        return None
+
+    def __len__(self) -> int:
+        return len(self._index)
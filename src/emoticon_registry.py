@@ -0,0 +1,89 @@
+from typing import Iterable, Sequence
+
+from cachetools import LRUCache
+from pyrogram.raw.types import ReactionEmoji
+
+import src.constants
+
+
+class EmoticonRegistry:
+    """
+    Gives each valid emoticon a stable id, so a set of emoticons is an int bitmask:
+    an intersection is `&` and a subset check is `&` with a complement
+
+    A ReactionEmoji is built once per emoticon and shared by all reactions
+    """
+
+    def __init__(self, emoticons: Sequence[str], cache_size: int = 1024) -> None:
+        self.emoticons: tuple[str, ...] = tuple(dict.fromkeys(emoticons))
+        self.ids: dict[str, int] = {
+            emoticon: emoticon_id for emoticon_id, emoticon in enumerate(self.emoticons)
+        }
+        self.all: int = (1 << len(self.emoticons)) - 1
+        self._emojis: dict[str, ReactionEmoji] = {
+            emoticon: ReactionEmoji(emoticon=emoticon) for emoticon in self.emoticons
+        }
+        # mask -> emoticons, few masks are in use: one per chat settings and status
+        self._decoded: LRUCache = LRUCache(maxsize=cache_size)
+
+    def __len__(self) -> int:
+        return len(self.emoticons)
+
+    def __contains__(self, emoticon: object) -> bool:
+        return emoticon in self.ids
+
+    def mask(self, emoticons: Iterable[str]) -> int:
+        """
+        Returns the bitmask of emoticons, unknown ones are left out
+        """
+        mask: int = 0
+        for emoticon in emoticons:
+            emoticon_id: int | None = self.ids.get(emoticon, None)
+            if emoticon_id is not None:
+                mask |= 1 << emoticon_id
+        return mask
+
+    def exact_mask(self, emoticons: Iterable[str]) -> int | None:
+        """
+        Returns the bitmask of emoticons or None if some of them are unknown
+        """
+        mask: int = 0
+        for emoticon in emoticons:
+            emoticon_id: int | None = self.ids.get(emoticon, None)
+            if emoticon_id is None:
+                return None
+            mask |= 1 << emoticon_id
+        return mask
+
+    def decode(self, mask: int) -> tuple[str, ...]:
+        """
+        Returns emoticons of a bitmask in the order of their ids
+        """
+        emoticons: tuple[str, ...] | None = self._decoded.get(mask, None)
+        if emoticons is not None:
+            return emoticons
+
+        emoticons = tuple(
+            emoticon
+            for emoticon_id, emoticon in enumerate(self.emoticons)
+            if mask >> emoticon_id & 1
+        )
+        self._decoded[mask] = emoticons
+        return emoticons
+
+    @staticmethod
+    def is_subset(mask: int, of: int) -> bool:
+        return not mask & ~of
+
+    def emojis(self, emoticons: Iterable[str]) -> list[ReactionEmoji]:
+        """
+        Returns the shared ReactionEmojis of emoticons, unknown ones are left out
+        """
+        return [
+            self._emojis[emoticon] for emoticon in emoticons if emoticon in self._emojis
+        ]
+
+
+emoticon_registry: EmoticonRegistry = EmoticonRegistry(
+    emoticons=src.constants.VALID_EMOTICONS
+)
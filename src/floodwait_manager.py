@@ -1,25 +1,66 @@
-import asyncio
+import time
 from datetime import datetime, timedelta
 
 from pyrogram.errors import FloodWait
 
 from src.custom_client import CustomClient
 from src.loggers import logger
+from src.metrics import Metrics
 
 
-# pylint: disable=R0903
 class FloodWaitManager:
+    """
+    Tracks FloodWait deadlines per RPC method and chat
+
+    A limit hit in one chat only blocks that method in that chat,
+    a limit hit without a chat blocks the method account-wide
+    """
+
     @staticmethod
-    async def handle(f: FloodWait, custom_client: CustomClient) -> None:
+    def handle(
+        f: FloodWait,
+        custom_client: CustomClient,
+        method: str,
+        chat_id: int | None = None,
+    ) -> None:
         """
-        Handles FloodWait Telegram error
+        Handles FloodWait Telegram error by recording the deadline of its scope
         """
-        custom_client.scheduler.pause()
+        now: float = time.monotonic()
+        deadlines: dict[tuple[str, int | None], float] = custom_client.flood_deadlines
+        # forget the limits that have already expired
+        for scope in [
+            scope for scope, deadline in deadlines.items() if deadline <= now
+        ]:
+            del deadlines[scope]
+
+        scope_key: tuple[str, int | None] = (method, chat_id)
+        deadlines[scope_key] = max(deadlines.get(scope_key, now), now + f.value)
+        # make the following requests less frequent
+        custom_client.rate_limiter.penalize()
+        labels: str = Metrics.labels(method=method)
+        custom_client.metrics.inc("floodwait_total", labels=labels)
+        custom_client.metrics.inc(
+            "floodwait_seconds_total", value=f.value, labels=labels
+        )
+
         resume_time: datetime = datetime.now() + timedelta(seconds=f.value)
+        scope_name: str = method if chat_id is None else f"{method} in chat {chat_id}"
         logger.error(
             f"FloodWait is provoked...|{f.value} s to wait\n"
-            f"Program will resume at {resume_time.strftime('%Y-%m-%d %H:%M:%S')}"
+            f"{scope_name} will resume at {resume_time.strftime('%Y-%m-%d %H:%M:%S')}"
         )
-        await asyncio.sleep(f.value)
-        custom_client.scheduler.resume()
         return None
+
+    @staticmethod
+    def delay(
+        custom_client: CustomClient, method: str, chat_id: int | None = None
+    ) -> float:
+        """
+        Returns the time left until a method is allowed in a chat with a given id
+        """
+        deadline: float = max(
+            custom_client.flood_deadlines.get((method, None), 0.0),
+            custom_client.flood_deadlines.get((method, chat_id), 0.0),
+        )
+        return max(0.0, deadline - time.monotonic())
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from typing import Any
+
+from src.loggers import logger
+
+
+class JsonLinesWriter:
+    """
+    Appends records to a JSON lines file in batches,
+    the file is written in a worker thread
+    """
+
+    def __init__(self, path: str, batch_size: int = 100) -> None:
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self._buffer: list[str] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.written: int = 0
+
+    def write(self, record: dict[str, Any]) -> None:
+        """
+        Buffers a record and starts saving the batch once it is full
+        """
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+        self.written += 1
+        if len(self._buffer) >= self.batch_size:
+            task: asyncio.Task = asyncio.create_task(self._save(lines=self._pop()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return None
+
+    async def flush(self) -> None:
+        """
+        Waits for the batches being written and writes the buffered records
+        """
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        lines: list[str] = self._pop()
+        if lines:
+            await self._save(lines=lines)
+        return None
+
+    def _pop(self) -> list[str]:
+        lines: list[str] = self._buffer
+        self._buffer = []
+        return lines
+
+    async def _save(self, lines: list[str]) -> None:
+        """
+        Appends lines to the file without blocking the event loop
+        """
+        try:
+            await asyncio.to_thread(self._write, self.path, lines)
+        except OSError as e:
+            logger.error(f"Records were not saved to {self.path}! {e}")
+        return None
+
+    @staticmethod
+    def _write(path: str, lines: list[str]) -> None:
+        with open(path, mode="a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        return None
@@ -0,0 +1,56 @@
+import time
+from collections import Counter
+from typing import Callable, Sequence
+
+from src.loggers import logger
+
+
+class LogSummary:
+    """
+    Aggregates successful reactions into one periodic log line
+    instead of a line per reaction
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.monotonic) -> None:
+        self.timer: Callable[[], float] = timer
+        self.methods: Counter = Counter()
+        self.emoticons: Counter = Counter()
+        self.chat_ids: set[int] = set()
+        self.started_at: float = timer()
+
+    def __len__(self) -> int:
+        return sum(self.methods.values())
+
+    def add(self, method_name: str, chat_id: int, emoticons: Sequence[str]) -> None:
+        """
+        Counts a successful method execution
+        """
+        self.methods[method_name] += 1
+        self.emoticons.update(emoticons)
+        self.chat_ids.add(chat_id)
+        return None
+
+    def flush(self) -> None:
+        """
+        Logs the aggregated reactions since the previous flush and resets counters
+        """
+        if self.methods:
+            period: float = self.timer() - self.started_at
+            methods: str = ", ".join(
+                f"{method_name}: {number}"
+                for method_name, number in self.methods.most_common()
+            )
+            emoticons: str = "".join(
+                f"{emoticon}×{number}"
+                for emoticon, number in self.emoticons.most_common()
+            )
+            logger.success(
+                f"Summary|{len(self)} reactions in {len(self.chat_ids)} chats "
+                f"for {int(period)} s|{methods}|{emoticons}"
+            )
+
+        self.methods.clear()
+        self.emoticons.clear()
+        self.chat_ids.clear()
+        self.started_at = self.timer()
+        return None
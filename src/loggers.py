@@ -1,12 +1,12 @@
 import os
 import sys
+import threading
+import zipfile
 from typing import Any
 
 from loguru import logger
 
 log_dir = os.getenv(key="LOG_DIR", default="logs/")
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir, exist_ok=True)  # pragma: no cover
 
 
 class LoggerFilters:
@@ -62,33 +62,72 @@ class LoggerFilters:
         return record_lvl_name in ("SUCCESS", "ERROR")
 
 
-logger.remove()
-logger.add(
-    sink=sys.stderr,
-    format=(
-        "<blue>{time:YYYY-MM-DD|HH:mm:ss}|</blue>"
-        "<green>{level}</green>"
-        "<blue>|{message}</blue>"
-    ),
-    colorize=True,
-    level="SUCCESS",
-    filter=LoggerFilters.success_filter,  # type: ignore
-)
-logger.add(
-    sink=sys.stderr,
-    format=(
-        "<yellow>{time:YYYY-MM-DD|HH:mm:ss}|</yellow>"
-        "<red>{level}</red>"
-        "<yellow>|{message}</yellow>"
-    ),
-    colorize=True,
-    level="ERROR",
-    filter=LoggerFilters.error_filter,  # type: ignore
-)
-logger.add(
-    sink=f"{log_dir}/logfile_{{time:YYYY-MM-DD_HH-mm-ss}}.log",
-    format="{time:YYYY-MM-DD|HH:mm:ss}|{level}|{message}",
-    filter=LoggerFilters.success_error_filter,  # type: ignore
-    rotation="1 day",
-    compression="zip",
-)
+# pylint: disable=R0903
+class LogCompressor:
+    @staticmethod
+    def compress(path: str) -> None:
+        """
+        Compresses a rotated log file in a background thread,
+        so the rotation doesn't stall the logging worker
+        """
+        threading.Thread(
+            target=LogCompressor._zip, args=(path,), name="log-compressor"
+        ).start()
+        return None
+
+    @staticmethod
+    def _zip(path: str) -> None:
+        """
+        Replaces a log file with a zip archive containing it
+        """
+        with zipfile.ZipFile(
+            f"{path}.zip", mode="w", compression=zipfile.ZIP_DEFLATED
+        ) as archive:
+            archive.write(path, arcname=os.path.basename(path))
+        os.remove(path)
+        return None
+
+
+def setup_logging() -> None:
+    """
+    Creates the log directory and replaces the default sink with the app ones
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    # sinks are queued, so records are written by a worker thread, not the event loop
+    logger.remove()
+    logger.add(
+        sink=sys.stderr,
+        format=(
+            "<blue>{time:YYYY-MM-DD|HH:mm:ss}|</blue>"
+            "<green>{level}</green>"
+            "<blue>|{message}</blue>"
+        ),
+        colorize=True,
+        level="SUCCESS",
+        filter=LoggerFilters.success_filter,  # type: ignore
+        enqueue=True,
+    )
+    logger.add(
+        sink=sys.stderr,
+        format=(
+            "<yellow>{time:YYYY-MM-DD|HH:mm:ss}|</yellow>"
+            "<red>{level}</red>"
+            "<yellow>|{message}</yellow>"
+        ),
+        colorize=True,
+        level="ERROR",
+        filter=LoggerFilters.error_filter,  # type: ignore
+        enqueue=True,
+    )
+    logger.add(
+        sink=f"{log_dir}/logfile_{{time:YYYY-MM-DD_HH-mm-ss}}.log",
+        format="{time:YYYY-MM-DD|HH:mm:ss}|{level}|{message}",
+        level="SUCCESS",
+        filter=LoggerFilters.success_error_filter,  # type: ignore
+        rotation="1 day",
+        compression=LogCompressor.compress,
+        enqueue=True,
+        # batch file writes instead of hitting the disk on every record
+        buffering=64 * 1024,
+    )
+    return None
@@ -1,57 +1,310 @@
+import asyncio
+import os
+from functools import partial
 from typing import Callable
 
 import uvloop
+from apscheduler.triggers.interval import IntervalTrigger
 from pyrogram import idle
-from pyrogram.handlers import MessageHandler
+from pyrogram.handlers import MessageHandler, RawUpdateHandler
 
+from src.admission_filter import ChatUpdateFilter, ReactionUpdateFilter
+from src.boot import BootReport, process_age
+from src.config_watcher import ConfigWatcher
 from src.custom_client import CustomClient
-from src.loggers import logger
+from src.custom_scheduler import CustomScheduler
+from src.loggers import logger, setup_logging
 from src.message_emoji_manager import MessageEmojiManager
+from src.metrics import Metrics
+from src.metrics_server import MetricsServer
+from src.state_snapshot import StateSnapshot
+from src.stats_cache import StatsTTLCache
 from src.user_settings import UserSettings
 
 
 def register_msg_handler(custom_client: CustomClient, func: Callable) -> None:
     """
     Registers message handler with a given function in a provided client
+    Messages from non-targets and from not allowed chats are dropped before dispatch
     """
-    pyrogram_response_handler: MessageHandler = MessageHandler(func)
+    pyrogram_response_handler: MessageHandler = MessageHandler(
+        func, filters=custom_client.admission_filter
+    )
     custom_client.add_handler(pyrogram_response_handler)
     return None
 
 
+def register_chat_update_handler(custom_client: CustomClient, func: Callable) -> None:
+    """
+    Registers raw chat update handler with a given function in a provided client
+    """
+    # a separate group, so message handlers don't shadow this one
+    pyrogram_chat_update_handler: RawUpdateHandler = RawUpdateHandler(func)
+    # RawUpdateHandler doesn't accept filters as an argument in pyrofork 2.3.24
+    pyrogram_chat_update_handler.filters = ChatUpdateFilter()
+    custom_client.add_handler(pyrogram_chat_update_handler, group=1)
+    return None
+
+
+def register_reaction_update_handler(
+    custom_client: CustomClient, func: Callable
+) -> None:
+    """
+    Registers raw reaction update handler with a given function in a provided client
+    """
+    pyrogram_reaction_update_handler: RawUpdateHandler = RawUpdateHandler(func)
+    pyrogram_reaction_update_handler.filters = ReactionUpdateFilter()
+    # the filters of this group don't overlap, so each update has one handler
+    custom_client.add_handler(pyrogram_reaction_update_handler, group=1)
+    return None
+
+
 def register_scheduler(custom_client: CustomClient, func: Callable) -> None:
     """
     Registers scheduler with a given function in a provided client
     """
     custom_client.scheduler.add_job(
         func=func,
-        trigger=custom_client.scheduler.trigger,
+        trigger=CustomScheduler.make_trigger(user_settings=custom_client.user_settings),
         args=[custom_client],
         id=custom_client.name,
         replace_existing=True,
     )
-    custom_client.scheduler.start()
+    # the scheduler may be shared with the clients of other accounts
+    if not custom_client.scheduler.running:
+        custom_client.scheduler.start()
+    return None
+
+
+def register_snapshot_job(custom_client: CustomClient, func: Callable) -> None:
+    """
+    Registers periodic state snapshots with a given function in a provided client
+    """
+    if not custom_client.user_settings.snapshot_interval:
+        return None
+
+    custom_client.scheduler.add_job(
+        func=func,
+        trigger=IntervalTrigger(seconds=custom_client.user_settings.snapshot_interval),
+        args=[custom_client],
+        id=f"{custom_client.name}_snapshot",
+        replace_existing=True,
+    )
     return None
 
 
-user_settings: UserSettings = UserSettings.from_config(config_file="src/config.yaml")
-# uvloop.install()  # https://docs.pyrogram.org/topics/speedups
-# seems deprecated in Python 3.12
-client: CustomClient = CustomClient(
-    name="my_app", user_settings=user_settings, sleep_threshold=0
-)
-message_emoji_manager: MessageEmojiManager = MessageEmojiManager()
+def register_log_summary_job(custom_client: CustomClient) -> None:
+    """
+    Registers periodic reaction summaries in a provided client
+    """
+    if not custom_client.user_settings.log_summary_interval:
+        return None
+
+    custom_client.scheduler.add_job(
+        func=custom_client.log_summary.flush,
+        trigger=IntervalTrigger(
+            seconds=custom_client.user_settings.log_summary_interval
+        ),
+        id=f"{custom_client.name}_log_summary",
+        replace_existing=True,
+    )
+    return None
+
 
+def register_config_watch_job(custom_client: CustomClient, func: Callable) -> None:
+    """
+    Registers periodic config checks with a given function in a provided client
+    """
+    if not custom_client.user_settings.config_reload_interval:
+        return None
 
-async def main():  # pragma: no cover
-    async with client:
-        await client.set_emoticon_picker()
-        logger.success("Telegram auth completed successfully!")
-        register_msg_handler(custom_client=client, func=message_emoji_manager.respond)
-        register_scheduler(custom_client=client, func=message_emoji_manager.update)
-        logger.success("Handlers are registered. App is ready to work.")
+    # one job checks the config for all accounts
+    custom_client.scheduler.add_job(
+        func=func,
+        trigger=IntervalTrigger(
+            seconds=custom_client.user_settings.config_reload_interval
+        ),
+        id="config_watcher",
+        replace_existing=True,
+    )
+    return None
+
+
+def create_clients(
+    accounts: dict[str, UserSettings], sleep_threshold: int = 0
+) -> list[CustomClient]:
+    """
+    Creates a client per account, the clients share chat info,
+    the metrics registry and the scheduler
+    """
+    first_settings: UserSettings = next(iter(accounts.values()))
+    chat_info_map: StatsTTLCache = StatsTTLCache(
+        maxsize=first_settings.chat_cache_size, ttl=first_settings.chat_cache_ttl
+    )
+    metrics: Metrics = Metrics()
+    scheduler: CustomScheduler = CustomScheduler(user_settings=first_settings)
+    custom_clients: list[CustomClient] = [
+        CustomClient(
+            name=name,
+            user_settings=account_settings,
+            sleep_threshold=sleep_threshold,
+            chat_info_map=chat_info_map,
+            # a single account keeps its metrics unlabeled
+            metrics=metrics.child(account=name) if len(accounts) > 1 else metrics,
+            scheduler=scheduler,
+        )
+        for name, account_settings in accounts.items()
+    ]
+    # a chat info change invalidates the reaction settings of every account
+    for custom_client in custom_clients:
+        custom_client.chat_info_clients = custom_clients
+    return custom_clients
+
+
+def select_account(
+    accounts: dict[str, UserSettings], name: str | None, metrics_port: str | None
+) -> dict[str, UserSettings]:
+    """
+    Returns the settings of one account when the process is a worker
+    of src/supervisor.py, otherwise the settings of all accounts
+
+    A worker serves its metrics on a local port for the supervisor to collect
+    """
+    if name is None:
+        return accounts
+
+    return {
+        name: accounts[name].model_copy(
+            update={
+                "metrics_port": int(metrics_port) if metrics_port else None,
+                "metrics_host": "127.0.0.1",
+            }
+        )
+    }
+
+
+CONFIG_FILE: str = "src/config.yaml"
+
+
+class App:
+    """
+    The clients of the configured accounts with the components they share,
+    created by `create_app` without connecting to Telegram
+    """
+
+    def __init__(
+        self,
+        clients: list[CustomClient],
+        config_watcher: ConfigWatcher,
+        boot_report: BootReport,
+    ) -> None:
+        self.clients: list[CustomClient] = clients
+        self.config_watcher: ConfigWatcher = config_watcher
+        self.boot_report: BootReport = boot_report
+        self.message_emoji_manager: MessageEmojiManager = MessageEmojiManager()
+
+    async def start_client(self, client: CustomClient) -> None:  # pragma: no cover
+        """
+        Logs a client in and registers its handlers before the warmup,
+        so messages are reacted to while the chats are being prepared
+        """
+        manager: MessageEmojiManager = self.message_emoji_manager
+        with self.boot_report.phase("session"):
+            await client.start()
+        with self.boot_report.phase("premium"):
+            await client.set_emoticon_picker()
+        logger.success(f"Telegram auth completed successfully!|{client.name}")
+        with self.boot_report.phase("snapshot"):
+            if client.user_settings.snapshot_interval:
+                StateSnapshot.load(custom_client=client)
+        with self.boot_report.phase("handlers"):
+            client.reaction_sender.start(handler=partial(manager.send_response, client))
+            client.deferred_queue.start(resume=partial(manager.resume_response, client))
+            register_msg_handler(custom_client=client, func=manager.respond)
+            register_chat_update_handler(
+                custom_client=client, func=manager.forget_updated_chat
+            )
+            register_reaction_update_handler(
+                custom_client=client, func=manager.mirror_reactions
+            )
+            register_scheduler(custom_client=client, func=manager.update)
+            register_snapshot_job(custom_client=client, func=StateSnapshot.save)
+            register_log_summary_job(custom_client=client)
+        # requests of handlers and of the warmup for the same chat are shared
+        with self.boot_report.phase("warmup"):
+            await manager.warm_up(custom_client=client)
+        return None
+
+    @staticmethod
+    async def stop_client(client: CustomClient) -> None:  # pragma: no cover
+        await client.deferred_queue.stop()
+        await client.reaction_sender.stop()
+        if client.user_settings.snapshot_interval:
+            await StateSnapshot.save(custom_client=client)
+        client.log_summary.flush()
+        await client.tracer.flush()
+        await client.recorder.flush()
+        await client.stop()
+        return None
+
+    async def run(self) -> None:  # pragma: no cover
+        # the accounts log in and warm up concurrently
+        await asyncio.gather(*(self.start_client(client) for client in self.clients))
+        register_config_watch_job(
+            custom_client=self.clients[0], func=self.config_watcher.check
+        )
+        metrics_server: asyncio.Server | None = await MetricsServer.start(
+            custom_clients=self.clients, boot_report=self.boot_report
+        )
+        logger.success(
+            "Handlers are registered. App is ready to work."
+            f"|{len(self.clients)} accounts"
+        )
+        self.boot_report.ready()
         await idle()
+        if metrics_server is not None:
+            metrics_server.close()
+        self.clients[0].scheduler.shutdown(wait=False)
+        await asyncio.gather(*(self.stop_client(client) for client in self.clients))
+        # wait for queued records to be written
+        await logger.complete()
+        return None
+
+
+def create_app(config_file: str = CONFIG_FILE) -> App:
+    """
+    Sets up logging, reads the config and creates the clients,
+    every boot phase is timed for the startup report
+    """
+    boot_report: BootReport = BootReport()
+    imports: float | None = process_age()
+    if imports is not None:
+        boot_report.add(name="imports", seconds=imports)
+    # first, so config errors reach the log files
+    with boot_report.phase("logging"):
+        setup_logging()
+    with boot_report.phase("config"):
+        config_accounts: dict[str, UserSettings] = UserSettings.accounts_from_config(
+            config_file=config_file
+        )
+        accounts_settings: dict[str, UserSettings] = select_account(
+            accounts=config_accounts,
+            name=os.getenv("WORKER_ACCOUNT"),
+            metrics_port=os.getenv("WORKER_METRICS_PORT"),
+        )
+    with boot_report.phase("clients"):
+        clients: list[CustomClient] = create_clients(accounts=accounts_settings)
+    return App(
+        clients=clients,
+        config_watcher=ConfigWatcher(
+            config_file=config_file, custom_clients=clients, accounts=config_accounts
+        ),
+        boot_report=boot_report,
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover
-    uvloop.run(client.run(main()))
+    app: App = create_app()
+    # uvloop.install()  # https://docs.pyrogram.org/topics/speedups
+    # seems deprecated in Python 3.12
+    uvloop.run(app.clients[0].run(app.run()))
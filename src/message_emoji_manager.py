@@ -1,6 +1,11 @@
-import random
-from typing import Any, Sequence
-
+# pylint: disable=C0302
+import asyncio
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Coroutine, Sequence
+
+from pyrogram import utils
 from pyrogram.errors import (
     BadRequest,
     FloodWait,
@@ -8,17 +13,28 @@ from pyrogram.errors import (
     MessageNotModified,
     NotAcceptable,
     ReactionInvalid,
+    RPCError,
 )
 from pyrogram.raw import functions
 from pyrogram.raw.base import Peer
-from pyrogram.raw.types import ReactionEmoji
+from pyrogram.raw.types import (
+    ReactionEmoji,
+    UpdateChannel,
+    UpdateChat,
+    UpdateMessageReactions,
+)
 from pyrogram.types import Chat, ChatPreview, ChatReactions, Message, Reaction
 
 import src.constants
 from src.constants import FriendshipStatus
 from src.custom_client import CustomClient
+from src.emoticon_registry import emoticon_registry
 from src.floodwait_manager import FloodWaitManager
 from src.loggers import logger
+from src.message_store import MessageKey
+from src.metrics import Metrics
+from src.reaction_sender import ReactionJob
+from src.tracer import Trace
 
 
 class MessageEmojiManager:
@@ -29,13 +45,29 @@ class MessageEmojiManager:
         print(message)
         return None
 
-    # pylint: disable=R0911
     async def respond(
         self, custom_client: CustomClient, message: Message | None
     ) -> None:
         """
         Processes incoming messages to place emojis as a response
         """
+        trace: Trace = custom_client.tracer.start(name="respond")
+        custom_client.recorder.record_message(message=message)  # type: ignore
+        with custom_client.metrics.measure(
+            "handler_seconds", labels=Metrics.labels(method="respond")
+        ):
+            await self._respond(
+                custom_client=custom_client, message=message, trace=trace
+            )
+        # otherwise the reaction sender finishes the trace
+        if not trace.is_handed_off:
+            trace.finish()
+        return None
+
+    # pylint: disable=R0911
+    async def _respond(
+        self, custom_client: CustomClient, message: Message | None, trace: Trace
+    ) -> None:
         if not self._is_valid_message(message=message):
             return None
 
@@ -51,16 +83,22 @@ class MessageEmojiManager:
         ):
             return None
 
+        trace.set(chat_id=chat_id, message_id=message.id)  # type: ignore
+        trace.mark("validate")
+
+        trace.set(chat_info_cached=chat_id in custom_client.chat_info_map)
         # for memoization and the latter functions
         await self._write_chat_info_from_id(
             custom_client=custom_client, chat_id=chat_id
         )
+        trace.mark("chat_info")
 
         emoticons_allowed: Sequence[str] = self._chat_emoticons_from_chat_id(
             custom_client=custom_client, chat_id=chat_id
         )
         response_emoticons: Sequence[str] = self._get_response_emoticons(
             custom_client=custom_client,
+            chat_id=chat_id,
             emoticons_allowed=emoticons_allowed,
             sender_id=sender_id,
         )
@@ -73,11 +111,14 @@ class MessageEmojiManager:
         response_emojis: Sequence[ReactionEmoji] = self._convert_emoticons_to_emojis(
             emoticons=picked_response_emoticons
         )
+        trace.mark("emoticons")
 
+        trace.set(chat_peer_cached=chat_id in custom_client.chat_peer_map)
         # for memoization and the latter functions
         await self._write_chat_peer_from_id(
             custom_client=custom_client, chat_id=chat_id
         )
+        trace.mark("chat_peer")
 
         chat_peer: Peer | None = self._peer_from_chat_id(
             custom_client=custom_client, chat_id=chat_id
@@ -85,56 +126,170 @@ class MessageEmojiManager:
         if chat_peer is None:
             return None
 
+        reaction_job: ReactionJob = ReactionJob(
+            method_name="respond",
+            chat_id=chat_id,
+            message=message,  # type: ignore
+            peer=chat_peer,
+            emoticons=picked_response_emoticons,
+            emojis=response_emojis,
+            created_at=time.monotonic(),
+            trace=trace,
+        )
+        trace.hand_off()
+        # the handler is released as soon as the reaction is queued
+        if custom_client.reaction_sender.submit(job=reaction_job):
+            return None
+
+        await self.send_response(custom_client=custom_client, job=reaction_job)
+        return None
+
+    async def send_response(
+        self, custom_client: CustomClient, job: ReactionJob
+    ) -> None:
+        """
+        Places response emojis on a message and remembers the message for updates
+        Parks the job until the FloodWait deadline if SendReaction is limited
+        """
+        job.trace.mark("queue")
+        delay: float = FloodWaitManager.delay(
+            custom_client=custom_client, method="SendReaction", chat_id=job.chat_id
+        )
+        if delay > 0:
+            self._defer_response(custom_client=custom_client, job=job, delay=delay)
+            return None
+
         try:
             await self._place_emojis(
                 custom_client=custom_client,
-                peer=chat_peer,
-                chat_id=chat_id,
-                message_id=message.id,  # type: ignore
-                emojis=response_emojis,
+                peer=job.peer,
+                chat_id=job.chat_id,
+                message_id=job.message.id,
+                emojis=job.emojis,
             )
+        except FloodWait:
+            job.trace.mark("send")
+            self._defer_response(
+                custom_client=custom_client,
+                job=job,
+                delay=FloodWaitManager.delay(
+                    custom_client=custom_client,
+                    method="SendReaction",
+                    chat_id=job.chat_id,
+                ),
+            )
+            return None
         except (
             ReactionInvalid,
             MessageNotModified,
             MessageIdInvalid,
             BadRequest,
             NotAcceptable,
-        ):
+        ) as e:
+            job.trace.mark("send")
+            job.trace.finish(outcome=type(e).__name__)
             return None
         else:
+            job.trace.mark("send")
             self._log_method_success(
-                method_name="respond",
+                method_name=job.method_name,
                 custom_client=custom_client,
-                message=message,
-                picked_response_emoticons=picked_response_emoticons,
+                message=job.message,
+                picked_response_emoticons=job.emoticons,
             )
+            job.trace.mark("log")
+
+        # updates find the message and its reactions without fetching it
+        custom_client.msg_store.add(
+            key=(job.chat_id, job.message.id),
+            sender_id=self._sender_id_from_message(message=job.message) or 0,
+            message=job.message,
+        )
+        custom_client.reaction_mirror.track(
+            chat_id=job.chat_id,
+            message_id=job.message.id,
+            reactions=self._msg_reactions_from_msg(message=job.message) or (),
+        )
+        custom_client.reaction_mirror.record_sent(
+            chat_id=job.chat_id, message_id=job.message.id, emoticons=job.emoticons
+        )
+        job.trace.finish(
+            outcome="sent", e2e_seconds=self._seconds_since_message(job.message)
+        )
+        return None
+
+    @staticmethod
+    def _seconds_since_message(message: Message) -> float | None:
+        """
+        Returns the time passed since a message was sent according to Telegram
+        """
+        sent_at: datetime | None = getattr(message, "date", None)
+        if not isinstance(sent_at, datetime):
+            return None
+
+        return time.time() - sent_at.timestamp()
+
+    @staticmethod
+    def _defer_response(
+        custom_client: CustomClient, job: ReactionJob, delay: float
+    ) -> None:
+        """
+        Parks a reaction job in the deferred queue for a given delay
+        """
+        job.trace.set(floodwait_delay=delay)
+        if not custom_client.deferred_queue.defer(
+            item=job, resume_at=time.monotonic() + delay, created_at=job.created_at
+        ):
+            logger.error("Reaction was not sent! The deferred queue is full.")
+            job.trace.finish(outcome="dropped")
+        return None
 
-        # store message ids to retrieve it later
-        # message is not None, checked in _is_valid_message()
-        msg_queue_container: Sequence[int] = (chat_id, message.id)  # type: ignore
-        custom_client.msg_queue.append(msg_queue_container)
+    async def resume_response(
+        self, custom_client: CustomClient, job: ReactionJob
+    ) -> None:
+        """
+        Sends a reaction job parked by FloodWait through the usual route
+        """
+        job.trace.mark("deferred")
+        if custom_client.reaction_sender.submit(job=job):
+            return None
+
+        await self.send_response(custom_client=custom_client, job=job)
         return None
 
     def _get_response_emoticons(
         self,
         custom_client: CustomClient,
+        chat_id: int,
         emoticons_allowed: Sequence[str],
         sender_id: int,
     ) -> Sequence[str]:
         """
-        Calculates the intersection of allowed and preset emoticons
-        Returns the resulting intersection as a sequence
+        Returns the intersection of allowed and preset emoticons as a sequence
+        The intersection is calculated once per chat and friendship status
         """
         sender_is_friend: bool = self._sender_is_friend(
             custom_client=custom_client, sender_id=sender_id
         )
+        response_emoticons: Sequence[str] | None = custom_client.emoticon_index.get(
+            chat_id=chat_id, is_friend=sender_is_friend
+        )
+        if response_emoticons is not None:
+            return response_emoticons
+
+        # chat info may be unavailable yet, so there is nothing to memoize
+        if not emoticons_allowed:
+            return ()
+
         emoticons_from_friendship: Sequence[str] = self._emoticons_from_friendship(
             custom_client=custom_client, is_friend=sender_is_friend
         )
-        response_emoticons: Sequence[str] = tuple(
-            set(emoticons_allowed) & set(emoticons_from_friendship)
+        return custom_client.emoticon_index.build(
+            chat_id=chat_id,
+            is_friend=sender_is_friend,
+            emoticons_allowed=emoticons_allowed,
+            emoticons_from_friendship=emoticons_from_friendship,
         )
-        return response_emoticons
 
     @staticmethod
     def _is_valid_message(message: Message | None) -> bool:
@@ -197,15 +352,73 @@ class MessageEmojiManager:
         if chat_info is not None:
             return None
 
+        # the next message of the chat will retrieve its info
+        if FloodWaitManager.delay(
+            custom_client=custom_client, method="GetChat", chat_id=chat_id
+        ):
+            return None
+
         try:
-            chat_info = await custom_client.get_chat(chat_id=chat_id)
+            # concurrent callers for the same chat share one request
+            chat_info = await custom_client.in_flight.run(
+                key=("get_chat", chat_id),
+                func=partial(
+                    MessageEmojiManager._chat_request,
+                    custom_client=custom_client,
+                    method="GetChat",
+                    chat_id=chat_id,
+                    func=partial(custom_client.get_chat, chat_id=chat_id),
+                ),
+            )
         except ValueError:
             return None
 
         if isinstance(chat_info, Chat):
+            # fresh chat info may come with different reaction settings
+            custom_client.forget_shared_chat_reactions(chat_id=chat_id)
             custom_client.chat_info_map.setdefault(chat_id, chat_info)
         return None
 
+    @staticmethod
+    async def forget_updated_chat(
+        custom_client: CustomClient,
+        update: UpdateChannel | UpdateChat,
+        users: dict,
+        chats: dict,
+    ) -> None:
+        """
+        Processes raw chat updates to forget outdated chat info and reactions
+        """
+        chat_id: int = (
+            utils.get_channel_id(update.channel_id)
+            if isinstance(update, UpdateChannel)
+            else -update.chat_id
+        )
+        custom_client.forget_chat(chat_id=chat_id)
+        return None
+
+    @staticmethod
+    async def mirror_reactions(
+        custom_client: CustomClient,
+        update: UpdateMessageReactions,
+        users: dict,
+        chats: dict,
+    ) -> None:
+        """
+        Processes raw reaction updates to keep mirrored reactions current
+        """
+        chat_id: int = utils.get_peer_id(update.peer)
+        if custom_client.reaction_mirror.apply(
+            chat_id=chat_id,
+            message_id=update.msg_id,
+            reactions=update.reactions,  # type: ignore
+        ):
+            # new reactions may make a skipped message worth updating
+            custom_client.msg_store.set_eligible(
+                key=(chat_id, update.msg_id), is_eligible=True
+            )
+        return None
+
     @staticmethod
     def _chat_attribute_from_chat_id(
         custom_client: CustomClient, chat_id: int, attribute: str
@@ -296,11 +509,8 @@ class MessageEmojiManager:
         """
         Converts emoticons of type string into ReactionEmojis
         """
-        return [
-            ReactionEmoji(emoticon=emoticon)
-            for emoticon in emoticons
-            if emoticon in src.constants.VALID_EMOTICONS
-        ]
+        # the emojis are shared, not built per reaction
+        return emoticon_registry.emojis(emoticons)
 
     @staticmethod
     def _convert_emojis_to_emoticons(emojis: Sequence[ReactionEmoji]) -> Sequence[str]:
@@ -320,16 +530,58 @@ class MessageEmojiManager:
         if chat_peer is not None:
             return None
 
+        if FloodWaitManager.delay(
+            custom_client=custom_client, method="ResolvePeer", chat_id=chat_id
+        ):
+            return None
+
         try:
-            chat_peer = await custom_client.resolve_peer(  # type: ignore
-                peer_id=chat_id
+            # concurrent callers for the same chat share one request
+            chat_peer = await custom_client.in_flight.run(
+                key=("resolve_peer", chat_id),
+                func=partial(
+                    MessageEmojiManager._chat_request,
+                    custom_client=custom_client,
+                    method="ResolvePeer",
+                    chat_id=chat_id,
+                    func=partial(custom_client.resolve_peer, peer_id=chat_id),
+                ),
             )
         except KeyError:
             return None
 
-        custom_client.chat_peer_map.setdefault(chat_id, chat_peer)
+        if chat_peer is not None:
+            custom_client.chat_peer_map.setdefault(chat_id, chat_peer)
         return None
 
+    @staticmethod
+    async def _chat_request(
+        custom_client: CustomClient,
+        method: str,
+        chat_id: int,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Makes a request about a chat within the rate limits
+        Returns None if it is answered with FloodWait, the wait is recorded once
+        for all callers sharing the request
+        """
+        try:
+            return await custom_client.rate_limiter.call(
+                chat_id=chat_id,
+                func=partial(
+                    custom_client.recorder.call,
+                    method=method,
+                    chat_id=chat_id,
+                    func=func,
+                ),
+            )
+        except FloodWait as f:
+            FloodWaitManager.handle(
+                f, custom_client=custom_client, method=method, chat_id=chat_id
+            )
+            return None
+
     @staticmethod
     def _peer_from_chat_id(custom_client: CustomClient, chat_id: int) -> Peer | None:
         """
@@ -349,51 +601,63 @@ class MessageEmojiManager:
     ) -> None:
         """
         Places ReactionEmojis from a sequence of ReactionEmojis on message if possible
+        FloodWait is recorded and raised, so the caller decides when to retry
         """
-        while True:
-            try:
-                await custom_client.invoke(
-                    functions.messages.SendReaction(
-                        peer=peer,  # type: ignore
-                        msg_id=message_id,
-                        add_to_recent=True,
-                        reaction=list(emojis),
-                    )
+        await custom_client.rate_limiter.acquire(chat_id=chat_id)
+        try:
+            with custom_client.metrics.measure("send_reaction_seconds"):
+                await custom_client.recorder.call(
+                    method="SendReaction",
+                    chat_id=chat_id,
+                    func=partial(
+                        custom_client.invoke,
+                        functions.messages.SendReaction(
+                            peer=peer,  # type: ignore
+                            msg_id=message_id,
+                            add_to_recent=True,
+                            reaction=list(emojis),
+                        ),
+                    ),
                 )
-                return None
+            return None
 
-            except FloodWait as f:
-                await FloodWaitManager.handle(f=f, custom_client=custom_client)
+        except FloodWait as f:
+            FloodWaitManager.handle(
+                f=f,
+                custom_client=custom_client,
+                method="SendReaction",
+                chat_id=chat_id,
+            )
+            raise
 
-            except ReactionInvalid:
-                emoticons = ", ".join(self._convert_emojis_to_emoticons(emojis))
-                logger.error(
-                    f"Reactions {emoticons} were not sent!\n"
-                    f"Some of these reactions are invalid in this chat.\n"
-                    f"You can try to restart the app or to correct the config file."
-                )
-                raise
+        except ReactionInvalid:
+            emoticons = ", ".join(self._convert_emojis_to_emoticons(emojis))
+            logger.error(
+                f"Reactions {emoticons} were not sent!\n"
+                f"Some of these reactions are invalid in this chat.\n"
+                f"Chat settings will be refreshed on the next message."
+            )
+            # cached reaction settings are likely outdated
+            custom_client.forget_chat(chat_id=chat_id)
+            raise
 
-            except MessageNotModified:
-                logger.error("Message was not modified. The modification is outdated.")
-                raise
+        except MessageNotModified:
+            logger.error("Message was not modified. The modification is outdated.")
+            raise
 
-            except MessageIdInvalid:
-                logger.error("Message was not modified. The modification is outdated.")
-                msg_queue_container: Sequence[int] = (chat_id, message_id)
-                if msg_queue_container in custom_client.msg_queue:
-                    custom_client.msg_queue.remove(msg_queue_container)
-                if msg_queue_container in custom_client.msg_keeper:
-                    custom_client.msg_keeper.pop(key=msg_queue_container)
-                raise
+        except MessageIdInvalid:
+            logger.error("Message was not modified. The modification is outdated.")
+            custom_client.msg_store.remove(key=(chat_id, message_id))
+            custom_client.reaction_mirror.forget(chat_id=chat_id, message_id=message_id)
+            raise
 
-            except BadRequest as b:
-                logger.error(f"Bad Request. id: {b.ID}, message: {b.MESSAGE}")
-                raise
+        except BadRequest as b:
+            logger.error(f"Bad Request. id: {b.ID}, message: {b.MESSAGE}")
+            raise
 
-            except NotAcceptable as n:
-                logger.error(f"Not Acceptable. id: {n.ID}, message: {n.MESSAGE}")
-                raise
+        except NotAcceptable as n:
+            logger.error(f"Not Acceptable. id: {n.ID}, message: {n.MESSAGE}")
+            raise
 
     @staticmethod
     def _sender_name_from_message(message: Message | None) -> str | None:
@@ -461,6 +725,39 @@ class MessageEmojiManager:
             logger.error("Success log failed. Message is outdated.")
             return None
 
+        if custom_client.user_settings.log_summary_interval:
+            custom_client.log_summary.add(
+                method_name=method_name,
+                chat_id=chat_id,
+                emoticons=picked_response_emoticons,
+            )
+            return None
+
+        # the line is formatted on the event loop, only the write is queued,
+        # `log_summary_interval` replaces it with one line per interval
+        logger.success(
+            self._format_method_success(
+                method_name=method_name,
+                custom_client=custom_client,
+                message=message,
+                chat_id=chat_id,
+                picked_response_emoticons=picked_response_emoticons,
+            )
+        )
+        return None
+
+    # pylint: disable=R0913
+    def _format_method_success(
+        self,
+        method_name: str,
+        custom_client: CustomClient,
+        message: Message,
+        chat_id: int,
+        picked_response_emoticons: Sequence[str],
+    ) -> str:
+        """
+        Returns a log message about a successful method execution
+        """
         chat_title: str = self._chat_title_from_chat_id(
             custom_client=custom_client, chat_id=chat_id
         )
@@ -470,54 +767,257 @@ class MessageEmojiManager:
         log_msg: str = (
             f"{method_name}|{recipient_name}|{chat_title}|{response_emoticons}|{url}"
         )
-        logger.success(log_msg)
+        return log_msg
+
+    async def warm_up(self, custom_client: CustomClient) -> None:
+        """
+        Retrieves info, peers and allowed reactions for all configured chats
+        so that the first reactions don't wait for them
+        """
+        concurrency: int = custom_client.user_settings.warmup_concurrency
+        if not concurrency:
+            return None
+
+        start_time: float = time.perf_counter()
+        targets: list[int] = list(custom_client.user_settings.targets)
+        # private chats with targets are allowed as well
+        chat_ids: list[int] = list(
+            dict.fromkeys(
+                [*(custom_client.user_settings.chats_allowed or ()), *targets]
+            )
+        )
+        # one bulk request puts all targets in the peer storage
+        try:
+            await custom_client.get_users(user_ids=targets)
+        except RPCError as e:
+            logger.error(f"Warmup failed to get targets. id: {e.ID}")
+
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        warmed_up: int = 0
+        for done, chat_warmup in enumerate(
+            asyncio.as_completed(
+                [
+                    self._warm_up_chat(
+                        custom_client=custom_client,
+                        chat_id=chat_id,
+                        semaphore=semaphore,
+                    )
+                    for chat_id in chat_ids
+                ]
+            ),
+            start=1,
+        ):
+            warmed_up += await chat_warmup
+            # report every quarter of the way
+            if done * 4 // len(chat_ids) != (done - 1) * 4 // len(chat_ids):
+                logger.success(f"Warmup in progress|{done}/{len(chat_ids)} chats")
+
+        logger.success(
+            f"Warmup completed|{warmed_up}/{len(chat_ids)} chats "
+            f"in {time.perf_counter() - start_time:.2f} s"
+        )
         return None
 
-    # pylint: disable=R0911
+    async def _warm_up_chat(
+        self, custom_client: CustomClient, chat_id: int, semaphore: asyncio.Semaphore
+    ) -> bool:
+        """
+        Retrieves info, peer and allowed reactions for a chat with a given id
+        Returns whether everything is retrieved
+        """
+        async with semaphore:
+            try:
+                await self._write_chat_info_from_id(
+                    custom_client=custom_client, chat_id=chat_id
+                )
+                await self._write_chat_peer_from_id(
+                    custom_client=custom_client, chat_id=chat_id
+                )
+            except RPCError as e:
+                logger.error(f"Warmup failed for chat {chat_id}. id: {e.ID}")
+
+        self._chat_emoticons_from_chat_id(custom_client=custom_client, chat_id=chat_id)
+        return (
+            chat_id in custom_client.chat_info_map
+            and chat_id in custom_client.chat_peer_map
+        )
+
     async def update(self, custom_client: CustomClient) -> None:
         """
         Processes previously processed messages, updating emojis
+        With `update_batch_size` > 1 a batch of messages is updated concurrently
         """
-        if not custom_client.msg_queue:
+        if custom_client.user_settings.update_batch_size > 1:
+            with custom_client.metrics.measure(
+                "handler_seconds", labels=Metrics.labels(method="update")
+            ):
+                await self._update_batch(custom_client=custom_client)
             return None
 
-        message: Message | None = await self._get_random_msg_from_queue(
+        trace: Trace = custom_client.tracer.start(name="update")
+        with custom_client.metrics.measure(
+            "handler_seconds", labels=Metrics.labels(method="update")
+        ):
+            await self._update(custom_client=custom_client, trace=trace)
+        trace.finish()
+        return None
+
+    async def _update(self, custom_client: CustomClient, trace: Trace) -> None:
+        if not custom_client.msg_store.eligible:
+            return None
+
+        message: Message | None = await self._get_random_msg_from_store(
             custom_client=custom_client
         )
+        trace.mark("pick_message")
         if message is None:
             return None
 
+        await self._update_message(
+            custom_client=custom_client, message=message, trace=trace
+        )
+        return None
+
+    async def _update_batch(self, custom_client: CustomClient) -> None:
+        """
+        Updates a batch of random messages from the store concurrently
+
+        Messages without a known object are fetched with one request per chat,
+        so reactions to the fetched messages are sent while others are fetched.
+        The rate limiter keeps the concurrent requests within the rate budget
+        """
+        message_ids_by_chat: dict[int, list[int]] = {}
+        updates: list[Coroutine[Any, Any, None]] = []
+        for msg_key in custom_client.msg_store.sample(
+            k=custom_client.user_settings.update_batch_size
+        ):
+            message: Message | None = custom_client.msg_store.get(key=msg_key)
+            if message is not None:
+                updates.append(
+                    self._update_traced(custom_client=custom_client, message=message)
+                )
+                continue
+
+            chat_id, message_id = msg_key
+            message_ids_by_chat.setdefault(chat_id, []).append(message_id)
+
+        updates.extend(
+            self._fetch_and_update(
+                custom_client=custom_client, chat_id=chat_id, message_ids=message_ids
+            )
+            for chat_id, message_ids in message_ids_by_chat.items()
+        )
+        await asyncio.gather(*updates)
+        return None
+
+    async def _fetch_and_update(
+        self, custom_client: CustomClient, chat_id: int, message_ids: list[int]
+    ) -> None:
+        """
+        Fetches messages of a chat with one request and updates them concurrently
+        """
+        messages: list[Message] = await self._get_messages_from_client(
+            custom_client=custom_client, chat_id=chat_id, message_ids=message_ids
+        )
+        for message in messages:
+            custom_client.msg_store.remember(key=(chat_id, message.id), message=message)
+        await asyncio.gather(
+            *(
+                self._update_traced(custom_client=custom_client, message=message)
+                for message in messages
+            )
+        )
+        return None
+
+    async def _update_traced(
+        self, custom_client: CustomClient, message: Message
+    ) -> None:
+        trace: Trace = custom_client.tracer.start(name="update")
+        trace.mark("pick_message")
+        await self._update_message(
+            custom_client=custom_client, message=message, trace=trace
+        )
+        trace.finish()
+        return None
+
+    # pylint: disable=R0911
+    async def _update_message(
+        self, custom_client: CustomClient, message: Message, trace: Trace
+    ) -> None:
+        """
+        Places a different set of emojis on a previously processed message
+        """
         chat_id: int | None = self._chat_id_from_msg(message=message)
         if chat_id is None:
             return None
 
+        trace.set(chat_id=chat_id)
+
+        # chat info may have expired since the message was remembered
+        try:
+            await self._write_chat_info_from_id(
+                custom_client=custom_client, chat_id=chat_id
+            )
+        except RPCError as e:
+            logger.error(f"Chat info was not retrieved for chat {chat_id}. id: {e.ID}")
+            return None
+
+        # a missing chat info is not a chat without reactions,
+        # the message stays eligible until the info is retrieved
+        if chat_id not in custom_client.chat_info_map:
+            return None
+
         emoticons_allowed: Sequence[str] = self._chat_emoticons_from_chat_id(
             custom_client=custom_client, chat_id=chat_id
         )
         # we don't want to update no or single emoji
         if len(emoticons_allowed) < 2:
+            self._skip_message(
+                custom_client=custom_client, chat_id=chat_id, message=message
+            )
             return None
 
         sender_id: int | None = self._sender_id_from_message(message=message)
         if sender_id is None:
+            self._skip_message(
+                custom_client=custom_client, chat_id=chat_id, message=message
+            )
             return None
 
         response_emoticons: Sequence[str] = self._get_response_emoticons(
             custom_client=custom_client,
+            chat_id=chat_id,
             emoticons_allowed=emoticons_allowed,
             sender_id=sender_id,
         )
         if not response_emoticons:
+            self._skip_message(
+                custom_client=custom_client, chat_id=chat_id, message=message
+            )
             return None
 
-        msg_emoticons: Sequence[str] | None = self._msg_emoticons_from_msg(
-            message=message
+        msg_emoticons: Sequence[str] | None = self._current_emoticons(
+            custom_client=custom_client, chat_id=chat_id, message=message
         )
         if msg_emoticons is None:
             return None
 
+        # the response emoticons are memoized as a mask by _get_response_emoticons
+        response_mask: int | None = custom_client.emoticon_index.get_mask(
+            chat_id=chat_id,
+            is_friend=self._sender_is_friend(
+                custom_client=custom_client, sender_id=sender_id
+            ),
+        )
+        if response_mask is None:
+            response_mask = emoticon_registry.mask(response_emoticons)
         # we don't want to place the same emojis
-        if set(response_emoticons) <= set(msg_emoticons):
+        if emoticon_registry.is_subset(
+            response_mask, of=emoticon_registry.mask(msg_emoticons)
+        ):
+            self._skip_message(
+                custom_client=custom_client, chat_id=chat_id, message=message
+            )
             return None
 
         new_response_emoticons: Sequence[str] = self._generate_different_emoticons(
@@ -528,10 +1028,22 @@ class MessageEmojiManager:
         response_emojis: Sequence[ReactionEmoji] = self._convert_emoticons_to_emojis(
             emoticons=new_response_emoticons
         )
+        trace.mark("emoticons")
+        trace.set(message_id=message.id)
+        try:
+            await self._write_chat_peer_from_id(
+                custom_client=custom_client, chat_id=chat_id
+            )
+        except RPCError as e:
+            logger.error(f"Chat peer was not retrieved for chat {chat_id}. id: {e.ID}")
+            return None
+
         chat_peer: Peer | None = self._peer_from_chat_id(  # type: ignore
             custom_client=custom_client, chat_id=chat_id
         )
-        if chat_peer is None:
+        if chat_peer is None or FloodWaitManager.delay(
+            custom_client=custom_client, method="SendReaction", chat_id=chat_id
+        ):
             return None
 
         try:
@@ -543,65 +1055,157 @@ class MessageEmojiManager:
                 emojis=response_emojis,
             )
         except (
+            FloodWait,
             ReactionInvalid,
             MessageNotModified,
             MessageIdInvalid,
             BadRequest,
             NotAcceptable,
-        ):
+        ) as e:
+            trace.mark("send")
+            trace.set(outcome=type(e).__name__)
             return None
 
         else:
+            trace.mark("send")
+            custom_client.reaction_mirror.record_sent(
+                chat_id=chat_id, message_id=message.id, emoticons=new_response_emoticons
+            )
             self._log_method_success(
                 method_name="update",
                 custom_client=custom_client,
                 message=message,
                 picked_response_emoticons=new_response_emoticons,
             )
+            trace.mark("log")
+            trace.set(outcome="sent")
             return None
 
-    async def _get_random_msg_from_queue(
+    @staticmethod
+    def _skip_message(
+        custom_client: CustomClient, chat_id: int, message: Message
+    ) -> None:
+        """
+        Keeps a message away from updates until its chat or reactions change
+        """
+        message_id: int | None = getattr(message, "id", None)
+        if message_id is not None:
+            custom_client.msg_store.set_eligible(
+                key=(chat_id, message_id), is_eligible=False
+            )
+        return None
+
+    async def _get_random_msg_from_store(
         self, custom_client: CustomClient
     ) -> Message | None:
         """
-        Returns random message from a custom client message queue with ids tuples
+        Returns a random message eligible for updates from the message store
         """
-        if not custom_client.msg_queue:
+        msg_key: MessageKey | None = custom_client.msg_store.choice()
+        if msg_key is None:
             return None
 
-        msg_queue_container: tuple[int] = random.choice(  # nosec
-            custom_client.msg_queue
-        )
-        message: Message | None = custom_client.msg_keeper.get(
-            msg_queue_container, None
-        )
+        message: Message | None = custom_client.msg_store.get(key=msg_key)
         if message:
             return message
 
         message = await self._get_message_from_client(
-            custom_client=custom_client, msg_queue_container=msg_queue_container
+            custom_client=custom_client, msg_key=msg_key
         )
         if message is None:
             return None
 
-        custom_client.msg_keeper.setdefault(key=msg_queue_container, default=message)
+        custom_client.msg_store.remember(key=msg_key, message=message)
         return message
 
     @staticmethod
     async def _get_message_from_client(
-        custom_client: CustomClient, msg_queue_container: tuple[int]
+        custom_client: CustomClient, msg_key: MessageKey
     ) -> Message | None:
         """
         Returns a message through a client request with ids tuple
         """
-        while True:
-            try:
-                message: Message | list[Message] = await custom_client.get_messages(
-                    *msg_queue_container
+        chat_id: int = msg_key[0]
+        # the next scheduled update will pick a message again
+        if FloodWaitManager.delay(
+            custom_client=custom_client, method="GetMessages", chat_id=chat_id
+        ):
+            return None
+
+        await custom_client.rate_limiter.acquire(chat_id=chat_id)
+        try:
+            message: Message | list[Message] = await custom_client.recorder.call(
+                method="GetMessages",
+                chat_id=chat_id,
+                func=partial(custom_client.get_messages, *msg_key),
+            )
+        except FloodWait as f:
+            FloodWaitManager.handle(
+                f, custom_client=custom_client, method="GetMessages", chat_id=chat_id
+            )
+            return None
+
+        if not isinstance(message, Message):
+            return None
+
+        # deleted messages come back empty
+        if message.empty:
+            MessageEmojiManager._forget_message(
+                custom_client=custom_client, msg_key=msg_key
+            )
+            return None
+
+        return message
+
+    @staticmethod
+    async def _get_messages_from_client(
+        custom_client: CustomClient, chat_id: int, message_ids: list[int]
+    ) -> list[Message]:
+        """
+        Returns existing messages of a chat with given ids through one client request
+        """
+        if FloodWaitManager.delay(
+            custom_client=custom_client, method="GetMessages", chat_id=chat_id
+        ):
+            return []
+
+        await custom_client.rate_limiter.acquire(chat_id=chat_id)
+        try:
+            messages: Message | list[Message] = await custom_client.recorder.call(
+                method="GetMessages",
+                chat_id=chat_id,
+                func=partial(custom_client.get_messages, chat_id, message_ids),
+            )
+        except FloodWait as f:
+            FloodWaitManager.handle(
+                f, custom_client=custom_client, method="GetMessages", chat_id=chat_id
+            )
+            return []
+
+        if isinstance(messages, Message):
+            messages = [messages]
+        # deleted messages come back empty
+        existing_messages: list[Message] = [
+            message
+            for message in messages
+            if isinstance(message, Message) and not message.empty
+        ]
+        existing_ids: set[int] = {message.id for message in existing_messages}
+        for message_id in message_ids:
+            if message_id not in existing_ids:
+                MessageEmojiManager._forget_message(
+                    custom_client=custom_client, msg_key=(chat_id, message_id)
                 )
-                return message if isinstance(message, Message) else None
-            except FloodWait as f:
-                await FloodWaitManager.handle(f, custom_client=custom_client)
+        return existing_messages
+
+    @staticmethod
+    def _forget_message(custom_client: CustomClient, msg_key: MessageKey) -> None:
+        """
+        Forgets a deleted message, so updates don't pick it again
+        """
+        custom_client.msg_store.remove(key=msg_key)
+        custom_client.reaction_mirror.forget(chat_id=msg_key[0], message_id=msg_key[1])
+        return None
 
     @staticmethod
     def _generate_different_emoticons(
@@ -621,18 +1225,56 @@ class MessageEmojiManager:
             )
             raise ValueError
 
-        msg_emoticons_set: set[str] = set(msg_emoticons)
+        # unknown reactions on the message never match the picked ones
+        msg_mask: int | None = emoticon_registry.exact_mask(msg_emoticons)
         while True:
-            new_picked_response_emoticons_set: set[str] = set(
+            new_picked_response_emoticons: Sequence[str] = (
                 custom_client.emoticon_picker(response_emoticons)
             )
-            if msg_emoticons_set == new_picked_response_emoticons_set:
+            new_picked_mask: int = emoticon_registry.mask(new_picked_response_emoticons)
+            if msg_mask == new_picked_mask:
                 logger.info(
                     "The generated emoticons are the same as previously placed.\n"
                     "Generating a different set of emoticons..."
                 )
             else:
-                return list(new_picked_response_emoticons_set)
+                return list(dict.fromkeys(new_picked_response_emoticons))
+
+    def _current_emoticons(
+        self, custom_client: CustomClient, chat_id: int, message: Message
+    ) -> Sequence[str] | None:
+        """
+        Returns reactions placed on a message according to the reaction mirror,
+        a message snapshot starts the mirroring if the message is not mirrored
+        """
+        message_id: int | None = getattr(message, "id", None)
+        if message_id is None:
+            return self._msg_emoticons_from_msg(message=message)
+
+        msg_emoticons: Sequence[str] | None = custom_client.reaction_mirror.emoticons(
+            chat_id=chat_id, message_id=message_id
+        )
+        if msg_emoticons is not None:
+            return msg_emoticons
+
+        msg_emoticons = self._msg_emoticons_from_msg(message=message)
+        if msg_emoticons is not None:
+            custom_client.reaction_mirror.track(
+                chat_id=chat_id,
+                message_id=message_id,
+                reactions=self._msg_reactions_from_msg(message=message) or (),
+            )
+        return msg_emoticons
+
+    @staticmethod
+    def _msg_reactions_from_msg(message: Message | None) -> Sequence[Reaction] | None:
+        """
+        Returns placed reactions with their counts from a given message
+        """
+        if message is None or getattr(message, "reactions", None) is None:
+            return None
+
+        return message.reactions.reactions or ()  # type: ignore
 
     @staticmethod
     def _msg_emoticons_from_msg(message: Message | None) -> Sequence[str] | None:
@@ -0,0 +1,354 @@
+import random
+from collections import OrderedDict, deque
+from typing import Generic, Hashable, Iterable, Iterator, TypeVar
+
+from pyrogram.types import Message
+
+# (chat id, message id)
+MessageKey = tuple[int, int]
+# (chat id, sender id)
+Partition = tuple[int, int]
+T = TypeVar("T", bound=Hashable)
+
+
+class IndexedSet(Generic[T]):
+    """
+    A set with O(1) add, discard and random choice
+
+    Items are kept in a list and a dict maps each item to its position,
+    a discarded item is replaced by the last one
+    """
+
+    def __init__(self) -> None:
+        self._items: list[T] = []
+        self._positions: dict[T, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def add(self, item: T) -> None:
+        if item in self._positions:
+            return None
+
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+        return None
+
+    def discard(self, item: T) -> None:
+        position: int | None = self._positions.pop(item, None)
+        if position is None:
+            return None
+
+        last_item: T = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last_item
+            self._positions[last_item] = position
+        return None
+
+    def choice(self) -> T:
+        """
+        Returns a random item, raises IndexError if the set is empty
+        """
+        return random.choice(self._items)  # nosec
+
+    def sample(self, k: int) -> list[T]:
+        """
+        Returns up to k different random items
+        """
+        return random.sample(self._items, k=min(k, len(self._items)))  # nosec
+
+
+def round_robin(iterables: Iterable[Iterable[T]]) -> Iterator[T]:
+    """
+    Yields an item of each iterable in turn until all of them are exhausted
+    """
+    iterators: deque[Iterator[T]] = deque(map(iter, iterables))
+    while iterators:
+        iterator: Iterator[T] = iterators.popleft()
+        for item in iterator:
+            yield item
+            iterators.append(iterator)
+            break
+
+
+# pylint: disable=R0902
+class MessageStore:
+    """
+    Remembers reacted messages for updates, partitioned by chat and by sender.
+    A message object is kept once it is known
+
+    The oldest messages are forgotten beyond `maxsize` in total, `chat_maxsize`
+    in a chat or `sender_maxsize` of a sender in a chat, so a busy chat or
+    a chatty sender doesn't push the others out
+
+    Adding, removal and random choice are O(1). Messages that can't be
+    updated for now are kept out of the eligible subset, so updates don't pick them.
+    Updates pick a chat first, then a sender in it, then a message of the sender
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        chat_maxsize: int | None = None,
+        sender_maxsize: int | None = None,
+    ) -> None:
+        self.maxsize: int = maxsize
+        self.chat_maxsize: int | None = chat_maxsize
+        self.sender_maxsize: int | None = sender_maxsize
+        # in the order of adding, in total, per chat and per partition
+        self._messages: OrderedDict[MessageKey, Message | None] = OrderedDict()
+        self._chat_keys: dict[int, OrderedDict[MessageKey, None]] = {}
+        self._partition_keys: dict[Partition, OrderedDict[MessageKey, None]] = {}
+        self._senders: dict[MessageKey, int] = {}
+        # only partitions and chats having eligible messages are kept
+        self._eligible: dict[Partition, IndexedSet[MessageKey]] = {}
+        self._eligible_partitions: dict[int, IndexedSet[Partition]] = {}
+        self._eligible_chats: IndexedSet[int] = IndexedSet()
+        self._eligible_count: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._messages
+
+    def __iter__(self) -> Iterator[MessageKey]:
+        return iter(self._messages)
+
+    def senders(self) -> Iterator[tuple[MessageKey, int]]:
+        """
+        Returns messages with their senders from the oldest to the newest
+        """
+        return ((key, self._senders[key]) for key in self._messages)
+
+    def messages(self) -> Iterator[Message]:
+        """
+        Returns known message objects from the oldest to the newest
+        """
+        return (message for message in self._messages.values() if message is not None)
+
+    @property
+    def eligible(self) -> int:
+        """
+        Returns the number of messages updates can pick
+        """
+        return self._eligible_count
+
+    @property
+    def chats(self) -> int:
+        """
+        Returns the number of chats having messages updates can pick
+        """
+        return len(self._eligible_chats)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the share of `get` calls that found a message object
+        """
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def add(
+        self, key: MessageKey, sender_id: int = 0, message: Message | None = None
+    ) -> None:
+        """
+        Remembers a message as the newest one and makes it eligible for updates,
+        `sender_id` 0 stands for an unknown sender
+        """
+        if key in self._messages:
+            partition: Partition = (key[0], self._senders[key])
+            self._messages.move_to_end(key)
+            self._chat_keys[key[0]].move_to_end(key)
+            self._partition_keys[partition].move_to_end(key)
+            if message is not None:
+                self._messages[key] = message
+        else:
+            partition = (key[0], sender_id)
+            self._messages[key] = message
+            self._senders[key] = sender_id
+            self._chat_keys.setdefault(key[0], OrderedDict())[key] = None
+            self._partition_keys.setdefault(partition, OrderedDict())[key] = None
+            self._evict(chat_id=key[0], partition=partition)
+        self._mark_eligible(key=key)
+        return None
+
+    def _evict(self, chat_id: int, partition: Partition) -> None:
+        """
+        Forgets the oldest messages of a partition, a chat and in total
+        beyond their limits
+        """
+        for keys, maxsize in (
+            (self._partition_keys[partition], self.sender_maxsize),
+            (self._chat_keys[chat_id], self.chat_maxsize),
+            (self._messages, self.maxsize),
+        ):
+            while maxsize is not None and len(keys) > maxsize:
+                self.remove(key=next(iter(keys)))
+                self.evictions += 1
+        return None
+
+    def get(self, key: MessageKey) -> Message | None:
+        """
+        Returns a remembered message object if it is known
+        """
+        message: Message | None = self._messages.get(key, None)
+        if message is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return message
+
+    def remember(self, key: MessageKey, message: Message) -> None:
+        """
+        Keeps a fetched message object of a remembered message
+        """
+        if key in self._messages and self._messages[key] is None:
+            self._messages[key] = message
+        return None
+
+    def remove(self, key: MessageKey) -> None:
+        if key not in self._messages:
+            return None
+
+        self._unmark_eligible(key=key)
+        del self._messages[key]
+        partition: Partition = (key[0], self._senders.pop(key))
+        self._discard_key(index=self._chat_keys, index_key=key[0], key=key)
+        self._discard_key(index=self._partition_keys, index_key=partition, key=key)
+        return None
+
+    def remove_chat(self, chat_id: int) -> None:
+        """
+        Forgets all messages of a chat, e.g. when it is no longer allowed
+        """
+        for key in list(self._chat_keys.get(chat_id, ())):
+            self.remove(key=key)
+        return None
+
+    def remove_sender(self, sender_id: int) -> None:
+        """
+        Forgets messages of a sender in all chats, e.g. when it is not a target anymore
+        """
+        partitions: list[Partition] = [
+            partition for partition in self._partition_keys if partition[1] == sender_id
+        ]
+        for partition in partitions:
+            for key in list(self._partition_keys[partition]):
+                self.remove(key=key)
+        return None
+
+    @staticmethod
+    def _discard_key(index: dict, index_key: Hashable, key: MessageKey) -> None:
+        keys: OrderedDict[MessageKey, None] = index[index_key]
+        del keys[key]
+        if not keys:
+            del index[index_key]
+        return None
+
+    def choice(self) -> MessageKey | None:
+        """
+        Returns a random message eligible for updates of a random sender
+        in a random chat
+        """
+        if not self._eligible_chats:
+            return None
+
+        chat_id: int = self._eligible_chats.choice()
+        partition: Partition = self._eligible_partitions[chat_id].choice()
+        return self._eligible[partition].choice()
+
+    def sample(self, k: int) -> list[MessageKey]:
+        """
+        Returns up to k different random messages eligible for updates,
+        taking turns between chats and between senders in each chat
+        """
+        chat_samples: Iterator[Iterator[MessageKey]] = (
+            self._sample_chat(chat_id=chat_id, k=k)
+            for chat_id in self._eligible_chats.sample(k=k)
+        )
+        sample: list[MessageKey] = []
+        for key in round_robin(chat_samples):
+            sample.append(key)
+            if len(sample) == k:
+                break
+        return sample
+
+    def _sample_chat(self, chat_id: int, k: int) -> Iterator[MessageKey]:
+        """
+        Yields up to k random messages of a chat taking turns between senders,
+        messages are sampled once the chat's turn comes
+        """
+        yield from round_robin(
+            self._sample_partition(partition=partition, k=k)
+            for partition in self._eligible_partitions[chat_id].sample(k=k)
+        )
+
+    def _sample_partition(self, partition: Partition, k: int) -> Iterator[MessageKey]:
+        yield from self._eligible[partition].sample(k=k)
+
+    def set_eligible(self, key: MessageKey, is_eligible: bool) -> None:
+        if not is_eligible:
+            self._unmark_eligible(key=key)
+        elif key in self._messages:
+            self._mark_eligible(key=key)
+        return None
+
+    def _mark_eligible(self, key: MessageKey) -> None:
+        partition: Partition = (key[0], self._senders[key])
+        keys: IndexedSet[MessageKey] | None = self._eligible.get(partition, None)
+        if keys is None:
+            keys = self._eligible[partition] = IndexedSet()
+            self._eligible_partitions.setdefault(key[0], IndexedSet()).add(partition)
+            self._eligible_chats.add(key[0])
+        if key not in keys:
+            keys.add(key)
+            self._eligible_count += 1
+        return None
+
+    def _unmark_eligible(self, key: MessageKey) -> None:
+        sender_id: int | None = self._senders.get(key, None)
+        if sender_id is None:
+            return None
+
+        partition: Partition = (key[0], sender_id)
+        keys: IndexedSet[MessageKey] | None = self._eligible.get(partition, None)
+        if keys is None or key not in keys:
+            return None
+
+        keys.discard(key)
+        self._eligible_count -= 1
+        if keys:
+            return None
+
+        # the partition has nothing to pick anymore
+        del self._eligible[partition]
+        partitions: IndexedSet[Partition] = self._eligible_partitions[key[0]]
+        partitions.discard(partition)
+        if not partitions:
+            del self._eligible_partitions[key[0]]
+            self._eligible_chats.discard(key[0])
+        return None
+
+    def reset_chat(self, chat_id: int) -> None:
+        """
+        Makes messages of a chat eligible again, e.g. after its settings changed
+        """
+        for key in self._chat_keys.get(chat_id, ()):
+            self._mark_eligible(key=key)
+        return None
+
+    def reset(self) -> None:
+        for key in self._messages:
+            self._mark_eligible(key=key)
+        return None
@@ -0,0 +1,188 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator, Mapping, Sequence
+
+METRICS_PREFIX: str = "clownizer_"
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+METRICS_HELP: dict[str, str] = {
+    "handler_seconds": "Time spent processing a message or an update",
+    "send_reaction_seconds": "SendReaction round-trip time",
+    "floodwait_total": "FloodWait errors received",
+    "floodwait_seconds_total": "Seconds to wait requested by FloodWait errors",
+    "cache_hits_total": "Cache lookups that found a live entry",
+    "cache_misses_total": "Cache lookups that found nothing",
+    "cache_evictions_total": "Cache entries evicted to stay within the size",
+    "cache_expirations_total": "Cache entries dropped after their TTL",
+    "cache_hit_ratio": "Share of cache lookups that found a live entry",
+    "msg_store_depth": "Messages remembered for updates",
+    "msg_store_eligible": "Remembered messages updates can pick",
+    "msg_store_chats": "Chats having messages updates can pick",
+    "reaction_sender_depth": "Reactions waiting to be sent",
+    "reaction_sender_processed_total": "Reactions passed to the sender handler",
+    "reaction_sender_dropped_total": "Reactions dropped as the send queue was full",
+    "reaction_sender_latency_seconds": "Time from queueing a reaction to finishing it",
+    "requests_coalesced_total": "Chat requests shared with a concurrent caller",
+    "deferred_queue_depth": "Reactions waiting for a FloodWait to end",
+    "scheduler_runs_total": "Scheduled job runs",
+    "scheduler_skips_total": "Scheduled job runs skipped as missed or overlapping",
+    "config_reloads_total": "Config reloads by outcome",
+    "boot_phase_seconds": "Time spent in a boot phase at the last startup",
+    "boot_seconds": "Time from the process start until the app was ready",
+    "worker_up": "Whether the worker process of an account is running",
+    "worker_restarts_total": "Restarts of the worker process of an account",
+}
+
+
+class Histogram:
+    """
+    Counts observed values in cumulative buckets (Prometheus histogram)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # the last slot is for values above the largest bucket
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        return None
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        """
+        Returns the exposition lines of the histogram
+        """
+        separator: str = "," if labels else ""
+        lines: list[str] = []
+        cumulative: int = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{Metrics.braces(labels)} {self.sum}")
+        lines.append(f"{name}_count{Metrics.braces(labels)} {self.count}")
+        return lines
+
+
+class Metrics:
+    """
+    Keeps counters and latency histograms in Prometheus text format
+
+    Samples are keyed by a metric name and a rendered label set,
+    e.g. ("handler_seconds", 'method="respond"')
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_BUCKETS, base_labels: str = ""
+    ) -> None:
+        self.buckets: Sequence[float] = buckets
+        # added to the labels of every sample, e.g. account="alice"
+        self.base_labels: str = base_labels
+        self.counters: defaultdict[str, dict[str, float]] = defaultdict(dict)
+        self.histograms: defaultdict[str, dict[str, Histogram]] = defaultdict(dict)
+
+    def child(self, **labels: object) -> "Metrics":
+        """
+        Returns metrics writing to the samples of these ones with extra labels,
+        so several accounts are rendered together
+        """
+        child: Metrics = Metrics(
+            buckets=self.buckets, base_labels=self.with_base(self.labels(**labels))
+        )
+        child.counters = self.counters
+        child.histograms = self.histograms
+        return child
+
+    def with_base(self, labels: str) -> str:
+        """
+        Returns labels with the base labels in front
+        """
+        return ",".join(filter(None, (self.base_labels, labels)))
+
+    @staticmethod
+    def labels(**labels: object) -> str:
+        """
+        Renders labels, e.g. method="respond"
+        """
+        return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+    @staticmethod
+    def braces(labels: str) -> str:
+        return f"{{{labels}}}" if labels else ""
+
+    def inc(self, name: str, value: float = 1.0, labels: str = "") -> None:
+        labels = self.with_base(labels)
+        samples: dict[str, float] = self.counters[name]
+        samples[labels] = samples.get(labels, 0.0) + value
+        return None
+
+    def observe(self, name: str, value: float, labels: str = "") -> None:
+        labels = self.with_base(labels)
+        samples: dict[str, Histogram] = self.histograms[name]
+        if labels not in samples:
+            samples[labels] = Histogram(buckets=self.buckets)
+        samples[labels].observe(value)
+        return None
+
+    @contextmanager
+    def measure(self, name: str, labels: str = "") -> Iterator[None]:
+        """
+        Observes the time spent in the block, whether it raises or not
+        """
+        started_at: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, labels=labels)
+
+    @classmethod
+    def format_samples(
+        cls, name: str, kind: str, samples: Mapping[str, float]
+    ) -> list[str]:
+        """
+        Returns exposition lines of a counter or a gauge with given samples
+        """
+        full_name: str = f"{METRICS_PREFIX}{name}"
+        lines: list[str] = [
+            f"# HELP {full_name} {METRICS_HELP.get(name, name)}",
+            f"# TYPE {full_name} {kind}",
+        ]
+        lines.extend(
+            f"{full_name}{cls.braces(labels)} {value}"
+            for labels, value in samples.items()
+        )
+        return lines
+
+    def render(self) -> list[str]:
+        """
+        Returns exposition lines of all counters and histograms
+        """
+        lines: list[str] = []
+        for name, counter_samples in self.counters.items():
+            lines.extend(self.format_samples(name, "counter", counter_samples))
+        for name, histogram_samples in self.histograms.items():
+            full_name: str = f"{METRICS_PREFIX}{name}"
+            lines.append(f"# HELP {full_name} {METRICS_HELP.get(name, name)}")
+            lines.append(f"# TYPE {full_name} histogram")
+            for labels, histogram in histogram_samples.items():
+                lines.extend(histogram.samples(name=full_name, labels=labels))
+        return lines
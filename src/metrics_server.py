@@ -0,0 +1,230 @@
+import asyncio
+import inspect
+from collections import Counter
+from functools import partial
+from typing import Awaitable, Callable, Sequence
+
+from src.boot import BootReport
+from src.custom_client import CustomClient
+from src.custom_scheduler import CustomScheduler
+from src.loggers import logger
+from src.metrics import Metrics
+
+
+class MetricsServer:
+    """
+    Serves client metrics in Prometheus text format over plain HTTP
+    """
+
+    @classmethod
+    async def start(
+        cls,
+        custom_clients: Sequence[CustomClient],
+        boot_report: BootReport | None = None,
+    ) -> asyncio.Server | None:
+        """
+        Starts serving metrics of all clients if the port is set in the settings
+        of the first one
+        """
+        custom_client: CustomClient = custom_clients[0]
+        port: int | None = custom_client.user_settings.metrics_port
+        if port is None:
+            return None
+
+        return await cls.serve(
+            host=custom_client.user_settings.metrics_host,
+            port=port,
+            render=partial(
+                cls.render, custom_clients=custom_clients, boot_report=boot_report
+            ),
+        )
+
+    @classmethod
+    async def serve(
+        cls, host: str, port: int, render: Callable[[], str | Awaitable[str]]
+    ) -> asyncio.Server | None:
+        """
+        Starts serving the text returned by `render` on every request
+        """
+        try:
+            server: asyncio.Server = await asyncio.start_server(
+                partial(cls._handle, render), host=host, port=port
+            )
+        except OSError as e:
+            logger.error(f"Metrics endpoint was not started! {e}")
+            return None
+
+        logger.success(f"Metrics are served at http://{host}:{port}/metrics")
+        return server
+
+    @classmethod
+    def render(
+        cls,
+        custom_clients: Sequence[CustomClient],
+        boot_report: BootReport | None = None,
+    ) -> str:
+        """
+        Returns the metrics of all clients in Prometheus text format,
+        the metrics of each account are told apart by their base labels
+        """
+        # the clients share one registry of counters and histograms
+        lines: list[str] = custom_clients[0].metrics.render()
+        caches: dict[str, object] = cls._caches(custom_clients=custom_clients)
+        for name, attribute in (
+            ("cache_hits_total", "hits"),
+            ("cache_misses_total", "misses"),
+            ("cache_evictions_total", "evictions"),
+            ("cache_expirations_total", "expirations"),
+        ):
+            lines.extend(
+                Metrics.format_samples(
+                    name,
+                    "counter",
+                    {
+                        labels: getattr(cache, attribute)
+                        for labels, cache in caches.items()
+                        # only TTL caches expire entries
+                        if hasattr(cache, attribute)
+                    },
+                )
+            )
+        lines.extend(
+            Metrics.format_samples(
+                "cache_hit_ratio",
+                "gauge",
+                {
+                    labels: getattr(cache, "hit_rate", 0.0)
+                    for labels, cache in caches.items()
+                },
+            )
+        )
+        for name, depth in (
+            ("msg_store_depth", lambda client: len(client.msg_store)),
+            ("msg_store_eligible", lambda client: client.msg_store.eligible),
+            ("msg_store_chats", lambda client: client.msg_store.chats),
+            ("reaction_sender_depth", lambda client: client.reaction_sender.depth),
+            ("deferred_queue_depth", lambda client: len(client.deferred_queue)),
+        ):
+            lines.extend(
+                Metrics.format_samples(
+                    name,
+                    "gauge",
+                    {
+                        custom_client.metrics.base_labels: depth(custom_client)
+                        for custom_client in custom_clients
+                    },
+                )
+            )
+        for name, count in (
+            (
+                "reaction_sender_processed_total",
+                lambda client: client.reaction_sender.processed,
+            ),
+            (
+                "reaction_sender_dropped_total",
+                lambda client: client.reaction_sender.dropped,
+            ),
+            ("requests_coalesced_total", lambda client: client.in_flight.coalesced),
+        ):
+            lines.extend(
+                Metrics.format_samples(
+                    name,
+                    "counter",
+                    {
+                        custom_client.metrics.base_labels: count(custom_client)
+                        for custom_client in custom_clients
+                    },
+                )
+            )
+        schedulers: list[CustomScheduler] = list(
+            dict.fromkeys(custom_client.scheduler for custom_client in custom_clients)
+        )
+        for name, attribute in (
+            ("scheduler_runs_total", "runs"),
+            ("scheduler_skips_total", "skips"),
+        ):
+            lines.extend(
+                Metrics.format_samples(
+                    name,
+                    "counter",
+                    {
+                        Metrics.labels(job=job_id): n
+                        for scheduler in schedulers
+                        for job_id, n in getattr(scheduler, attribute).items()
+                    },
+                )
+            )
+        if boot_report is not None:
+            lines.extend(boot_report.samples())
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _caches(custom_clients: Sequence[CustomClient]) -> dict[str, object]:
+        """
+        Returns caches of all clients by labels, a cache shared by
+        several clients is rendered once without the account labels
+        """
+        client_caches: list[tuple[CustomClient, str, object]] = [
+            (custom_client, cache_name, cache)
+            for custom_client in custom_clients
+            for cache_name, cache in (
+                ("chat_info_map", custom_client.chat_info_map),
+                ("chat_peer_map", custom_client.chat_peer_map),
+                ("msg_store", custom_client.msg_store),
+                ("reaction_mirror", custom_client.reaction_mirror.states),
+            )
+        ]
+        owners: Counter = Counter(id(cache) for _, _, cache in client_caches)
+        return {
+            (
+                Metrics.labels(cache=cache_name)
+                if owners[id(cache)] > 1
+                else custom_client.metrics.with_base(Metrics.labels(cache=cache_name))
+            ): cache
+            for custom_client, cache_name, cache in client_caches
+        }
+
+    @classmethod
+    async def _handle(
+        cls,
+        render: Callable[[], str | Awaitable[str]],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """
+        Answers a single HTTP request and closes the connection
+        """
+        try:
+            request_line: bytes = await asyncio.wait_for(reader.readline(), timeout=5)
+            # skip the headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return None
+
+        method, _, rest = request_line.decode("latin-1").partition(" ")
+        path: str = rest.split(" ", 1)[0]
+        if method == "GET" and path in ("/", "/metrics"):
+            status: str = "200 OK"
+            text: str | Awaitable[str] = render()
+            if inspect.isawaitable(text):
+                text = await text
+            body: bytes = text.encode()
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        return None
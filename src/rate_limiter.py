@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from cachetools import LRUCache
+
+
+# pylint: disable=R0903
+class TokenBucket:
+    """
+    Allows `rate` calls per second with bursts of up to `capacity` calls
+    """
+
+    def __init__(
+        self, rate: float, capacity: float, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self.timer: Callable[[], float] = timer
+        self.tokens: float = capacity
+        self.updated_at: float = timer()
+
+    def reserve(self, factor: float = 1.0) -> float:
+        """
+        Takes a token in advance
+        Returns the delay before the token is available at `factor` of the rate
+        """
+        now: float = self.timer()
+        rate: float = self.rate * factor
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / rate
+
+
+# pylint: disable=R0902
+class RateLimiter:
+    """
+    Limits Telegram requests with a global and per-chat token buckets
+
+    The rate shrinks on FloodWait and slowly recovers afterwards
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        *,
+        rate: float,
+        chat_rate: float,
+        burst: int,
+        min_factor: float = 0.1,
+        recovery_time: float = 600,
+        max_chats: int = 1000,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.chat_rate: float = chat_rate
+        self.burst: int = burst
+        self.min_factor: float = min_factor
+        self.recovery_time: float = recovery_time
+        self.timer: Callable[[], float] = timer
+        self.global_bucket: TokenBucket = TokenBucket(
+            rate=rate, capacity=burst, timer=timer
+        )
+        self.chat_buckets: LRUCache = LRUCache(maxsize=max_chats)
+        self.penalty: float = 0.0
+        self.penalized_at: float = timer()
+        self.delays: int = 0
+
+    @property
+    def factor(self) -> float:
+        """
+        Returns the current share of the configured rates
+        A penalty is forgiven linearly over the recovery time
+        """
+        recovered: float = (self.timer() - self.penalized_at) / self.recovery_time
+        penalty: float = max(0.0, self.penalty - recovered)
+        return max(self.min_factor, 1.0 - penalty)
+
+    def penalize(self) -> None:
+        """
+        Halves the current rates after a FloodWait
+        """
+        factor: float = self.factor
+        self.penalty = 1.0 - max(self.min_factor, factor / 2)
+        self.penalized_at = self.timer()
+        return None
+
+    async def acquire(self, chat_id: int | None = None) -> None:
+        """
+        Waits until a request (to a chat with a given id) is allowed
+        """
+        factor: float = self.factor
+        delay: float = self.global_bucket.reserve(factor=factor)
+        if chat_id is not None:
+            chat_bucket: TokenBucket | None = self.chat_buckets.get(chat_id, None)
+            if chat_bucket is None:
+                chat_bucket = TokenBucket(
+                    rate=self.chat_rate, capacity=self.burst, timer=self.timer
+                )
+                self.chat_buckets[chat_id] = chat_bucket
+            delay = max(delay, chat_bucket.reserve(factor=factor))
+
+        if delay > 0:
+            self.delays += 1
+            await asyncio.sleep(delay)
+        return None
+
+    async def call(
+        self, chat_id: int | None, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Calls a function once a request to a chat with a given id is allowed
+        """
+        await self.acquire(chat_id=chat_id)
+        return await func()
@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Any, Sequence
+
+from pyrogram.raw.types import MessageReactions
+from pyrogram.types import Reaction
+
+from src.stats_cache import StatsLRUCache
+
+
+# pylint: disable=R0903
+class ReactionState:
+    """
+    Reaction counts of a message and the reactions placed by the client
+    """
+
+    def __init__(self, counts: Counter, chosen: Sequence[str] = ()) -> None:
+        self.counts: Counter = counts
+        self.chosen: tuple[str, ...] = tuple(chosen)
+
+
+class ReactionMirror:
+    """
+    Keeps the current reactions of remembered messages by (chat id, message id)
+
+    The state follows reactions sent by the client and raw reaction updates,
+    so updates don't have to fetch messages to see their reactions
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.states: StatsLRUCache = StatsLRUCache(maxsize=maxsize)
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.states
+
+    def emoticons(self, chat_id: int, message_id: int) -> tuple[str, ...] | None:
+        """
+        Returns emoticons placed on a message or None if it is not mirrored
+        """
+        state: ReactionState | None = self.states.get((chat_id, message_id), None)
+        if state is None:
+            return None
+
+        return tuple(state.counts)
+
+    def track(
+        self, chat_id: int, message_id: int, reactions: Sequence[Reaction]
+    ) -> None:
+        """
+        Starts mirroring a message from a snapshot of its reactions,
+        the reactions with `chosen_order` are placed by the client
+        """
+        if (chat_id, message_id) in self.states:
+            return None
+
+        emoji_reactions: list[Reaction] = [
+            reaction for reaction in reactions if getattr(reaction, "emoji", None)
+        ]
+        # chosen order -> emoticon of the reactions placed by the client
+        chosen: dict[int, str] = {
+            reaction.chosen_order: reaction.emoji  # type: ignore
+            for reaction in emoji_reactions
+            if reaction.chosen_order is not None
+        }
+        self.states[(chat_id, message_id)] = ReactionState(
+            counts=Counter(
+                {reaction.emoji: reaction.count or 1 for reaction in emoji_reactions}
+            ),
+            chosen=[chosen[order] for order in sorted(chosen)],
+        )
+        return None
+
+    def record_sent(
+        self, chat_id: int, message_id: int, emoticons: Sequence[str]
+    ) -> None:
+        """
+        Replaces the reactions of the client on a mirrored message
+        """
+        state: ReactionState | None = self.states.get((chat_id, message_id), None)
+        if state is None:
+            self.states[(chat_id, message_id)] = ReactionState(
+                counts=Counter(emoticons), chosen=emoticons
+            )
+            return None
+
+        state.counts.subtract(state.chosen)
+        state.counts.update(emoticons)
+        # drop reactions nobody has anymore
+        state.counts = +state.counts
+        state.chosen = tuple(emoticons)
+        return None
+
+    def apply(self, chat_id: int, message_id: int, reactions: MessageReactions) -> bool:
+        """
+        Replaces the state of a mirrored message with a raw reaction update
+        Returns False if the message is not mirrored
+        """
+        state: ReactionState | None = self.states.get((chat_id, message_id), None)
+        if state is None:
+            return False
+
+        counts: Counter = Counter()
+        chosen: list[str] = []
+        for result in reactions.results:
+            emoticon: str | None = getattr(result.reaction, "emoticon", None)
+            if emoticon is None or result.count <= 0:
+                continue
+            counts[emoticon] = result.count
+            if result.chosen_order is not None:
+                chosen.append(emoticon)
+
+        state.counts = counts
+        # min updates don't say which reactions are chosen by the client
+        if not reactions.min:
+            state.chosen = tuple(chosen)
+        return True
+
+    def forget(self, chat_id: int, message_id: int) -> None:
+        self.states.pop((chat_id, message_id), None)
+        return None
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, NamedTuple, Sequence
+
+from pyrogram.raw.base import Peer
+from pyrogram.raw.types import ReactionEmoji
+from pyrogram.types import Message
+
+from src.loggers import logger
+from src.metrics import Metrics
+from src.tracer import NULL_TRACE, Trace
+
+
+class ReactionJob(NamedTuple):
+    method_name: str
+    chat_id: int
+    message: Message
+    peer: Peer
+    emoticons: Sequence[str]
+    emojis: Sequence[ReactionEmoji]
+    created_at: float
+    trace: Trace = NULL_TRACE
+
+
+# pylint: disable=R0902
+class ReactionSender:
+    """
+    Sends reactions in the background with bounded concurrency
+
+    Jobs of the same chat go to the same worker, so they are sent in order
+    """
+
+    def __init__(
+        self, concurrency: int, queue_size: int, metrics: Metrics | None = None
+    ) -> None:
+        self.concurrency: int = concurrency
+        self.queue_size: int = queue_size
+        self.metrics: Metrics | None = metrics
+        self._queues: list[asyncio.Queue] = []
+        self._workers: list[asyncio.Task] = []
+        # jobs passed to the handler, whether they were sent or failed
+        self.processed: int = 0
+        self.dropped: int = 0
+        self.latency_total: float = 0.0
+        self.latency_max: float = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def depth(self) -> int:
+        """
+        Returns the number of jobs waiting to be sent
+        """
+        return sum(queue.qsize() for queue in self._queues)
+
+    @property
+    def latency_avg(self) -> float:
+        """
+        Returns the average time from submitting a job to finishing it
+        """
+        return self.latency_total / self.processed if self.processed else 0.0
+
+    def start(self, handler: Callable[[ReactionJob], Awaitable[None]]) -> None:
+        """
+        Starts workers that pass submitted jobs to a given handler
+        """
+        if self.is_running or not self.concurrency:
+            return None
+
+        # the total queue size is split between the workers
+        worker_queue_size: int = -(-self.queue_size // self.concurrency)
+        self._queues = [
+            asyncio.Queue(maxsize=worker_queue_size) for _ in range(self.concurrency)
+        ]
+        self._workers = [
+            asyncio.create_task(self._work(queue=queue, handler=handler))
+            for queue in self._queues
+        ]
+        return None
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Waits for submitted jobs to be sent and stops the workers
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Reactions were not sent before shutdown|{self.depth}")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues = []
+        return None
+
+    def submit(self, job: ReactionJob) -> bool:
+        """
+        Puts a job in the queue of its chat worker
+        Returns False if the sender is not running and the job should be sent inline
+        """
+        if not self.is_running:
+            return False
+
+        queue: asyncio.Queue = self._queues[hash(job.chat_id) % self.concurrency]
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            # the trace was handed off to the sender, nobody else finishes it
+            job.trace.finish(outcome="dropped")
+            logger.error("Reaction was not sent! The send queue is full.")
+        return True
+
+    async def _work(
+        self,
+        queue: asyncio.Queue,
+        handler: Callable[[ReactionJob], Awaitable[None]],
+    ) -> None:
+        """
+        Passes jobs from a queue to a handler one by one
+        """
+        while True:
+            job: ReactionJob = await queue.get()
+            try:
+                await handler(job)
+            # the worker must survive any handler failure
+            except Exception as e:  # pylint: disable=W0718
+                logger.error(f"Reaction sending failed! {e!r}")
+            finally:
+                latency: float = time.monotonic() - job.created_at
+                self.processed += 1
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                if self.metrics is not None:
+                    self.metrics.observe("reaction_sender_latency_seconds", latency)
+                queue.task_done()
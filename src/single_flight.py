@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Shares one pending call between concurrent callers with the same key
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.coalesced: int = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits the pending call for a given key or starts a new one
+        """
+        in_flight: asyncio.Future | None = self._in_flight.get(key, None)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(func())
+            self._in_flight[key] = in_flight
+            in_flight.add_done_callback(
+                lambda future: self._forget(key=key, future=future)
+            )
+        else:
+            self.coalesced += 1
+        # shielded, so a cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(in_flight)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """
+        Removes a finished call from the registry
+        """
+        if self._in_flight.get(key, None) is future:
+            del self._in_flight[key]
+        # mark the exception as retrieved even if all the callers were cancelled
+        if not future.cancelled():
+            future.exception()
+        return None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in_flight
@@ -0,0 +1,309 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+import struct
+import time
+from io import BytesIO
+from pathlib import Path
+
+from pyrogram.enums import ChatType
+from pyrogram.raw.base import Peer
+from pyrogram.raw.core import TLObject
+from pyrogram.types import (
+    Chat,
+    ChatReactions,
+    Message,
+    MessageReactions,
+    Reaction,
+    User,
+)
+
+from src.custom_client import CustomClient
+from src.loggers import logger
+
+SNAPSHOT_VERSION: int = 3
+
+
+class StateSnapshot:
+    """
+    Saves and restores chat metadata, peers and messages for warm restarts
+
+    The snapshot is a gzipped JSON file next to the session file
+    """
+
+    @staticmethod
+    def path(custom_client: CustomClient) -> Path:
+        """
+        Returns the snapshot path for a given client
+        """
+        return Path(custom_client.workdir) / f"{custom_client.name}.snapshot"
+
+    @classmethod
+    async def save(cls, custom_client: CustomClient) -> None:
+        """
+        Writes the client state to disk without blocking the event loop
+        """
+        state: dict = cls._dump_state(custom_client=custom_client)
+        path: Path = cls.path(custom_client=custom_client)
+        try:
+            await asyncio.to_thread(cls._write, path, state)
+        except OSError as e:
+            logger.error(f"Snapshot was not saved! {e}")
+        return None
+
+    @classmethod
+    def load(cls, custom_client: CustomClient) -> bool:
+        """
+        Restores the client state from disk if the snapshot is usable
+        """
+        path: Path = cls.path(custom_client=custom_client)
+        if not path.exists():
+            return False
+
+        try:
+            state: dict = cls._read(path)
+        except (OSError, EOFError, ValueError) as e:
+            logger.error(f"Snapshot is corrupted and was skipped! {e}")
+            return False
+
+        if not cls._is_usable(custom_client=custom_client, state=state):
+            return False
+
+        try:
+            cls._restore_state(custom_client=custom_client, state=state)
+        except (KeyError, TypeError, ValueError, struct.error) as e:
+            logger.error(f"Snapshot is corrupted and was skipped! {e!r}")
+            return False
+
+        logger.success(
+            f"Snapshot is loaded!|{len(custom_client.chat_info_map)} chats, "
+            f"{len(custom_client.chat_peer_map)} peers, "
+            f"{len(custom_client.msg_store)} messages"
+        )
+        return True
+
+    @staticmethod
+    def _write(path: Path, state: dict) -> None:
+        """
+        Atomically replaces the snapshot file
+        """
+        tmp_path: Path = path.with_suffix(".tmp")
+        with gzip.open(tmp_path, mode="wt", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return None
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        with gzip.open(path, mode="rt", encoding="utf-8") as file:
+            state: dict = json.load(file)
+        return state
+
+    @staticmethod
+    def _is_usable(custom_client: CustomClient, state: dict) -> bool:
+        """
+        Determines whether the snapshot matches the version, account and max age
+        """
+        if state.get("version", None) != SNAPSHOT_VERSION:
+            logger.error("Snapshot version is outdated. Starting cold.")
+            return False
+
+        user_id: int | None = getattr(getattr(custom_client, "me", None), "id", None)
+        if state.get("user_id", None) not in (None, user_id):
+            logger.error("Snapshot belongs to another account. Starting cold.")
+            return False
+
+        age: float = time.time() - state.get("saved_at", 0)
+        if age > custom_client.user_settings.snapshot_max_age:
+            logger.error(f"Snapshot is stale ({int(age)} s old). Starting cold.")
+            return False
+
+        return True
+
+    @classmethod
+    def _dump_state(cls, custom_client: CustomClient) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "user_id": getattr(getattr(custom_client, "me", None), "id", None),
+            "chats": [
+                cls._dump_chat(chat=chat)
+                for chat in custom_client.chat_info_map.values()
+                if isinstance(chat, Chat)
+            ],
+            "peers": {
+                str(chat_id): cls._dump_peer(peer=peer)
+                for chat_id, peer in custom_client.chat_peer_map.items()
+            },
+            "msg_queue": [
+                [*key, sender_id]
+                for key, sender_id in custom_client.msg_store.senders()
+            ],
+            "messages": [
+                cls._dump_message(message=message)
+                for message in custom_client.msg_store.messages()
+            ],
+        }
+
+    @classmethod
+    def _restore_state(cls, custom_client: CustomClient, state: dict) -> None:
+        """
+        Parses the whole snapshot before touching the client,
+        so a malformed entry leaves nothing half restored
+        """
+        chats: dict[int, Chat] = {
+            chat.id: chat
+            for chat in (
+                cls._load_chat(chat_data=chat_data)
+                for chat_data in state.get("chats", ())
+            )
+        }
+        peers: dict[int, Peer] = {
+            int(chat_id): cls._load_peer(peer_data=peer_data)
+            for chat_id, peer_data in state.get("peers", {}).items()
+        }
+        msg_queue: list[tuple[int, int, int]] = [
+            (int(chat_id), int(message_id), int(sender_id))
+            for chat_id, message_id, sender_id in state.get("msg_queue", ())
+        ]
+        messages: list[Message] = [
+            cls._load_message(
+                custom_client=custom_client, message_data=message_data, chats=chats
+            )
+            for message_data in state.get("messages", ())
+        ]
+
+        for chat_id, chat in chats.items():
+            custom_client.chat_info_map.setdefault(chat_id, chat)
+        for chat_id, peer in peers.items():
+            custom_client.chat_peer_map.setdefault(chat_id, peer)
+        for chat_id, message_id, sender_id in msg_queue:
+            if (chat_id, message_id) not in custom_client.msg_store:
+                custom_client.msg_store.add(
+                    key=(chat_id, message_id), sender_id=sender_id
+                )
+        for message in messages:
+            custom_client.msg_store.remember(
+                key=(message.chat.id, message.id), message=message
+            )
+        return None
+
+    @staticmethod
+    def _dump_chat(chat: Chat) -> dict:
+        available_reactions: ChatReactions | None = getattr(
+            chat, "available_reactions", None
+        )
+        return {
+            "id": chat.id,
+            "type": getattr(chat.type, "value", None),
+            "title": chat.title,
+            "username": chat.username,
+            "first_name": chat.first_name,
+            "last_name": chat.last_name,
+            "all_reactions": getattr(available_reactions, "all_are_enabled", None),
+            "reactions": (
+                None
+                if available_reactions is None
+                else [
+                    reaction.emoji
+                    for reaction in available_reactions.reactions or ()
+                    if getattr(reaction, "emoji", None)
+                ]
+            ),
+        }
+
+    @staticmethod
+    def _load_chat(chat_data: dict) -> Chat:
+        reactions: list[str] | None = chat_data.get("reactions", None)
+        # pyrogram annotates optional attributes as required ones
+        chat_kwargs: dict = {
+            "id": chat_data["id"],
+            "type": ChatType(chat_data["type"]) if chat_data.get("type") else None,
+            "title": chat_data.get("title", None),
+            "username": chat_data.get("username", None),
+            "first_name": chat_data.get("first_name", None),
+            "last_name": chat_data.get("last_name", None),
+            "available_reactions": (
+                None
+                if reactions is None
+                else ChatReactions(
+                    all_are_enabled=chat_data.get("all_reactions", None),
+                    reactions=[Reaction(emoji=emoji) for emoji in reactions],
+                )
+            ),
+        }
+        return Chat(**chat_kwargs)
+
+    @staticmethod
+    def _dump_peer(peer: Peer) -> str:
+        return base64.b64encode(peer.write()).decode()
+
+    @staticmethod
+    def _load_peer(peer_data: str) -> Peer:
+        data: bytes = base64.b64decode(peer_data)
+        peer: Peer = TLObject.read(BytesIO(data))
+        # integers are read from whatever bytes are left, so a cut blob parses
+        if peer.write() != data:
+            raise ValueError(f"Peer {peer_data} is truncated")
+        return peer
+
+    @staticmethod
+    def _dump_message(message: Message) -> dict:
+        from_user: User | None = getattr(message, "from_user", None)
+        reactions: MessageReactions | None = getattr(message, "reactions", None)
+        return {
+            "chat_id": message.chat.id,
+            "id": message.id,
+            "from_user": (
+                None
+                if from_user is None
+                else [from_user.id, from_user.first_name, from_user.last_name]
+            ),
+            "reactions": (
+                None
+                if reactions is None
+                else [
+                    [reaction.emoji, reaction.count, reaction.chosen_order]
+                    for reaction in reactions.reactions or ()
+                    if getattr(reaction, "emoji", None)
+                ]
+            ),
+        }
+
+    @classmethod
+    def _load_message(
+        cls, custom_client: CustomClient, message_data: dict, chats: dict[int, Chat]
+    ) -> Message:
+        chat_id: int = message_data["chat_id"]
+        from_user: list | None = message_data.get("from_user", None)
+        # [emoji, count, chosen_order] per reaction
+        reactions: list[list] | None = message_data.get("reactions", None)
+        # pyrogram annotates optional attributes as required ones
+        message_kwargs: dict = {
+            "id": message_data["id"],
+            "chat": (
+                custom_client.chat_info_map.get(chat_id, None)
+                or chats.get(chat_id, None)
+                or cls._load_chat(chat_data={"id": chat_id})
+            ),
+            "from_user": (
+                None
+                if from_user is None
+                else User(
+                    id=from_user[0], first_name=from_user[1], last_name=from_user[2]
+                )
+            ),
+            "reactions": (
+                None
+                if reactions is None
+                else MessageReactions(
+                    reactions=[
+                        Reaction(emoji=emoji, count=count, chosen_order=chosen_order)
+                        for emoji, count, chosen_order in reactions
+                    ]
+                )
+            ),
+        }
+        return Message(**message_kwargs)
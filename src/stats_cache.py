@@ -0,0 +1,62 @@
+import time
+from typing import Any, Callable, Hashable
+
+from cachetools import Cache, LRUCache, TTLCache
+
+
+class CacheStats(Cache):
+    """
+    Counts hits and misses of `get` and evictions of a cachetools cache
+    Goes before the cache class in bases, e.g. (CacheStats, LRUCache)
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:  # pylint: disable=W0221
+        if key in self:
+            self.hits += 1
+            return self[key]
+
+        self.misses += 1
+        return default
+
+    def popitem(self) -> tuple[Hashable, Any]:
+        key, value = super().popitem()
+        self.evictions += 1
+        return key, value
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the share of `get` calls that found a live entry
+        """
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class StatsLRUCache(CacheStats, LRUCache):
+    """
+    Bounded LRU cache that counts hits, misses and evictions
+    """
+
+
+class StatsTTLCache(CacheStats, TTLCache):
+    """
+    Bounded cache with per-entry TTL that counts hits, misses and evictions
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self.expirations: int = 0
+
+    def expire(self, time: float | None = None) -> Any:  # pylint: disable=W0621
+        # older cachetools versions don't return expired items,
+        # Cache.__len__ is used as TTLCache.__len__ expires items itself
+        size_before: int = Cache.__len__(self)
+        expired: Any = super().expire(time)
+        self.expirations += size_before - Cache.__len__(self)
+        return expired
@@ -0,0 +1,162 @@
+import time
+from itertools import count
+from typing import Any, Awaitable, Callable, Sequence
+
+from cachetools import LRUCache
+from pyrogram.errors import FloodWait
+from pyrogram.types import Chat, ChatReactions, Message
+
+import src.constants
+from src.jsonl_writer import JsonLinesWriter
+
+
+# pylint: disable=R0902
+class StreamRecorder:
+    """
+    Records incoming messages and Telegram request outcomes as JSON lines
+    to replay them offline (see benchmarks/replay.py)
+
+    Chat and user ids are replaced by pseudonyms in order of appearance,
+    names and texts are not recorded
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        path: str | None,
+        targets: dict[int, tuple[str, src.constants.FriendshipStatus]],
+        batch_size: int = 100,
+        message_cache_size: int = 10_000,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.targets: dict[int, tuple[str, src.constants.FriendshipStatus]] = targets
+        self.timer: Callable[[], float] = timer
+        self.started_at: float = timer()
+        self.writer: JsonLinesWriter | None = (
+            JsonLinesWriter(path=path, batch_size=batch_size) if path else None
+        )
+        self._chat_ids: dict[int, int] = {}
+        self._user_ids: dict[int, int] = {}
+        # chats and users are bounded by the settings, messages are not:
+        # a message seen again after eviction gets a new pseudonym
+        self._message_ids: LRUCache = LRUCache(maxsize=message_cache_size)
+        self._next_message_id: count = count(1)
+        if self.writer is not None:
+            self.writer.write(
+                record={"type": "header", "version": self.VERSION, "time": time.time()}
+            )
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.writer is not None
+
+    def chat(self, chat_id: int) -> int:
+        """
+        Returns a pseudonym of a chat id, private chats stay positive
+        """
+        sign: int = 1 if chat_id > 0 else -1
+        return sign * self._chat_ids.setdefault(chat_id, len(self._chat_ids) + 1)
+
+    def user(self, user_id: int) -> int:
+        return self._user_ids.setdefault(user_id, len(self._user_ids) + 1)
+
+    def message(self, chat_id: int, message_id: int) -> int:
+        pseudonym: int | None = self._message_ids.get((chat_id, message_id), None)
+        if pseudonym is None:
+            pseudonym = next(self._next_message_id)
+            self._message_ids[(chat_id, message_id)] = pseudonym
+        return pseudonym
+
+    def record_message(self, message: Message) -> None:
+        """
+        Records an incoming message with the friendship status of its sender
+        """
+        if self.writer is None:
+            return None
+
+        chat_id: int | None = getattr(getattr(message, "chat", None), "id", None)
+        sender_id: int | None = getattr(getattr(message, "from_user", None), "id", None)
+        if chat_id is None or sender_id is None:
+            return None
+
+        target: tuple[str, src.constants.FriendshipStatus] | None = self.targets.get(
+            sender_id, None
+        )
+        self.writer.write(
+            record={
+                "type": "message",
+                "t": round(self.timer() - self.started_at, 6),
+                "chat": self.chat(chat_id),
+                "sender": self.user(sender_id),
+                "status": target[1].value if target is not None else None,
+                "message": self.message(chat_id, message.id),
+                "reactions": self._message_emoticons(message=message),
+            }
+        )
+        return None
+
+    async def call(
+        self, method: str, chat_id: int | None, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Calls a function making a Telegram request and records its outcome
+        """
+        if self.writer is None:
+            return await func()
+
+        started_at: float = self.timer()
+        record: dict[str, Any] = {
+            "type": "rpc",
+            "t": round(started_at - self.started_at, 6),
+            "method": method,
+            "chat": self.chat(chat_id) if chat_id is not None else None,
+        }
+        try:
+            result: Any = await func()
+        except FloodWait as f:
+            record.update(outcome="FloodWait", value=f.value)
+            raise
+        except Exception as e:
+            record.update(outcome=type(e).__name__)
+            raise
+        else:
+            record.update(outcome="ok")
+            if isinstance(result, Chat):
+                record.update(reactions=self._chat_emoticons(chat=result))
+            return result
+        finally:
+            record["latency"] = round(self.timer() - started_at, 6)
+            self.writer.write(record=record)
+
+    async def flush(self) -> None:
+        if self.writer is not None:
+            await self.writer.flush()
+        return None
+
+    @staticmethod
+    def _message_emoticons(message: Message) -> list[str]:
+        reactions: Sequence[Any] = (
+            getattr(getattr(message, "reactions", None), "reactions", None) or ()
+        )
+        return [reaction.emoji for reaction in reactions if reaction.emoji]
+
+    @staticmethod
+    def _chat_emoticons(chat: Chat) -> str | list[str] | None:
+        """
+        Returns "all", allowed emoticons or None if reactions are disabled
+        """
+        available_reactions: ChatReactions | None = getattr(
+            chat, "available_reactions", None
+        )
+        if available_reactions is None:
+            return None
+
+        if available_reactions.all_are_enabled:
+            return "all"
+
+        return [
+            reaction.emoji  # type: ignore
+            for reaction in available_reactions.reactions or ()
+            if getattr(reaction, "emoji", None)
+        ]
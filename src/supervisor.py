@@ -0,0 +1,279 @@
+import asyncio
+import os
+import signal
+import sys
+import time
+from asyncio.subprocess import PIPE, STDOUT, Process
+from typing import Sequence, TextIO
+
+from src.loggers import log_dir, logger, setup_logging
+from src.metrics import Metrics
+from src.metrics_server import MetricsServer
+from src.user_settings import UserSettings
+
+
+# pylint: disable=R0903
+class Worker:
+    """
+    A process running src/main.py for a single account
+    """
+
+    def __init__(self, name: str, metrics_port: int | None) -> None:
+        self.name: str = name
+        self.metrics_port: int | None = metrics_port
+        self.process: Process | None = None
+        self.started_at: float = 0.0
+        self.restarts: int = 0
+        # the delay before the next restart
+        self.backoff: float = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
+# pylint: disable=R0902
+class Supervisor:
+    """
+    Runs every account in its own worker process, so a stalled account
+    doesn't hold up the others and the accounts use several cores
+
+    A crashed worker is restarted with exponential backoff, the backoff is reset
+    once a worker runs for `stable_after` seconds. Worker logs are forwarded
+    to one stream prefixed with the account, worker metrics are collected
+    over local HTTP and served together labeled with the account
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        accounts: Sequence[str],
+        *,
+        metrics_port: int | None = None,
+        metrics_host: str = "127.0.0.1",
+        command: Sequence[str] = (sys.executable, "-m", "src.main"),
+        backoff_min: float = 1.0,
+        backoff_max: float = 300.0,
+        stable_after: float = 60.0,
+        stop_timeout: float = 30.0,
+        output: TextIO = sys.stderr,
+    ) -> None:
+        self.metrics_port: int | None = metrics_port
+        self.metrics_host: str = metrics_host
+        self.command: tuple[str, ...] = tuple(command)
+        self.backoff_min: float = backoff_min
+        self.backoff_max: float = backoff_max
+        self.stable_after: float = stable_after
+        self.stop_timeout: float = stop_timeout
+        self.output: TextIO = output
+        # the workers serve their metrics on the ports next to the supervisor's one
+        self.workers: dict[str, Worker] = {
+            name: Worker(
+                name=name,
+                metrics_port=metrics_port + i if metrics_port is not None else None,
+            )
+            for i, name in enumerate(accounts, start=1)
+        }
+        self._stopping: asyncio.Event = asyncio.Event()
+
+    def _env(self, worker: Worker) -> dict[str, str]:
+        env: dict[str, str] = {
+            **os.environ,
+            "WORKER_ACCOUNT": worker.name,
+            # rotating log files can't be shared by processes
+            "LOG_DIR": os.path.join(log_dir, worker.name),
+        }
+        if worker.metrics_port is not None:
+            env["WORKER_METRICS_PORT"] = str(worker.metrics_port)
+        return env
+
+    async def run(self) -> None:
+        """
+        Runs the workers until `stop` is called
+        """
+        server: asyncio.Server | None = None
+        if self.metrics_port is not None:
+            server = await MetricsServer.serve(
+                host=self.metrics_host, port=self.metrics_port, render=self.render
+            )
+        try:
+            await asyncio.gather(
+                *(self._supervise(worker=worker) for worker in self.workers.values())
+            )
+        finally:
+            if server is not None:
+                server.close()
+        return None
+
+    def stop(self) -> None:
+        """
+        Asks the workers to finish, they save their state and exit
+        """
+        self._stopping.set()
+        for worker in self.workers.values():
+            if worker.is_running:
+                worker.process.terminate()  # type: ignore
+        return None
+
+    async def _supervise(self, worker: Worker) -> None:
+        """
+        Runs a worker, restarting it whenever it exits until the supervisor stops
+        """
+        while not self._stopping.is_set():
+            returncode: int = await self._run_worker(worker=worker)
+            if self._stopping.is_set():
+                break
+
+            if time.monotonic() - worker.started_at >= self.stable_after:
+                worker.backoff = 0.0
+            worker.backoff = min(
+                max(worker.backoff * 2, self.backoff_min), self.backoff_max
+            )
+            worker.restarts += 1
+            logger.error(
+                f"Worker {worker.name} exited with code {returncode}. "
+                f"Restarting in {worker.backoff:.0f} s."
+            )
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=worker.backoff)
+            except asyncio.TimeoutError:
+                pass
+        return None
+
+    async def _run_worker(self, worker: Worker) -> int:
+        """
+        Starts a worker process, forwards its output and returns its exit code
+        """
+        process: Process = await asyncio.create_subprocess_exec(
+            *self.command,
+            env=self._env(worker=worker),
+            stdout=PIPE,
+            stderr=STDOUT,
+        )
+        worker.process = process
+        worker.started_at = time.monotonic()
+        logger.success(f"Worker is started|{worker.name}, pid {process.pid}")
+        # the stop may come while the process is starting
+        if self._stopping.is_set():
+            process.terminate()
+
+        async for line in process.stdout:  # type: ignore
+            self.output.write(f"{worker.name}|{line.decode(errors='replace')}")
+        try:
+            return await asyncio.wait_for(process.wait(), timeout=self.stop_timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            return await process.wait()
+
+    async def render(self) -> str:
+        """
+        Returns the metrics of all workers labeled with their accounts
+        and the state of the workers in Prometheus text format
+        """
+        texts: list[str] = await asyncio.gather(
+            *(self._scrape(worker=worker) for worker in self.workers.values())
+        )
+        lines: list[str] = merge_metrics(texts=dict(zip(self.workers, texts)))
+        lines.extend(
+            Metrics.format_samples(
+                "worker_up",
+                "gauge",
+                {
+                    Metrics.labels(account=name): int(worker.is_running)
+                    for name, worker in self.workers.items()
+                },
+            )
+        )
+        lines.extend(
+            Metrics.format_samples(
+                "worker_restarts_total",
+                "counter",
+                {
+                    Metrics.labels(account=name): worker.restarts
+                    for name, worker in self.workers.items()
+                },
+            )
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    async def _scrape(worker: Worker) -> str:
+        """
+        Returns the metrics served by a worker or nothing if it doesn't answer
+        """
+        if worker.metrics_port is None or not worker.is_running:
+            return ""
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host="127.0.0.1", port=worker.metrics_port),
+                timeout=5,
+            )
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            response: bytes = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+        except (OSError, asyncio.TimeoutError):
+            return ""
+
+        _, _, body = response.decode().partition("\r\n\r\n")
+        return body
+
+
+def merge_metrics(texts: dict[str, str]) -> list[str]:
+    """
+    Returns exposition lines of several Prometheus texts by account,
+    the samples are labeled with their account and grouped by metric
+    """
+    # metric name -> (HELP and TYPE lines, samples)
+    families: dict[str, tuple[list[str], list[str]]] = {}
+    for account, text in texts.items():
+        account_label: str = Metrics.labels(account=account)
+        family: tuple[list[str], list[str]] | None = None
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+
+            if line.startswith("#"):
+                name: str = line.split(" ", 3)[2]
+                family = families.setdefault(name, ([], []))
+                if line not in family[0]:
+                    family[0].append(line)
+                continue
+
+            if family is None:
+                family = families.setdefault(line.split("{", 1)[0], ([], []))
+            name_labels, value = line.rsplit(" ", 1)
+            if name_labels.endswith("}"):
+                name, labels = name_labels[:-1].split("{", 1)
+                family[1].append(f"{name}{{{account_label},{labels}}} {value}")
+            else:
+                family[1].append(f"{name_labels}{{{account_label}}} {value}")
+
+    return [
+        line for headers, samples in families.values() for line in headers + samples
+    ]
+
+
+async def main() -> None:  # pragma: no cover
+    setup_logging()
+    accounts: dict[str, UserSettings] = UserSettings.accounts_from_config(
+        config_file="src/config.yaml"
+    )
+    supervisor: Supervisor = Supervisor(
+        accounts=list(accounts),
+        metrics_port=next(iter(accounts.values())).metrics_port,
+        metrics_host=next(iter(accounts.values())).metrics_host,
+    )
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, supervisor.stop)
+
+    logger.success(f"Supervisor is started|{len(supervisor.workers)} workers")
+    await supervisor.run()
+    logger.success("Supervisor is stopped")
+    await logger.complete()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import count
+from typing import Any, Callable, ContextManager, Iterator
+
+from src.jsonl_writer import JsonLinesWriter
+
+
+# pylint: disable=R0902
+class Trace:
+    """
+    Collects the duration of each pipeline stage of a single message or update
+    """
+
+    _ids: count = count(1)
+
+    def __init__(
+        self,
+        tracer: "Tracer | None",
+        name: str,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tracer: Tracer | None = tracer
+        self.trace_id: int = next(self._ids)
+        self.name: str = name
+        self.timer: Callable[[], float] = timer
+        self.wall_time: float = time.time()
+        self.started_at: float = timer()
+        self.last_at: float = self.started_at
+        # (stage, start offset, duration)
+        self.spans: list[tuple[str, float, float]] = []
+        self.attrs: dict[str, Any] = {}
+        self.is_handed_off: bool = False
+        self.is_finished: bool = False
+
+    def span(self, stage: str) -> ContextManager[None]:
+        """
+        Measures the block as a stage of the pipeline
+        """
+        return self._span(stage=stage)
+
+    @contextmanager
+    def _span(self, stage: str) -> Iterator[None]:
+        started_at: float = self.timer()
+        try:
+            yield
+        finally:
+            self.add(stage=stage, started_at=started_at, finished_at=self.timer())
+
+    def add(self, stage: str, started_at: float, finished_at: float) -> None:
+        self.spans.append(
+            (stage, started_at - self.started_at, finished_at - started_at)
+        )
+        self.last_at = finished_at
+        return None
+
+    def mark(self, stage: str) -> None:
+        """
+        Records the time since the previous stage as a given stage
+        """
+        self.add(stage=stage, started_at=self.last_at, finished_at=self.timer())
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+        return None
+
+    def hand_off(self) -> None:
+        """
+        Marks the trace as finished by another coroutine (e.g. the reaction sender)
+        """
+        self.is_handed_off = True
+        return None
+
+    def finish(self, **attrs: Any) -> None:
+        """
+        Exports the trace once, the following calls are ignored
+        """
+        if self.is_finished:
+            return None
+
+        self.is_finished = True
+        self.set(**attrs)
+        if self.tracer is not None:
+            self.tracer.export(trace=self)
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "time": self.wall_time,
+            "duration": self.last_at - self.started_at,
+            "spans": [
+                [stage, round(offset, 6), round(duration, 6)]
+                for stage, offset, duration in self.spans
+            ],
+            "outcome": "skipped",
+            **self.attrs,
+        }
+
+
+class NullTrace(Trace):
+    """
+    Stands in for traces that are not sampled and records nothing
+    """
+
+    def __init__(self) -> None:
+        super().__init__(tracer=None, name="null")
+
+    def span(self, stage: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def add(self, stage: str, started_at: float, finished_at: float) -> None:
+        return None
+
+    def mark(self, stage: str) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+    def hand_off(self) -> None:
+        return None
+
+    def finish(self, **attrs: Any) -> None:
+        return None
+
+
+NULL_TRACE: NullTrace = NullTrace()
+
+
+class Tracer:
+    """
+    Samples pipeline traces and exports them as JSON lines in batches
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        path: str,
+        batch_size: int = 100,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.sample_rate: float = sample_rate
+        self.timer: Callable[[], float] = timer
+        self.writer: JsonLinesWriter = JsonLinesWriter(path=path, batch_size=batch_size)
+
+    @property
+    def exported(self) -> int:
+        return self.writer.written
+
+    def start(self, name: str, **attrs: Any) -> Trace:
+        """
+        Returns a new trace if it is sampled or a trace that records nothing
+        """
+        if not self.sample_rate or random.random() >= self.sample_rate:  # nosec
+            return NULL_TRACE
+
+        trace: Trace = Trace(tracer=self, name=name, timer=self.timer)
+        trace.set(**attrs)
+        return trace
+
+    def export(self, trace: Trace) -> None:
+        self.writer.write(record=trace.to_dict())
+        return None
+
+    async def flush(self) -> None:
+        """
+        Waits for the batches being written and writes the buffered traces
+        """
+        await self.writer.flush()
+        return None
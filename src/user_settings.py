@@ -2,6 +2,7 @@ import yaml
 from pydantic import BaseModel, Field, ValidationError, field_validator
 
 import src.constants
+from src.emoticon_registry import emoticon_registry
 from src.loggers import logger
 
 
@@ -9,12 +10,34 @@ class UserSettings(BaseModel):
     api_id: int
     api_hash: str
     msg_queue_size: int = Field(default=..., ge=1)
+    msg_queue_size_per_chat: int | None = Field(default=None, ge=1)
+    msg_queue_size_per_target: int | None = Field(default=None, ge=1)
     update_timeout: int = Field(default=..., ge=2)
     update_jitter: int = Field(default=..., ge=0)
+    update_batch_size: int = Field(default=1, ge=1)
     chats_allowed: dict[int, str] | None
     targets: dict[int, tuple[str, src.constants.FriendshipStatus]]
     emoticons_for_enemies: tuple[str, ...]
     emoticons_for_friends: tuple[str, ...]
+    chat_cache_size: int = Field(default=1000, ge=1)
+    chat_cache_ttl: int = Field(default=86400, ge=1)
+    snapshot_interval: int = Field(default=300, ge=0)
+    snapshot_max_age: int = Field(default=3600, ge=1)
+    warmup_concurrency: int = Field(default=4, ge=0)
+    sender_concurrency: int = Field(default=4, ge=0)
+    sender_queue_size: int = Field(default=1000, ge=1)
+    rate_limit: float = Field(default=10, gt=0)
+    rate_limit_per_chat: float = Field(default=1, gt=0)
+    rate_limit_burst: int = Field(default=5, ge=1)
+    deferred_queue_size: int = Field(default=1000, ge=1)
+    deferred_max_age: float = Field(default=600, gt=0)
+    log_summary_interval: int = Field(default=0, ge=0)
+    metrics_port: int | None = Field(default=None, ge=1, le=65535)
+    metrics_host: str = "127.0.0.1"
+    trace_sample_rate: float = Field(default=0, ge=0, le=1)
+    trace_file: str = "logs/traces.jsonl"
+    record_file: str | None = None
+    config_reload_interval: int = Field(default=10, ge=0)
 
     @classmethod
     def from_config(cls, config_file: str) -> "UserSettings":
@@ -33,6 +56,34 @@ class UserSettings(BaseModel):
             logger.success("The settings look fine!")
             return user_settings
 
+    @classmethod
+    def accounts_from_config(
+        cls, config_file: str, default_name: str = "my_app"
+    ) -> dict[str, "UserSettings"]:
+        """
+        Validates config and returns UserSettings instances by account name
+
+        Each entry of `accounts` overrides the top-level settings for an account,
+        without `accounts` the config describes a single account `default_name`
+        """
+        try:
+            dict_config: dict = cls._dict_from_yaml(config_file)
+            accounts: dict[str, dict | None] = dict_config.pop("accounts", None) or {
+                default_name: None
+            }
+            accounts_settings: dict[str, UserSettings] = {
+                str(name): cls(**{**dict_config, **(overrides or {})})
+                for name, overrides in accounts.items()
+            }
+
+        except ValidationError:
+            logger.error("The program launch failed. Check the config.yaml!")
+            raise
+
+        else:
+            logger.success(f"The settings look fine!|{len(accounts_settings)} accounts")
+            return accounts_settings
+
     @staticmethod
     def _dict_from_yaml(yaml_file: str) -> dict:
         """
@@ -46,7 +97,7 @@ class UserSettings(BaseModel):
     @field_validator("emoticons_for_enemies")
     def validate_enemy_emo(cls, v):
         for emoticon in v:
-            if emoticon not in src.constants.VALID_EMOTICONS:
+            if emoticon not in emoticon_registry:
                 raise ValueError(f"{emoticon} in `emoticons_for_enemies` is not valid!")
 
         return v
@@ -55,7 +106,7 @@ class UserSettings(BaseModel):
     @field_validator("emoticons_for_friends")
     def validate_friend_emo(cls, v):
         for emoticon in v:
-            if emoticon not in src.constants.VALID_EMOTICONS:
+            if emoticon not in emoticon_registry:
                 raise ValueError(f"{emoticon} in `emoticons_for_friends` is not valid!")
 
         return v
@@ -0,0 +1,126 @@
+from typing import Any
+
+import pytest
+from pyrogram.raw.types import (
+    MessageReactions,
+    PeerChannel,
+    UpdateChannel,
+    UpdateChat,
+    UpdateMessageReactions,
+    UpdateUserName,
+)
+from pyrogram.types import Message
+
+import src.constants
+from src.admission_filter import (
+    AdmissionFilter,
+    ChatUpdateFilter,
+    ReactionUpdateFilter,
+)
+from src.custom_client import CustomClient
+from tests.fixtures.custom_client import MockUserSettings
+
+
+class TestAdmissionFilter:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "chat_id, sender_id, expected_result",
+        [
+            (-12345, 123456789, True),  # target in allowed chat
+            (123456789, 123456789, True),  # target in private chat
+            (-54321, 123456789, False),  # target in not allowed chat
+            (-12345, 987654321, False),  # non-target in allowed chat
+        ],
+    )
+    async def test(
+        test_custom_client: CustomClient,
+        mock_message: Message,
+        chat_id: int,
+        sender_id: int,
+        expected_result: bool,
+    ) -> None:
+        mock_message.chat.id = chat_id
+        mock_message.from_user.id = sender_id
+        admission_filter: AdmissionFilter = test_custom_client.admission_filter
+        assert await admission_filter(test_custom_client, mock_message) is (
+            expected_result
+        )
+        return None
+
+    @staticmethod
+    @pytest.mark.parametrize("attribute", ["chat", "from_user"])
+    def test_incomplete_message(
+        test_custom_client: CustomClient, mock_message: Message, attribute: str
+    ) -> None:
+        mock_message.chat.id = -12345
+        mock_message.from_user.id = 123456789
+        setattr(mock_message, attribute, None)
+        assert not test_custom_client.admission_filter.admits(message=mock_message)
+        return None
+
+    @staticmethod
+    def test_rebuild(user_settings: MockUserSettings, mock_message: Message) -> None:
+        admission_filter: AdmissionFilter = AdmissionFilter(user_settings=user_settings)
+        mock_message.chat.id = -54321
+        mock_message.from_user.id = 234567890
+        assert not admission_filter.admits(message=mock_message)
+
+        user_settings.chats_allowed = {-54321: "Another Chat"}
+        user_settings.targets = {
+            234567890: ("Bob", src.constants.FriendshipStatus.FRIEND)
+        }
+        admission_filter.rebuild(user_settings=user_settings)
+        assert admission_filter.chats_allowed == frozenset({-54321})
+        assert admission_filter.targets == frozenset({234567890})
+        assert admission_filter.admits(message=mock_message)
+        return None
+
+
+class TestChatUpdateFilter:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "update, expected_result",
+        [
+            (UpdateChannel(channel_id=1), True),
+            (UpdateChat(chat_id=1), True),
+            (
+                UpdateUserName(user_id=1, first_name="", last_name="", usernames=[]),
+                False,
+            ),
+        ],
+    )
+    async def test(
+        test_custom_client: CustomClient, update: Any, expected_result: bool
+    ) -> None:
+        chat_update_filter: ChatUpdateFilter = ChatUpdateFilter()
+        assert await chat_update_filter(test_custom_client, update) is expected_result
+        return None
+
+
+class TestReactionUpdateFilter:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "update, expected_result",
+        [
+            (
+                UpdateMessageReactions(
+                    peer=PeerChannel(channel_id=1),
+                    msg_id=1,
+                    reactions=MessageReactions(results=[]),
+                ),
+                True,
+            ),
+            (UpdateChannel(channel_id=1), False),
+        ],
+    )
+    async def test(
+        test_custom_client: CustomClient, update: Any, expected_result: bool
+    ) -> None:
+        reaction_update_filter: ReactionUpdateFilter = ReactionUpdateFilter()
+        assert (
+            await reaction_update_filter(test_custom_client, update) is expected_result
+        )
+        return None
@@ -0,0 +1,53 @@
+from itertools import count
+from unittest.mock import patch
+
+from src.boot import BootReport, process_age
+
+
+class TestProcessAge:
+    @staticmethod
+    def test() -> None:
+        age: float | None = process_age()
+        assert age is None or age >= 0
+
+        with patch("builtins.open", side_effect=OSError):
+            assert process_age() is None
+        return None
+
+
+class TestBootReport:
+    @staticmethod
+    def test_phases() -> None:
+        # every reading of the timer is a second later
+        boot_report: BootReport = BootReport(timer=count().__next__)
+        boot_report.add(name="imports", seconds=0.5)
+        with boot_report.phase("config"):
+            pass
+        # the slowest of concurrent accounts is kept
+        for _ in range(2):
+            with boot_report.phase("session"):
+                boot_report.timer()
+        boot_report.add(name="session", seconds=1)
+        assert boot_report.phases == {"imports": 0.5, "config": 1, "session": 2}
+
+        with patch("src.boot.logger.success") as mock_success:
+            boot_report.ready()
+        assert boot_report.ready_in == 9.5
+        mock_success.assert_called_once_with(
+            "Startup report|ready in 9.500 s: "
+            "imports 0.500 s, config 1.000 s, session 2.000 s"
+        )
+        return None
+
+    @staticmethod
+    def test_samples() -> None:
+        boot_report: BootReport = BootReport()
+        with boot_report.phase("warmup"):
+            pass
+        assert "clownizer_boot_seconds" not in "\n".join(boot_report.samples())
+
+        boot_report.ready()
+        text: str = "\n".join(boot_report.samples())
+        assert 'clownizer_boot_phase_seconds{phase="warmup"}' in text
+        assert "# TYPE clownizer_boot_seconds gauge" in text
+        return None
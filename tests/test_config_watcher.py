@@ -0,0 +1,149 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import src.constants
+from src.config_watcher import ConfigWatcher
+from src.custom_client import CustomClient
+from src.user_settings import UserSettings
+
+
+def touch(config_file: Path, content: str, mtime: int) -> None:
+    config_file.write_text(content, encoding="utf-8")
+    # the check compares modification times
+    os.utime(config_file, ns=(mtime, mtime))
+    return None
+
+
+class TestConfigWatcher:
+    @staticmethod
+    def test_apply(test_custom_client: CustomClient) -> None:
+        user_settings: UserSettings = test_custom_client.user_settings
+        test_custom_client.msg_store.add(key=(-12345, 1), sender_id=123456789)
+        test_custom_client.msg_store.add(key=(-12345, 2), sender_id=234567890)
+        test_custom_client.msg_store.add(key=(123456789, 3), sender_id=123456789)
+        test_custom_client.msg_store.set_eligible(key=(-12345, 2), is_eligible=False)
+        test_custom_client.emoticon_index.build(
+            chat_id=-12345,
+            is_friend=False,
+            emoticons_allowed=("🤡",),
+            emoticons_from_friendship=("🤡",),
+        )
+
+        changed: set[str] = ConfigWatcher.apply(
+            custom_client=test_custom_client,
+            user_settings=user_settings.model_copy(
+                update={
+                    "targets": {
+                        234567890: ("Bob", src.constants.FriendshipStatus.FRIEND)
+                    },
+                    "chats_allowed": {-54321: "Other Chat"},
+                    "emoticons_for_enemies": ("🤡", "💩"),
+                    "msg_queue_size": 100,
+                }
+            ),
+        )
+
+        assert changed == {"targets", "chats_allowed", "emoticons_for_enemies"}
+        # the settings are swapped, not changed in place
+        assert test_custom_client.user_settings is not user_settings
+        assert user_settings.emoticons_for_enemies == ("🤡",)
+        assert test_custom_client.user_settings.emoticons_for_enemies == ("🤡", "💩")
+        assert test_custom_client.user_settings.msg_queue_size == 10
+        assert test_custom_client.admission_filter.targets == {234567890}
+        assert test_custom_client.admission_filter.chats_allowed == {-54321}
+        assert test_custom_client.recorder.targets == {
+            234567890: ("Bob", src.constants.FriendshipStatus.FRIEND)
+        }
+        assert not test_custom_client.emoticon_index
+        # a removed target and a removed chat are forgotten
+        assert not test_custom_client.msg_store
+
+        assert not ConfigWatcher.apply(
+            custom_client=test_custom_client,
+            user_settings=test_custom_client.user_settings,
+        )
+        return None
+
+    @staticmethod
+    def test_apply_reset(test_custom_client: CustomClient) -> None:
+        test_custom_client.msg_store.add(key=(-12345, 1), sender_id=123456789)
+        test_custom_client.msg_store.set_eligible(key=(-12345, 1), is_eligible=False)
+
+        ConfigWatcher.apply(
+            custom_client=test_custom_client,
+            user_settings=test_custom_client.user_settings.model_copy(
+                update={"emoticons_for_friends": ("👍", "❤")}
+            ),
+        )
+        # skipped messages may be updatable with the new emoticons
+        assert test_custom_client.msg_store.eligible == 1
+        return None
+
+    @staticmethod
+    def test_apply_reschedule(test_custom_client: CustomClient) -> None:
+        ConfigWatcher.apply(
+            custom_client=test_custom_client,
+            user_settings=test_custom_client.user_settings.model_copy(
+                update={"update_timeout": 60}
+            ),
+        )
+        assert test_custom_client.scheduler.get_job(test_custom_client.name) is None
+
+        test_custom_client.scheduler.add_job(
+            func=print,
+            trigger=test_custom_client.scheduler.trigger,
+            id=test_custom_client.name,
+        )
+        ConfigWatcher.apply(
+            custom_client=test_custom_client,
+            user_settings=test_custom_client.user_settings.model_copy(
+                update={"update_timeout": 30, "update_jitter": 0}
+            ),
+        )
+        trigger = test_custom_client.scheduler.get_job(test_custom_client.name).trigger
+        assert trigger.interval.total_seconds() == 30
+        assert not trigger.jitter
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_check(
+        test_custom_client: CustomClient,
+        valid_config_content: str,
+        invalid_config_content: str,
+        tmp_path: Path,
+    ) -> None:
+        config_file: Path = tmp_path / "config.yaml"
+        touch(config_file=config_file, content=valid_config_content, mtime=1)
+        config_watcher: ConfigWatcher = ConfigWatcher(
+            config_file=str(config_file),
+            custom_clients=[test_custom_client],
+            accounts={
+                test_custom_client.name: UserSettings.from_config(str(config_file))
+            },
+        )
+        assert not await config_watcher.check()
+
+        touch(
+            config_file=config_file,
+            content=valid_config_content.replace(
+                "update_timeout: 5", "update_timeout: 7"
+            )
+            + "accounts:\n  test_client:\n",
+            mtime=2,
+        )
+        assert await config_watcher.check()
+        assert test_custom_client.user_settings.update_timeout == 7
+        assert config_watcher.reloads == 1
+
+        touch(config_file=config_file, content=invalid_config_content, mtime=3)
+        assert not await config_watcher.check()
+        assert test_custom_client.user_settings.update_timeout == 7
+        assert config_watcher.failures == 1
+        assert test_custom_client.metrics.counters["config_reloads_total"] == {
+            'outcome="applied"': 1,
+            'outcome="failed"': 1,
+        }
+        return None
@@ -115,3 +115,33 @@ class TestSample:
         emoticons: Sequence[str] = request.getfixturevalue(emoticons_fixture)
         cls.validate(emoticons=emoticons, expected_length=expected_length)
         return None
+
+
+class TestForgetChat:
+    @staticmethod
+    def test(test_custom_client: CustomClient) -> None:
+        test_custom_client.chat_info_map[1] = "info"
+        test_custom_client.chat_emoticons_map[1] = ("👍",)
+        test_custom_client.chat_peer_map[1] = "peer"
+        test_custom_client.emoticon_index.build(
+            chat_id=1,
+            is_friend=True,
+            emoticons_allowed=("👍",),
+            emoticons_from_friendship=("👍",),
+        )
+
+        test_custom_client.forget_chat(chat_id=1)
+        assert 1 not in test_custom_client.chat_info_map
+        assert 1 not in test_custom_client.chat_emoticons_map
+        assert test_custom_client.emoticon_index.get(chat_id=1, is_friend=True) is None
+        assert test_custom_client.chat_peer_map[1] == "peer"
+        return None
+
+    @staticmethod
+    def test_bounded(test_custom_client: CustomClient) -> None:
+        maxsize: int = test_custom_client.user_settings.chat_cache_size
+        for chat_id in range(maxsize + 1):
+            test_custom_client.chat_info_map[chat_id] = "info"
+        assert len(test_custom_client.chat_info_map) == maxsize
+        assert test_custom_client.chat_info_map.evictions == 1
+        return None
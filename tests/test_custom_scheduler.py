@@ -1,3 +1,9 @@
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    JobEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
@@ -16,3 +22,14 @@ class TestCustomScheduler:
         )
         assert scheduler.trigger.jitter == user_settings.update_jitter
         return None
+
+    @staticmethod
+    def test_job_events(user_settings: MockUserSettings) -> None:
+        scheduler: CustomScheduler = CustomScheduler(user_settings=user_settings)
+        for code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MAX_INSTANCES):
+            scheduler._dispatch_event(
+                JobEvent(code=code, job_id="my_app", jobstore="default")
+            )
+        assert scheduler.runs == {"my_app": 2}
+        assert scheduler.skips == {"my_app": 1}
+        return None
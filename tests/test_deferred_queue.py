@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.deferred_queue import DeferredQueue
+
+
+class TestDeferredQueue:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_resume_in_order() -> None:
+        deferred_queue: DeferredQueue = DeferredQueue(max_size=10, max_age=60)
+        resumed: list[str] = []
+        resume: AsyncMock = AsyncMock(side_effect=resumed.append)
+        deferred_queue.start(resume=resume)
+
+        now: float = deferred_queue.timer()
+        assert deferred_queue.defer(item="late", resume_at=now + 0.05, created_at=now)
+        assert deferred_queue.defer(item="early", resume_at=now, created_at=now)
+        assert len(deferred_queue) == 2
+
+        await asyncio.sleep(0.1)
+        assert resumed == ["early", "late"]
+        assert len(deferred_queue) == 0
+        assert deferred_queue.resumed == 2
+        await deferred_queue.stop()
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_single_timer() -> None:
+        deferred_queue: DeferredQueue = DeferredQueue(max_size=10, max_age=60)
+        deferred_queue.start(resume=AsyncMock())
+        now: float = deferred_queue.timer()
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        with patch.object(loop, "call_later", wraps=loop.call_later) as call_later:
+            deferred_queue.defer(item=1, resume_at=now + 10, created_at=now)
+            # a later item does not move the timer
+            deferred_queue.defer(item=2, resume_at=now + 20, created_at=now)
+            deferred_queue.defer(item=3, resume_at=now + 5, created_at=now)
+
+        assert call_later.call_count == 2
+        await deferred_queue.stop()
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_drop_stale() -> None:
+        timer: Mock = Mock(return_value=100.0)
+        deferred_queue: DeferredQueue = DeferredQueue(
+            max_size=10, max_age=60, timer=timer
+        )
+        resume: AsyncMock = AsyncMock()
+        deferred_queue.start(resume=resume)
+
+        deferred_queue.defer(item="stale", resume_at=100.0, created_at=30.0)
+        deferred_queue.defer(item="fresh", resume_at=100.0, created_at=90.0)
+        await asyncio.sleep(0.01)
+
+        resume.assert_awaited_once_with("fresh")
+        assert deferred_queue.dropped == 1
+        await deferred_queue.stop()
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cap() -> None:
+        deferred_queue: DeferredQueue = DeferredQueue(max_size=1, max_age=60)
+        # not started yet
+        assert not deferred_queue.defer(item=0, resume_at=0, created_at=0)
+
+        deferred_queue.start(resume=AsyncMock())
+        now: float = deferred_queue.timer()
+        assert deferred_queue.defer(item=1, resume_at=now + 10, created_at=now)
+        assert not deferred_queue.defer(item=2, resume_at=now + 10, created_at=now)
+        assert deferred_queue.dropped == 2
+
+        with patch("src.deferred_queue.logger.error") as mock_error:
+            await deferred_queue.stop()
+        mock_error.assert_called_once()
+        assert len(deferred_queue) == 0
+        assert deferred_queue.dropped == 3
+        assert not deferred_queue.is_running
+        return None
@@ -0,0 +1,42 @@
+from src.emoticon_index import EmoticonIndex
+
+
+class TestEmoticonIndex:
+    @staticmethod
+    def test_build() -> None:
+        index: EmoticonIndex = EmoticonIndex(maxsize=10)
+        assert index.get(chat_id=1, is_friend=True) is None
+
+        result = index.build(
+            chat_id=1,
+            is_friend=True,
+            emoticons_allowed=("👍", "👎", "❤", "👍"),
+            emoticons_from_friendship=("❤", "👍", "🔥"),
+        )
+        assert result == ("👍", "❤")
+        assert index.get(chat_id=1, is_friend=True) == ("👍", "❤")
+        assert index.get(chat_id=1, is_friend=False) is None
+        return None
+
+    @staticmethod
+    def test_invalidate() -> None:
+        index: EmoticonIndex = EmoticonIndex(maxsize=10)
+        for chat_id in (1, 2):
+            for is_friend in (True, False):
+                index.build(
+                    chat_id=chat_id,
+                    is_friend=is_friend,
+                    emoticons_allowed=("👍",),
+                    emoticons_from_friendship=("👍",),
+                )
+        assert len(index) == 4
+
+        index.invalidate(chat_id=1)
+        assert index.get(chat_id=1, is_friend=True) is None
+        assert index.get(chat_id=1, is_friend=False) is None
+        assert index.get(chat_id=2, is_friend=True) == ("👍",)
+        assert len(index) == 2
+
+        index.clear()
+        assert len(index) == 0
+        return None
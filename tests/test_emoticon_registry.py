@@ -0,0 +1,48 @@
+from pyrogram.raw.types import ReactionEmoji
+
+import src.constants
+from src.emoticon_registry import EmoticonRegistry, emoticon_registry
+
+
+class TestValidEmoticons:
+    @staticmethod
+    def test() -> None:
+        assert len(set(src.constants.VALID_EMOTICONS)) == len(
+            src.constants.VALID_EMOTICONS
+        )
+        # zero-width joiners only join emoticons, never stand alone
+        assert "‍" not in src.constants.VALID_EMOTICONS
+        for emoticon in ("❤‍🔥", "👨‍💻", "🤷‍♂", "🤷‍♀"):
+            assert emoticon in emoticon_registry
+        return None
+
+
+class TestEmoticonRegistry:
+    @staticmethod
+    def test_mask() -> None:
+        registry: EmoticonRegistry = EmoticonRegistry(emoticons=("👍", "👎", "❤", "👍"))
+        assert len(registry) == 3
+        assert registry.all == 0b111
+        assert registry.mask(("❤", "👍", "🔥")) == 0b101
+        assert registry.exact_mask(("❤", "👍")) == 0b101
+        assert registry.exact_mask(("❤", "🔥")) is None
+        assert registry.decode(0b101) == ("👍", "❤")
+        # decoded emoticons are shared
+        assert registry.decode(0b101) is registry.decode(0b101)
+        assert registry.decode(0) == ()
+        return None
+
+    @staticmethod
+    def test_is_subset() -> None:
+        assert EmoticonRegistry.is_subset(0b001, of=0b101)
+        assert EmoticonRegistry.is_subset(0, of=0)
+        assert not EmoticonRegistry.is_subset(0b011, of=0b101)
+        return None
+
+    @staticmethod
+    def test_emojis() -> None:
+        emojis: list[ReactionEmoji] = emoticon_registry.emojis(("👍", "🔥", "x"))
+        assert emojis == [ReactionEmoji(emoticon="👍"), ReactionEmoji(emoticon="🔥")]
+        # built once per emoticon
+        assert emoticon_registry.emojis(("👍",))[0] is emojis[0]
+        return None
@@ -0,0 +1,127 @@
+from typing import Sequence
+
+import pytest
+from pyrogram.errors import FloodWait, MessageIdInvalid, ReactionInvalid
+from pyrogram.raw.functions.messages import SendReaction
+from pyrogram.raw.types import InputPeerChannel, ReactionEmoji
+from pyrogram.types import Message
+
+from benchmarks.fake_backend import FakeBackend, Fault
+from benchmarks.stub_client import make_message
+
+
+def send_reaction(message_id: int, emoticons: Sequence[str]) -> SendReaction:
+    return SendReaction(
+        peer=InputPeerChannel(channel_id=100123, access_hash=0),
+        msg_id=message_id,
+        reaction=[ReactionEmoji(emoticon=emoticon) for emoticon in emoticons],
+    )
+
+
+class TestFakeBackend:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_flood_deadline() -> None:
+        fake_backend: FakeBackend = FakeBackend(
+            faults=[Fault(method="GetChat", error=FloodWait, rate=1, value=60)]
+        )
+
+        with pytest.raises(FloodWait) as exc_info:
+            await fake_backend.get_chat(chat_id=-100123)
+        assert exc_info.value.value == 60
+
+        # the method stays blocked until its deadline, the others don't
+        fake_backend.faults.clear()
+        with pytest.raises(FloodWait) as exc_info:
+            await fake_backend.get_chat(chat_id=-100123)
+        assert 0 < exc_info.value.value <= 60  # type: ignore
+        assert await fake_backend.get_me()
+
+        fake_backend.flood_deadlines["GetChat"] = 0.0
+        assert await fake_backend.get_chat(chat_id=-100123)
+        assert fake_backend.errors == {"GetChat:FloodWait": 2}
+        assert fake_backend.calls == {"GetChat": 3, "GetMe": 1}
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_fault_rates() -> None:
+        fake_backend: FakeBackend = FakeBackend(
+            faults=[
+                Fault(method="GetChat", error=MessageIdInvalid, rate=0.25),
+                Fault(method="GetMe", error=MessageIdInvalid, rate=0),
+            ],
+            seed=1,
+        )
+
+        for _ in range(1000):
+            try:
+                await fake_backend.get_chat(chat_id=-100123)
+            except MessageIdInvalid:
+                pass
+            await fake_backend.get_me()
+        assert 200 < fake_backend.errors["GetChat:MessageIdInvalid"] < 300
+        assert not fake_backend.errors["GetMe:MessageIdInvalid"]
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_send_reaction() -> None:
+        fake_backend: FakeBackend = FakeBackend(chat_emoticons={-100123: ["👍", "🔥"]})
+        fake_backend.post(
+            message=make_message(
+                chat_id=-100123, message_id=1, sender_id=777, reactions=("🤡", "🤡")
+            )
+        )
+
+        await fake_backend.invoke(query=send_reaction(message_id=1, emoticons=["👍"]))
+        assert fake_backend.reaction_counts[(-100123, 1)] == {"🤡": 1, "👍": 1}
+
+        # own reactions are replaced, the others stay
+        await fake_backend.invoke(query=send_reaction(message_id=1, emoticons=["🔥"]))
+        assert fake_backend.reaction_counts[(-100123, 1)] == {"🤡": 1, "🔥": 1}
+        assert fake_backend.chosen[(-100123, 1)] == ("🔥",)
+
+        await fake_backend.invoke(query=send_reaction(message_id=1, emoticons=[]))
+        assert fake_backend.reaction_counts[(-100123, 1)] == {"🤡": 1}
+
+        with pytest.raises(ReactionInvalid):
+            await fake_backend.invoke(
+                query=send_reaction(message_id=1, emoticons=["🤡"])
+            )
+        with pytest.raises(MessageIdInvalid):
+            await fake_backend.invoke(
+                query=send_reaction(message_id=2, emoticons=["👍"])
+            )
+        assert fake_backend.errors == {
+            "SendReaction:ReactionInvalid": 1,
+            "SendReaction:MessageIdInvalid": 1,
+        }
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_messages() -> None:
+        fake_backend: FakeBackend = FakeBackend()
+        fake_backend.post(
+            message=make_message(chat_id=-100123, message_id=1, sender_id=777)
+        )
+        await fake_backend.invoke(query=send_reaction(message_id=1, emoticons=["👍"]))
+
+        messages: list[Message] = await fake_backend.get_messages(  # type: ignore
+            chat_id=-100123, message_ids=[1, 2]
+        )
+        assert messages[0].from_user.id == 777
+        assert {
+            reaction.emoji: reaction.count
+            for reaction in messages[0].reactions.reactions  # type: ignore
+        } == {"🤡": 1, "👍": 1}
+        # unknown messages come back empty, as deleted ones do
+        assert messages[1].id == 2
+        assert messages[1].empty
+
+        message: Message = await fake_backend.get_messages(  # type: ignore
+            chat_id=-100123, message_ids=3
+        )
+        assert message.empty
+        return None
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
-import pytest
 from pyrogram.errors import FloodWait
 
 from src.custom_client import CustomClient
@@ -10,21 +9,26 @@ from src.floodwait_manager import FloodWaitManager
 
 class TestFloodwaitManager:
     @staticmethod
-    @pytest.mark.asyncio
-    async def test_handle(
+    def test_handle(
         flood_wait_error: FloodWait, test_custom_client: CustomClient
     ) -> None:
         client: CustomClient = test_custom_client
         client.scheduler.pause = Mock()
-        client.scheduler.resume = Mock()
 
         with patch("src.floodwait_manager.logger.error") as mock_logger_error:
             start_time: datetime = datetime.now()
-            await FloodWaitManager.handle(f=flood_wait_error, custom_client=client)
+            FloodWaitManager.handle(
+                f=flood_wait_error,
+                custom_client=client,
+                method="SendReaction",
+                chat_id=1,
+            )
             end_time: datetime = start_time + timedelta(seconds=flood_wait_error.value)
 
-        client.scheduler.pause.assert_called_once()
-        client.scheduler.resume.assert_called_once()
+        # the rest of the bot keeps running
+        client.scheduler.pause.assert_not_called()
+        assert client.rate_limiter.factor < 1
+        assert set(client.flood_deadlines) == {("SendReaction", 1)}
         mock_logger_error.assert_called_once()
 
         logged_message: str = mock_logger_error.call_args[0][0]
@@ -32,9 +36,62 @@ class TestFloodwaitManager:
             f"FloodWait is provoked...|{flood_wait_error.value} s to wait"
             in logged_message
         )
-        assert "Program will resume at" in logged_message
+        assert "SendReaction in chat 1 will resume at" in logged_message
 
-        logged_time_str: str = logged_message.split("Program will resume at ")[1]
+        logged_time_str: str = logged_message.split("will resume at ")[1]
         logged_time: datetime = datetime.strptime(logged_time_str, "%Y-%m-%d %H:%M:%S")
         assert abs((logged_time - end_time).total_seconds()) < 1
         return None
+
+    @staticmethod
+    def test_scopes(test_custom_client: CustomClient) -> None:
+        client: CustomClient = test_custom_client
+        with patch("src.floodwait_manager.logger.error"):
+            FloodWaitManager.handle(
+                f=FloodWait(value=30),
+                custom_client=client,
+                method="GetMessages",
+                chat_id=1,
+            )
+
+        assert 29 < FloodWaitManager.delay(client, method="GetMessages", chat_id=1)
+        # unrelated limits do not block
+        assert FloodWaitManager.delay(client, method="GetMessages", chat_id=2) == 0
+        assert FloodWaitManager.delay(client, method="SendReaction", chat_id=1) == 0
+
+        with patch("src.floodwait_manager.logger.error"):
+            FloodWaitManager.handle(
+                f=FloodWait(value=30),
+                custom_client=client,
+                method="GetMessages",
+                chat_id=2,
+            )
+
+        # limits in two chats stay in their chats
+        assert set(client.flood_deadlines) == {("GetMessages", 1), ("GetMessages", 2)}
+        assert FloodWaitManager.delay(client, method="GetMessages", chat_id=3) == 0
+
+        with patch("src.floodwait_manager.logger.error"):
+            FloodWaitManager.handle(
+                f=FloodWait(value=30), custom_client=client, method="GetMessages"
+            )
+
+        # a limit without a chat blocks the method in every chat
+        assert 29 < FloodWaitManager.delay(client, method="GetMessages", chat_id=3)
+        assert FloodWaitManager.delay(client, method="SendReaction", chat_id=3) == 0
+        return None
+
+    @staticmethod
+    def test_handle_forgets_expired(test_custom_client: CustomClient) -> None:
+        client: CustomClient = test_custom_client
+        client.flood_deadlines[("GetMessages", 1)] = 0.0
+        with patch("src.floodwait_manager.logger.error"):
+            FloodWaitManager.handle(
+                f=FloodWait(value=1),
+                custom_client=client,
+                method="GetMessages",
+                chat_id=2,
+            )
+
+        assert set(client.flood_deadlines) == {("GetMessages", 2)}
+        return None
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.jsonl_writer import JsonLinesWriter
+
+
+class TestJsonLinesWriter:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write(tmp_path: Path) -> None:
+        path: Path = tmp_path / "records.jsonl"
+        writer: JsonLinesWriter = JsonLinesWriter(path=str(path), batch_size=2)
+
+        for n in range(3):
+            writer.write(record={"n": n, "emoticon": "🤡"})
+        # the first two records are written as a batch in the background
+        await writer.flush()
+
+        lines: list[str] = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["n"] for line in lines] == [0, 1, 2]
+        assert json.loads(lines[0])["emoticon"] == "🤡"
+        assert writer.written == 3
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_error(tmp_path: Path) -> None:
+        writer: JsonLinesWriter = JsonLinesWriter(path=str(tmp_path / "no" / "file"))
+        writer.write(record={"n": 0})
+        with patch("src.jsonl_writer.logger.error") as mock_error:
+            await writer.flush()
+
+        mock_error.assert_called_once()
+        return None
@@ -0,0 +1,35 @@
+from unittest.mock import Mock, patch
+
+from src.log_summary import LogSummary
+
+
+class TestLogSummary:
+    @staticmethod
+    def test_flush() -> None:
+        timer: Mock = Mock(return_value=0)
+        log_summary: LogSummary = LogSummary(timer=timer)
+        log_summary.add(method_name="respond", chat_id=1, emoticons=["👍", "🔥"])
+        log_summary.add(method_name="respond", chat_id=2, emoticons=["👍"])
+        log_summary.add(method_name="update", chat_id=1, emoticons=["🤡"])
+        assert len(log_summary) == 3
+
+        timer.return_value = 60
+        with patch("src.log_summary.logger.success") as mock_success:
+            log_summary.flush()
+
+        mock_success.assert_called_once_with(
+            "Summary|3 reactions in 2 chats for 60 s|respond: 2, update: 1|👍×2🔥×1🤡×1"
+        )
+        assert len(log_summary) == 0
+        assert not log_summary.chat_ids
+        assert log_summary.started_at == 60
+        return None
+
+    @staticmethod
+    def test_flush_empty() -> None:
+        log_summary: LogSummary = LogSummary()
+        with patch("src.log_summary.logger.success") as mock_success:
+            log_summary.flush()
+
+        mock_success.assert_not_called()
+        return None
@@ -1,10 +1,12 @@
+import zipfile
 from pathlib import Path
 from typing import Callable
+from unittest.mock import patch
 
 import pytest
 from loguru import logger
 
-from src.loggers import LoggerFilters
+from src.loggers import LogCompressor, LoggerFilters, setup_logging
 
 
 class TestFilter:
@@ -125,3 +127,39 @@ class TestLogging:
         assert "Info msg 1" not in logs
         assert "Success msg 2" in logs
         assert "Error msg 2" in logs
+        return None
+
+
+class TestLogCompressor:
+    @staticmethod
+    def test_compress(tmp_path: Path) -> None:
+        log_file: Path = tmp_path / "logfile.log"
+        log_file.write_text("SUCCESS|Test message")
+
+        with patch("src.loggers.threading.Thread") as mock_thread:
+            LogCompressor.compress(path=str(log_file))
+        # compression doesn't run in the calling thread
+        assert log_file.exists()
+        mock_thread.return_value.start.assert_called_once()
+
+        LogCompressor._zip(path=str(log_file))
+        assert not log_file.exists()
+        with zipfile.ZipFile(f"{log_file}.zip") as archive:
+            assert archive.read("logfile.log") == b"SUCCESS|Test message"
+        return None
+
+
+class TestSetupLogging:
+    @staticmethod
+    def test(tmp_path: Path) -> None:
+        log_dir: Path = tmp_path / "logs"
+        with (
+            patch("src.loggers.log_dir", str(log_dir)),
+            patch("src.loggers.logger") as mock_logger,
+        ):
+            setup_logging()
+        # nothing is created on import, only once logging is set up
+        assert log_dir.is_dir()
+        mock_logger.remove.assert_called_once_with()
+        assert mock_logger.add.call_count == 3
+        return None
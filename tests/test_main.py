@@ -1,9 +1,25 @@
-from unittest.mock import Mock, patch
+from pathlib import Path
+from typing import Mapping
+from unittest.mock import Mock, PropertyMock, patch
 
-from pyrogram.handlers import MessageHandler
+from pyrogram.handlers import MessageHandler, RawUpdateHandler
 
+from src.admission_filter import ChatUpdateFilter, ReactionUpdateFilter
 from src.custom_client import CustomClient
-from src.main import register_msg_handler, register_scheduler
+from src.main import (
+    App,
+    create_app,
+    create_clients,
+    register_chat_update_handler,
+    register_config_watch_job,
+    register_log_summary_job,
+    register_msg_handler,
+    register_reaction_update_handler,
+    register_scheduler,
+    register_snapshot_job,
+    select_account,
+)
+from src.user_settings import UserSettings
 
 
 class TestRegister:
@@ -22,25 +38,224 @@ class TestRegister:
         args, _ = mock_add_handler.call_args
         handler = args[0]
         assert isinstance(handler, MessageHandler)
+        assert handler.filters is test_custom_client.admission_filter
         return None
 
     @staticmethod
-    def test_scheduler(test_custom_client: CustomClient) -> None:
+    def test_chat_update_handler(test_custom_client: CustomClient) -> None:
         mock_func: Mock = Mock()
 
         with patch.object(
-            test_custom_client.scheduler, "add_job"
-        ) as mock_add_job, patch.object(
-            test_custom_client.scheduler, "start"
-        ) as mock_start:
+            test_custom_client, "add_handler", autospec=True
+        ) as mock_add_handler:
+            register_chat_update_handler(
+                custom_client=test_custom_client, func=mock_func
+            )
+
+        mock_add_handler.assert_called_once()
+        args, kwargs = mock_add_handler.call_args
+        handler = args[0]
+        assert isinstance(handler, RawUpdateHandler)
+        assert isinstance(handler.filters, ChatUpdateFilter)
+        assert kwargs["group"] == 1
+        return None
+
+    @staticmethod
+    def test_reaction_update_handler(test_custom_client: CustomClient) -> None:
+        mock_func: Mock = Mock()
+
+        with patch.object(
+            test_custom_client, "add_handler", autospec=True
+        ) as mock_add_handler:
+            register_reaction_update_handler(
+                custom_client=test_custom_client, func=mock_func
+            )
+
+        mock_add_handler.assert_called_once()
+        args, kwargs = mock_add_handler.call_args
+        assert isinstance(args[0], RawUpdateHandler)
+        assert isinstance(args[0].filters, ReactionUpdateFilter)
+        assert kwargs["group"] == 1
+        return None
+
+    @staticmethod
+    def test_scheduler(test_custom_client: CustomClient) -> None:
+        mock_func: Mock = Mock()
+
+        with (
+            patch.object(test_custom_client.scheduler, "add_job") as mock_add_job,
+            patch.object(test_custom_client.scheduler, "start") as mock_start,
+        ):
             register_scheduler(custom_client=test_custom_client, func=mock_func)
 
-            mock_add_job.assert_called_once_with(
-                func=mock_func,
-                trigger=test_custom_client.scheduler.trigger,
-                args=[test_custom_client],
-                id=test_custom_client.name,
-                replace_existing=True,
+            mock_add_job.assert_called_once()
+            kwargs: Mapping = mock_add_job.call_args.kwargs
+            assert kwargs["func"] is mock_func
+            assert kwargs["trigger"].interval.total_seconds() == (
+                test_custom_client.user_settings.update_timeout
             )
+            assert kwargs["args"] == [test_custom_client]
+            assert kwargs["id"] == test_custom_client.name
             mock_start.assert_called_once()
         return None
+
+    @staticmethod
+    def test_shared_scheduler(test_custom_client: CustomClient) -> None:
+        with (
+            patch.object(test_custom_client.scheduler, "add_job") as mock_add_job,
+            patch.object(
+                type(test_custom_client.scheduler),
+                "running",
+                new_callable=PropertyMock,
+                return_value=True,
+            ),
+            patch.object(test_custom_client.scheduler, "start") as mock_start,
+        ):
+            register_scheduler(custom_client=test_custom_client, func=Mock())
+
+            # another account has started the scheduler
+            mock_add_job.assert_called_once()
+            mock_start.assert_not_called()
+        return None
+
+    @staticmethod
+    def test_snapshot_job(test_custom_client: CustomClient) -> None:
+        mock_func: Mock = Mock()
+
+        with patch.object(test_custom_client.scheduler, "add_job") as mock_add_job:
+            register_snapshot_job(custom_client=test_custom_client, func=mock_func)
+            mock_add_job.assert_called_once()
+            _, kwargs = mock_add_job.call_args
+            assert kwargs["func"] == mock_func
+            assert kwargs["trigger"].interval.total_seconds() == (
+                test_custom_client.user_settings.snapshot_interval
+            )
+
+            mock_add_job.reset_mock()
+            test_custom_client.user_settings.snapshot_interval = 0
+            register_snapshot_job(custom_client=test_custom_client, func=mock_func)
+            mock_add_job.assert_not_called()
+        return None
+
+    @staticmethod
+    def test_log_summary_job(test_custom_client: CustomClient) -> None:
+        with patch.object(test_custom_client.scheduler, "add_job") as mock_add_job:
+            register_log_summary_job(custom_client=test_custom_client)
+            mock_add_job.assert_not_called()
+
+            test_custom_client.user_settings.log_summary_interval = 60
+            register_log_summary_job(custom_client=test_custom_client)
+            mock_add_job.assert_called_once()
+            _, kwargs = mock_add_job.call_args
+            assert kwargs["func"] == test_custom_client.log_summary.flush
+            assert kwargs["trigger"].interval.total_seconds() == 60
+        return None
+
+    @staticmethod
+    def test_config_watch_job(test_custom_client: CustomClient) -> None:
+        mock_func: Mock = Mock()
+
+        with patch.object(test_custom_client.scheduler, "add_job") as mock_add_job:
+            register_config_watch_job(custom_client=test_custom_client, func=mock_func)
+            mock_add_job.assert_called_once()
+            _, kwargs = mock_add_job.call_args
+            assert kwargs["func"] == mock_func
+            assert kwargs["trigger"].interval.total_seconds() == (
+                test_custom_client.user_settings.config_reload_interval
+            )
+
+            mock_add_job.reset_mock()
+            test_custom_client.user_settings.config_reload_interval = 0
+            register_config_watch_job(custom_client=test_custom_client, func=mock_func)
+            mock_add_job.assert_not_called()
+        return None
+
+
+class TestCreateClients:
+    @staticmethod
+    def test_accounts(user_settings: UserSettings) -> None:
+        bob_settings: UserSettings = user_settings.model_copy(
+            update={"update_timeout": 10}
+        )
+        alice, bob = create_clients(
+            accounts={"alice": user_settings, "bob": bob_settings}
+        )
+
+        assert (alice.name, bob.name) == ("alice", "bob")
+        assert bob.user_settings.update_timeout == 10
+        assert alice.chat_info_map is bob.chat_info_map
+        assert alice.chat_peer_map is not bob.chat_peer_map
+        assert alice.scheduler is bob.scheduler
+        assert alice.metrics.counters is bob.metrics.counters
+        assert bob.metrics.base_labels == 'account="bob"'
+        return None
+
+    @staticmethod
+    def test_shared_chat_info(user_settings: UserSettings) -> None:
+        alice, bob = create_clients(
+            accounts={"alice": user_settings, "bob": user_settings}
+        )
+        alice.chat_emoticons_map[-1] = ("👍", "🤡")
+        alice.emoticon_index.build(
+            chat_id=-1,
+            is_friend=False,
+            emoticons_allowed=("👍", "🤡"),
+            emoticons_from_friendship=("🤡",),
+        )
+
+        # chat info refreshed by one account is the chat info of the others
+        bob.forget_chat(chat_id=-1)
+        assert -1 not in alice.chat_emoticons_map
+        assert alice.emoticon_index.get(chat_id=-1, is_friend=False) is None
+        return None
+
+    @staticmethod
+    def test_single_account(user_settings: UserSettings) -> None:
+        (custom_client,) = create_clients(accounts={"my_app": user_settings})
+        assert custom_client.metrics.base_labels == ""
+        return None
+
+
+class TestSelectAccount:
+    @staticmethod
+    def test(user_settings: UserSettings) -> None:
+        accounts: dict[str, UserSettings] = {
+            "alice": user_settings,
+            "bob": user_settings,
+        }
+        assert (
+            select_account(accounts=accounts, name=None, metrics_port=None) is accounts
+        )
+
+        # a supervisor worker runs one account serving metrics locally
+        worker_accounts: dict[str, UserSettings] = select_account(
+            accounts=accounts, name="bob", metrics_port="9102"
+        )
+        assert list(worker_accounts) == ["bob"]
+        assert worker_accounts["bob"].metrics_port == 9102
+        assert worker_accounts["bob"].metrics_host == "127.0.0.1"
+        assert user_settings.metrics_port is None
+        return None
+
+
+class TestCreateApp:
+    @staticmethod
+    def test(valid_config_content: str, tmp_path: Path) -> None:
+        config_file: Path = tmp_path / "config.yaml"
+        config_file.write_text(
+            valid_config_content + "accounts:\n  alice:\n  bob:\n", encoding="utf-8"
+        )
+
+        with (
+            patch("src.main.setup_logging") as mock_setup_logging,
+            patch.dict("os.environ", {"WORKER_ACCOUNT": "bob"}),
+        ):
+            app: App = create_app(config_file=str(config_file))
+        mock_setup_logging.assert_called_once_with()
+        # a worker runs its own account and watches the config of all accounts
+        assert [client.name for client in app.clients] == ["bob"]
+        assert list(app.config_watcher.accounts) == ["alice", "bob"]
+        assert list(app.boot_report.phases)[-3:] == ["logging", "config", "clients"]
+        # nothing is connected before the app runs
+        assert not app.clients[0].is_connected
+        return None
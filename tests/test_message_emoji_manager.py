@@ -1,9 +1,11 @@
-from collections import deque
-from typing import Any, Callable, Optional, Sequence
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, Optional, Sequence
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from cachetools import LRUCache
 from pyrogram.enums import ChatType
 from pyrogram.errors import (
     BadRequest,
@@ -15,14 +17,28 @@ from pyrogram.errors import (
 )
 from pyrogram.raw import functions
 from pyrogram.raw.base import Peer
-from pyrogram.raw.types import ReactionEmoji
+from pyrogram.raw.types import (
+    MessageReactions,
+    PeerChannel,
+    ReactionCount,
+    ReactionEmoji,
+    UpdateChannel,
+    UpdateChat,
+    UpdateMessageReactions,
+)
 from pyrogram.types import Chat, Message, Reaction, User
 from pyrogram.types.messages_and_media.message import Str
 
 import src.constants
+from benchmarks.stub_client import StubNetwork, make_message
 from src.custom_client import CustomClient
+from src.emoticon_registry import emoticon_registry
 from src.floodwait_manager import FloodWaitManager
+from src.loggers import logger
 from src.message_emoji_manager import MessageEmojiManager as Manager
+from src.reaction_sender import ReactionJob
+from src.stats_cache import StatsTTLCache
+from src.tracer import Trace
 
 
 class TestEcho:
@@ -71,6 +87,32 @@ class TestRespond:
             mock_place_emojis.assert_called_once()
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_chat_floodwait(
+        test_custom_client: CustomClient, mock_message: Message
+    ) -> None:
+        manager: Manager = Manager()
+        test_custom_client.user_settings.targets = {
+            mock_message.from_user.id: ("Alice", src.constants.FriendshipStatus.ENEMY)
+        }
+        test_custom_client.get_chat = AsyncMock(  # type: ignore
+            side_effect=FloodWait(300)
+        )
+
+        with patch("src.floodwait_manager.logger.error"):
+            for _ in range(3):
+                await manager.respond(
+                    custom_client=test_custom_client, message=mock_message
+                )
+
+        # the following messages wait for the FloodWait to end
+        test_custom_client.get_chat.assert_awaited_once()
+        assert list(test_custom_client.flood_deadlines) == [
+            ("GetChat", mock_message.chat.id)
+        ]
+        return None
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_invalid_message(test_custom_client: CustomClient) -> None:
@@ -378,6 +420,208 @@ class TestRespond:
 
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_queued(
+        test_custom_client: CustomClient, mock_message: Message, mock_peer: Peer
+    ) -> None:
+        manager: Manager = Manager()
+        manager._write_chat_info_from_id = AsyncMock()  # type: ignore
+        manager._write_chat_peer_from_id = AsyncMock()  # type: ignore
+        test_custom_client.reaction_sender.submit = Mock(  # type: ignore
+            return_value=True
+        )
+        with patch.object(
+            manager, "_chat_emoticons_from_chat_id", return_value=["👍", "👎"]
+        ), patch.object(
+            manager, "_peer_from_chat_id", return_value=mock_peer
+        ), patch.object(
+            manager, "send_response", new_callable=AsyncMock
+        ) as mock_send_response:
+            test_custom_client.emoticon_picker = lambda x: ["👍"]
+            test_custom_client.user_settings.targets = {
+                mock_message.from_user.id: (
+                    "Alice",
+                    src.constants.FriendshipStatus.FRIEND,
+                )
+            }
+            await manager.respond(
+                custom_client=test_custom_client, message=mock_message
+            )
+            mock_send_response.assert_not_called()
+
+        test_custom_client.reaction_sender.submit.assert_called_once()
+        job: ReactionJob = test_custom_client.reaction_sender.submit.call_args.kwargs[
+            "job"
+        ]
+        assert job.method_name == "respond"
+        assert job.chat_id == mock_message.chat.id
+        assert job.message is mock_message
+        assert job.peer is mock_peer
+        assert job.emoticons == ["👍"]
+        return None
+
+
+class TestSendResponse:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("place_emojis_side_effect", [None, BadRequest()])
+    async def test(
+        test_custom_client: CustomClient,
+        mock_message: Message,
+        mock_peer: Peer,
+        place_emojis_side_effect: Exception | None,
+    ) -> None:
+        manager: Manager = Manager()
+        manager._place_emojis = AsyncMock(  # type: ignore
+            side_effect=place_emojis_side_effect
+        )
+        manager._log_method_success = Mock()  # type: ignore
+        job: ReactionJob = ReactionJob(
+            method_name="respond",
+            chat_id=mock_message.chat.id,
+            message=mock_message,
+            peer=mock_peer,
+            emoticons=["👍"],
+            emojis=[ReactionEmoji(emoticon="👍")],
+            created_at=0,
+        )
+
+        await manager.send_response(custom_client=test_custom_client, job=job)
+
+        manager._place_emojis.assert_awaited_once_with(
+            custom_client=test_custom_client,
+            peer=mock_peer,
+            chat_id=mock_message.chat.id,
+            message_id=mock_message.id,
+            emojis=job.emojis,
+        )
+        msg_key = (mock_message.chat.id, mock_message.id)
+        if place_emojis_side_effect is None:
+            manager._log_method_success.assert_called_once()
+            assert test_custom_client.msg_store.get(key=msg_key) is mock_message
+            assert test_custom_client.msg_store.choice() == msg_key
+            assert "👍" in test_custom_client.reaction_mirror.emoticons(  # type: ignore
+                *msg_key
+            )
+        else:
+            manager._log_method_success.assert_not_called()
+            assert msg_key not in test_custom_client.msg_store
+            assert msg_key not in test_custom_client.reaction_mirror
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_floodwait(
+        test_custom_client: CustomClient, mock_message: Message, mock_peer: Peer
+    ) -> None:
+        manager: Manager = Manager()
+        manager._place_emojis = AsyncMock(side_effect=FloodWait(10))  # type: ignore
+        test_custom_client.flood_deadlines[("SendReaction", mock_message.chat.id)] = (
+            time.monotonic() + 10
+        )
+        test_custom_client.deferred_queue.defer = Mock(  # type: ignore
+            return_value=True
+        )
+        job: ReactionJob = ReactionJob(
+            method_name="respond",
+            chat_id=mock_message.chat.id,
+            message=mock_message,
+            peer=mock_peer,
+            emoticons=["👍"],
+            emojis=[ReactionEmoji(emoticon="👍")],
+            created_at=0,
+        )
+
+        # the deadline is known in advance, so the reaction is not even tried
+        await manager.send_response(custom_client=test_custom_client, job=job)
+        manager._place_emojis.assert_not_awaited()
+
+        test_custom_client.flood_deadlines.clear()
+        await manager.send_response(custom_client=test_custom_client, job=job)
+        manager._place_emojis.assert_awaited_once()
+
+        assert test_custom_client.deferred_queue.defer.call_count == 2
+        assert test_custom_client.deferred_queue.defer.call_args.kwargs["item"] is job
+        assert not test_custom_client.msg_store
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_deferred_queue_full(
+        test_custom_client: CustomClient, mock_message: Message, mock_peer: Peer
+    ) -> None:
+        manager: Manager = Manager()
+        test_custom_client.flood_deadlines[("SendReaction", mock_message.chat.id)] = (
+            time.monotonic() + 10
+        )
+        job: ReactionJob = ReactionJob(
+            method_name="respond",
+            chat_id=mock_message.chat.id,
+            message=mock_message,
+            peer=mock_peer,
+            emoticons=["👍"],
+            emojis=[ReactionEmoji(emoticon="👍")],
+            created_at=0,
+        )
+
+        # the deferred queue is not started
+        with patch("src.message_emoji_manager.logger.error") as mock_error:
+            await manager.send_response(custom_client=test_custom_client, job=job)
+
+        mock_error.assert_called_once()
+        assert test_custom_client.deferred_queue.dropped == 1
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("is_submitted", [True, False])
+    async def test_resume_response(
+        test_custom_client: CustomClient, is_submitted: bool
+    ) -> None:
+        manager: Manager = Manager()
+        manager.send_response = AsyncMock()  # type: ignore
+        test_custom_client.reaction_sender.submit = Mock(  # type: ignore
+            return_value=is_submitted
+        )
+        job: Mock = Mock()
+
+        await manager.resume_response(custom_client=test_custom_client, job=job)
+
+        test_custom_client.reaction_sender.submit.assert_called_once_with(job=job)
+        assert manager.send_response.await_count == int(not is_submitted)
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_trace(
+        test_custom_client: CustomClient, mock_message: Message, mock_peer: Peer
+    ) -> None:
+        manager: Manager = Manager()
+        manager._place_emojis = AsyncMock()  # type: ignore
+        manager._log_method_success = Mock()  # type: ignore
+        tracer: Mock = Mock()
+        trace: Trace = Trace(tracer=tracer, name="respond")
+        mock_message.date = datetime.now() - timedelta(seconds=5)
+        job: ReactionJob = ReactionJob(
+            method_name="respond",
+            chat_id=mock_message.chat.id,
+            message=mock_message,
+            peer=mock_peer,
+            emoticons=["👍"],
+            emojis=[ReactionEmoji(emoticon="👍")],
+            created_at=0,
+            trace=trace,
+        )
+
+        await manager.send_response(custom_client=test_custom_client, job=job)
+
+        tracer.export.assert_called_once_with(trace=trace)
+        assert [span[0] for span in trace.spans] == ["queue", "send", "log"]
+        assert trace.attrs["outcome"] == "sent"
+        assert 5 <= trace.attrs["e2e_seconds"] < 6
+        return None
+
 
 class TestGetResponseEmoticons:
     @staticmethod
@@ -410,12 +654,44 @@ class TestGetResponseEmoticons:
 
         result = manager._get_response_emoticons(
             custom_client=test_custom_client,
+            chat_id=1,
             emoticons_allowed=emoticons_allowed,
             sender_id=test_sender_id,
         )
         assert set(result) == set(expected_result)
         return None
 
+    @staticmethod
+    def test_memoized(test_custom_client: CustomClient) -> None:
+        manager = Manager()
+        manager._sender_is_friend = (  # type: ignore
+            lambda custom_client, sender_id: True
+        )
+        manager._emoticons_from_friendship = Mock(  # type: ignore
+            return_value=("👍", "❤")
+        )
+
+        for _ in range(3):
+            result = manager._get_response_emoticons(
+                custom_client=test_custom_client,
+                chat_id=1,
+                emoticons_allowed=("👍", "👎", "❤"),
+                sender_id=1,
+            )
+            assert result == ("👍", "❤")
+        manager._emoticons_from_friendship.assert_called_once()
+
+        test_custom_client.forget_chat_reactions(chat_id=1)
+        result = manager._get_response_emoticons(
+            custom_client=test_custom_client,
+            chat_id=1,
+            emoticons_allowed=("👎", "❤"),
+            sender_id=1,
+        )
+        assert result == ("❤",)
+        assert manager._emoticons_from_friendship.call_count == 2
+        return None
+
 
 class TestIsValidMessage:
     @staticmethod
@@ -559,6 +835,22 @@ class TestWriteChatInfoFromId:
         )
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_floodwait(test_custom_client: CustomClient) -> None:
+        test_custom_client.get_chat = AsyncMock(  # type: ignore
+            side_effect=FloodWait(60)
+        )
+        manager: Manager = Manager()
+        with patch("src.floodwait_manager.logger.error"):
+            await manager._write_chat_info_from_id(
+                custom_client=test_custom_client, chat_id=1
+            )
+        # the rate is halved after a FloodWait of any request
+        assert test_custom_client.rate_limiter.factor == pytest.approx(0.5, abs=0.01)
+        assert 1 not in test_custom_client.chat_info_map
+        return None
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_with_existing_info(
@@ -588,6 +880,66 @@ class TestWriteChatInfoFromId:
         test_custom_client.get_chat.assert_called_once_with(chat_id=chat_id)
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_coalesced(test_custom_client: CustomClient, mock_chat: Chat) -> None:
+        async def get_chat(chat_id: int) -> Chat:
+            await asyncio.sleep(0.01)
+            return mock_chat
+
+        test_custom_client.get_chat = AsyncMock(side_effect=get_chat)  # type: ignore
+        manager: Manager = Manager()
+        await asyncio.gather(
+            *(
+                manager._write_chat_info_from_id(
+                    custom_client=test_custom_client, chat_id=mock_chat.id
+                )
+                for _ in range(3)
+            )
+        )
+        test_custom_client.get_chat.assert_awaited_once_with(chat_id=mock_chat.id)
+        assert test_custom_client.in_flight.coalesced == 2
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_forgets_reactions(
+        test_custom_client: CustomClient, mock_chat: Chat
+    ) -> None:
+        test_custom_client.get_chat = AsyncMock(return_value=mock_chat)  # type: ignore
+        test_custom_client.chat_emoticons_map[mock_chat.id] = ("👍",)
+        manager: Manager = Manager()
+        await manager._write_chat_info_from_id(
+            custom_client=test_custom_client, chat_id=mock_chat.id
+        )
+        assert mock_chat.id not in test_custom_client.chat_emoticons_map
+        return None
+
+
+class TestForgetUpdatedChat:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "update, chat_id",
+        [
+            (UpdateChannel(channel_id=12345), -1000000012345),
+            (UpdateChat(chat_id=12345), -12345),
+        ],
+    )
+    async def test(
+        test_custom_client: CustomClient,
+        update: UpdateChannel | UpdateChat,
+        chat_id: int,
+    ) -> None:
+        test_custom_client.chat_info_map[chat_id] = "info"
+        test_custom_client.chat_emoticons_map[chat_id] = ("👍",)
+        await Manager.forget_updated_chat(
+            custom_client=test_custom_client, update=update, users={}, chats={}
+        )
+        assert chat_id not in test_custom_client.chat_info_map
+        assert chat_id not in test_custom_client.chat_emoticons_map
+        return None
+
 
 class TestChatAttributeFromChatId:
     @staticmethod
@@ -638,7 +990,7 @@ class TestChatEmoticonsFromChatId:
         expected_result: Sequence[str],
     ) -> None:
         manager = Manager()
-        test_custom_client.chat_emoticons_map = {}
+        test_custom_client.chat_emoticons_map = {}  # type: ignore
         with patch.object(
             manager, "_chat_attribute_from_chat_id", return_value=available_reactions
         ), patch.object(manager, "_is_chat_private", return_value=chat_is_private):
@@ -652,7 +1004,7 @@ class TestChatEmoticonsFromChatId:
         test_custom_client: CustomClient,
     ) -> None:
         manager = Manager()
-        test_custom_client.chat_emoticons_map = {}
+        test_custom_client.chat_emoticons_map = {}  # type: ignore
         emoticons_allowed = ["👍", "👎"]
         chat_id = 1
         test_custom_client.chat_emoticons_map[chat_id] = emoticons_allowed
@@ -669,7 +1021,7 @@ class TestChatEmoticonsFromChatId:
         test_custom_client: CustomClient,
     ) -> None:
         manager = Manager()
-        test_custom_client.chat_emoticons_map = {}
+        test_custom_client.chat_emoticons_map = {}  # type: ignore
         chat_id = 1
 
         with patch.object(
@@ -688,7 +1040,7 @@ class TestChatEmoticonsFromChatId:
         test_custom_client: CustomClient,
     ) -> None:
         manager = Manager()
-        test_custom_client.chat_emoticons_map = {}
+        test_custom_client.chat_emoticons_map = {}  # type: ignore
         chat_id = 1
 
         available_reactions = Mock(all_are_enabled=False, reactions=None)
@@ -809,6 +1161,23 @@ class TestWriteChatPeerFromId:
         assert test_custom_client.chat_peer_map.get(chat_id) == mock_peer
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_floodwait(test_custom_client: CustomClient) -> None:
+        test_custom_client.resolve_peer = AsyncMock(  # type: ignore
+            side_effect=FloodWait(60)
+        )
+        manager: Manager = Manager()
+        with patch("src.floodwait_manager.logger.error"):
+            for _ in range(2):
+                await manager._write_chat_peer_from_id(
+                    custom_client=test_custom_client, chat_id=1
+                )
+        test_custom_client.resolve_peer.assert_awaited_once()
+        assert 1 not in test_custom_client.chat_peer_map
+        assert list(test_custom_client.flood_deadlines) == [("ResolvePeer", 1)]
+        return None
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_key_error(
@@ -841,6 +1210,29 @@ class TestWriteChatPeerFromId:
         test_custom_client.resolve_peer.assert_not_awaited()
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_coalesced(test_custom_client: CustomClient, mock_peer: Peer) -> None:
+        async def resolve_peer(peer_id: int) -> Peer:
+            await asyncio.sleep(0.01)
+            return mock_peer
+
+        test_custom_client.resolve_peer = AsyncMock(  # type: ignore
+            side_effect=resolve_peer
+        )
+        manager: Manager = Manager()
+        await asyncio.gather(
+            *(
+                manager._write_chat_peer_from_id(
+                    custom_client=test_custom_client, chat_id=1
+                )
+                for _ in range(3)
+            )
+        )
+        test_custom_client.resolve_peer.assert_awaited_once_with(peer_id=1)
+        assert test_custom_client.chat_peer_map[1] == mock_peer
+        return None
+
 
 class TestPeerFromChatId:
     @staticmethod
@@ -863,7 +1255,7 @@ class TestPlaceEmojis:
         "side_effect, exception_to_raise, handler",
         [
             (None, None, None),  # Success case
-            ([FloodWait(10), None], None, FloodWaitManager.handle),  # FloodWait case
+            (FloodWait(10), FloodWait, None),  # FloodWait case
             (ReactionInvalid(), ReactionInvalid, None),  # ReactionInvalid case
             (MessageNotModified(), MessageNotModified, None),  # MessageNotModified case
             (MessageIdInvalid(), MessageIdInvalid, None),  # MessageIdInvalid case
@@ -890,7 +1282,7 @@ class TestPlaceEmojis:
 
         if handler:  # type: ignore
             with patch.object(
-                FloodWaitManager, "handle", new_callable=AsyncMock
+                FloodWaitManager, "handle", new_callable=Mock
             ) as mock_handle:
                 await manager._place_emojis(
                     custom_client, peer, chat_id, message_id, emojis
@@ -929,19 +1321,35 @@ class TestPlaceEmojis:
         emojis: Sequence[ReactionEmoji] = [ReactionEmoji(emoticon=one_emoticon[0])]
 
         custom_client.invoke = AsyncMock(side_effect=MessageIdInvalid())  # type: ignore
-        custom_client.msg_queue = deque([(chat_id, message_id)])
-        custom_client.msg_keeper = LRUCache(
-            maxsize=custom_client.user_settings.msg_queue_size
-        )
-        custom_client.msg_keeper[(chat_id, message_id)] = "some_value"
+        custom_client.msg_store.add(key=(chat_id, message_id))
 
         with pytest.raises(MessageIdInvalid):
             await manager._place_emojis(
                 custom_client, peer, chat_id, message_id, emojis
             )
 
-        assert (chat_id, message_id) not in custom_client.msg_queue
-        assert custom_client.msg_keeper.pop((chat_id, message_id), None) is None
+        assert (chat_id, message_id) not in custom_client.msg_store
+        assert not custom_client.msg_store.eligible
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_reaction_invalid(
+        test_custom_client: CustomClient, mock_peer: Peer, one_emoticon: Sequence[str]
+    ) -> None:
+        manager: Manager = Manager()
+        custom_client: CustomClient = test_custom_client
+        chat_id: int = 123
+        emojis: Sequence[ReactionEmoji] = [ReactionEmoji(emoticon=one_emoticon[0])]
+        custom_client.invoke = AsyncMock(side_effect=ReactionInvalid())  # type: ignore
+        custom_client.chat_info_map[chat_id] = "info"
+        custom_client.chat_emoticons_map[chat_id] = tuple(one_emoticon)
+
+        with pytest.raises(ReactionInvalid):
+            await manager._place_emojis(custom_client, mock_peer, chat_id, 456, emojis)
+
+        assert chat_id not in custom_client.chat_info_map
+        assert chat_id not in custom_client.chat_emoticons_map
         return None
 
     @staticmethod
@@ -956,19 +1364,17 @@ class TestPlaceEmojis:
         message_id: int = 456
         emojis: Sequence[ReactionEmoji] = [ReactionEmoji(emoticon=one_emoticon[0])]
 
-        custom_client.invoke = (  # type: ignore
-            AsyncMock(side_effect=[FloodWait(10), None])
-        )
+        custom_client.invoke = AsyncMock(side_effect=FloodWait(10))  # type: ignore
 
-        with patch.object(
-            FloodWaitManager, "handle", new_callable=AsyncMock
-        ) as mock_handle:
-            await manager._place_emojis(
-                custom_client, peer, chat_id, message_id, emojis
-            )
+        with patch.object(FloodWaitManager, "handle", new_callable=Mock) as mock_handle:
+            with pytest.raises(FloodWait):
+                await manager._place_emojis(
+                    custom_client, peer, chat_id, message_id, emojis
+                )
 
+        # the caller decides when to retry
         mock_handle.assert_called_once()
-        assert custom_client.invoke.call_count == 2
+        assert custom_client.invoke.call_count == 1
         return None
 
 
@@ -1124,14 +1530,38 @@ class TestLogMethodSuccess:
         for attr, value in message_attrs.items():
             setattr(message, attr, value)
 
-        with patch("src.loggers.logger.success") as mock_success_logger:
+        log_msgs: list[str] = []
+        handler_id: int = logger.add(log_msgs.append, format="{message}")
+        try:
             manager._log_method_success(
                 method_name="respond",
                 custom_client=test_custom_client,
                 message=message,
                 picked_response_emoticons=picked_response_emoticons,
             )
-            mock_success_logger.assert_called_once_with(expected_log_msg)
+        finally:
+            logger.remove(handler_id)
+        assert log_msgs == [f"{expected_log_msg}\n"]
+        return None
+
+    @staticmethod
+    def test_summary(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.user_settings.log_summary_interval = 60
+        message: Mock = Mock(spec=Message)
+        message.link = "http://t.me/mocklink/3"
+        message.chat = Mock(id=1)
+
+        with patch("src.message_emoji_manager.logger.opt") as mock_opt:
+            manager._log_method_success(
+                method_name="respond",
+                custom_client=test_custom_client,
+                message=message,
+                picked_response_emoticons=["👍"],
+            )
+
+        mock_opt.assert_not_called()
+        assert len(test_custom_client.log_summary) == 1
         return None
 
     @staticmethod
@@ -1165,51 +1595,52 @@ class TestLogMethodSuccess:
         return None
 
 
-class TestGetRandomMsgFromQueue:
+class TestGetRandomMsgFromStore:
     @staticmethod
     @pytest.mark.parametrize(
-        "msg_queue, msg_keeper, msg_queue_container, expected_result",
+        "kept_message, fetched_message, expected_result",
         [
-            # Empty message queue
-            ([], {}, None, None),
-            # Message in keeper
-            ([(1,)], {(1,): Message(id=1)}, (1,), Message(id=1)),
-            # Message not in keeper, but obtained from client
-            ([(1,)], {}, (1,), Message(id=1)),
-            # Message not in keeper and not obtained from client
-            ([(1,)], {}, (1,), None),
+            # Message object is kept in the store
+            (Message(id=1), None, Message(id=1)),
+            # Message object is not kept, but obtained from client
+            (None, Message(id=1), Message(id=1)),
+            # Message object is not kept and not obtained from client
+            (None, None, None),
         ],
     )
     @pytest.mark.asyncio
     async def test(
-        msg_queue,
-        msg_keeper,
-        msg_queue_container,
+        kept_message,
+        fetched_message,
         expected_result,
         test_custom_client: CustomClient,
     ) -> None:
         manager: Manager = Manager()
-        test_custom_client.msg_queue = msg_queue
-        test_custom_client.msg_keeper.update(msg_keeper)
+        test_custom_client.msg_store.add(key=(1, 1), message=kept_message)
+        manager._get_message_from_client = AsyncMock(  # type: ignore
+            return_value=fetched_message
+        )
+
+        result = await manager._get_random_msg_from_store(
+            custom_client=test_custom_client
+        )
+        assert result == expected_result
+        assert test_custom_client.msg_store.get(key=(1, 1)) == expected_result
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_no_eligible(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        manager._get_message_from_client = AsyncMock()  # type: ignore
+        test_custom_client.msg_store.add(key=(1, 1))
+        test_custom_client.msg_store.set_eligible(key=(1, 1), is_eligible=False)
 
-        with patch("random.choice", return_value=msg_queue_container):
-            if expected_result is None and msg_queue_container is not None:
-                manager._get_message_from_client = (  # type: ignore
-                    AsyncMock(return_value=None)
-                )
-            elif expected_result is not None and msg_queue_container is not None:
-                manager._get_message_from_client = (  # type: ignore
-                    AsyncMock(return_value=expected_result)
-                )
-            result = await manager._get_random_msg_from_queue(
-                custom_client=test_custom_client
-            )
-            assert result == expected_result
-            if expected_result is not None:
-                assert (
-                    test_custom_client.msg_keeper.get(msg_queue_container)
-                    == expected_result
-                )
+        result = await manager._get_random_msg_from_store(
+            custom_client=test_custom_client
+        )
+        assert result is None
+        manager._get_message_from_client.assert_not_awaited()
         return None
 
 
@@ -1227,24 +1658,44 @@ class TestGetMessageFromClient:
         return_value, expected_result, test_custom_client: CustomClient
     ) -> None:
         manager: Manager = Manager()
-        msg_queue_container = (1,)
+        msg_key = (1, 1)
 
         with patch.object(
             test_custom_client, "get_messages", AsyncMock(return_value=return_value)
         ):
-            result = await manager._get_message_from_client(
-                test_custom_client, msg_queue_container
-            )
+            result = await manager._get_message_from_client(test_custom_client, msg_key)
             assert result == expected_result
         return None
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_deleted(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.msg_store.add(key=(1, 1))
+        test_custom_client.reaction_mirror.record_sent(
+            chat_id=1, message_id=1, emoticons=["👍"]
+        )
+
+        with patch.object(
+            test_custom_client,
+            "get_messages",
+            AsyncMock(return_value=Message(id=1, empty=True)),
+        ):
+            assert (
+                await manager._get_message_from_client(test_custom_client, (1, 1))
+                is None
+            )
+        assert not test_custom_client.msg_store
+        assert (1, 1) not in test_custom_client.reaction_mirror
+        return None
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_flood_wait(
         test_custom_client: CustomClient,
     ) -> None:
         manager: Manager = Manager()
-        msg_queue_container = (1,)
+        msg_key = (1, 1)
         flood_wait_exception = FloodWait(10)
 
         with patch.object(
@@ -1252,14 +1703,17 @@ class TestGetMessageFromClient:
             "get_messages",
             AsyncMock(side_effect=[flood_wait_exception, Message(id=1)]),
         ):
-            with patch.object(FloodWaitManager, "handle", AsyncMock()) as mock_handle:
+            with patch.object(FloodWaitManager, "handle", Mock()) as mock_handle:
                 result = await manager._get_message_from_client(
-                    test_custom_client, msg_queue_container
+                    test_custom_client, msg_key
                 )
-                assert result is not None
-                assert result == Message(id=1)
+                # the handler returns right away instead of retrying
+                assert result is None
                 mock_handle.assert_called_once_with(
-                    flood_wait_exception, custom_client=test_custom_client
+                    flood_wait_exception,
+                    custom_client=test_custom_client,
+                    method="GetMessages",
+                    chat_id=1,
                 )
         return None
 
@@ -1276,6 +1730,8 @@ class TestGenerateDifferentEmoticons:
             (["👍"], ["👎"], [["👎"]], ["👎"], False),
             # Picker returns the same set, then a different set
             (["👍"], ["👍", "👎"], [["👍"], ["👎"]], ["👎"], False),
+            # Reactions out of the registry never match the picked ones
+            (["👍", "custom"], ["👍"], [["👍"]], ["👍"], False),
         ],
     )
     def test(
@@ -1359,22 +1815,111 @@ class TestMsgEmoticonsFromMsg:
         return None
 
 
+class TestWarmUp:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test(
+        test_custom_client: CustomClient, mock_chat: Chat, mock_peer: Peer
+    ) -> None:
+        manager: Manager = Manager()
+        test_custom_client.user_settings.chats_allowed = {-1: "One", -2: "Two"}
+        test_custom_client.user_settings.warmup_concurrency = 2
+        in_progress: list[int] = [0, 0]
+
+        async def get_chat(chat_id: int) -> Chat:
+            in_progress[0] += 1
+            in_progress[1] = max(in_progress)
+            await asyncio.sleep(0.01)
+            in_progress[0] -= 1
+            return mock_chat
+
+        test_custom_client.get_users = AsyncMock()  # type: ignore
+        test_custom_client.get_chat = AsyncMock(side_effect=get_chat)  # type: ignore
+        test_custom_client.resolve_peer = AsyncMock(  # type: ignore
+            return_value=mock_peer
+        )
+
+        with patch("src.message_emoji_manager.logger.success") as mock_success:
+            await manager.warm_up(custom_client=test_custom_client)
+
+        test_custom_client.get_users.assert_awaited_once_with(user_ids=[123456789])
+        assert test_custom_client.get_chat.await_count == 3
+        assert in_progress[1] == 2
+        assert set(test_custom_client.chat_info_map) == {-1, -2, 123456789}
+        assert set(test_custom_client.chat_peer_map) == {-1, -2, 123456789}
+        assert "Warmup completed|3/3 chats" in mock_success.call_args[0][0]
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_rpc_error(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.get_users = AsyncMock(  # type: ignore
+            side_effect=BadRequest()
+        )
+        test_custom_client.get_chat = AsyncMock(  # type: ignore
+            side_effect=FloodWait(10)
+        )
+        test_custom_client.resolve_peer = AsyncMock(return_value=Mock())  # type: ignore
+
+        with patch("src.message_emoji_manager.logger.success") as mock_success, patch(
+            "src.message_emoji_manager.logger.error"
+        ) as mock_error:
+            await manager.warm_up(custom_client=test_custom_client)
+
+        # the targets and a FloodWait per chat
+        assert mock_error.call_count == 3
+        # each FloodWait blocks GetChat in its own chat
+        assert set(test_custom_client.flood_deadlines) == {
+            ("GetChat", -12345),
+            ("GetChat", 123456789),
+        }
+        assert "Warmup completed|0/2 chats" in mock_success.call_args[0][0]
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_disabled(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.user_settings.warmup_concurrency = 0
+        test_custom_client.get_users = AsyncMock()  # type: ignore
+        await manager.warm_up(custom_client=test_custom_client)
+        test_custom_client.get_users.assert_not_awaited()
+        return None
+
+
+@pytest.fixture
+def cached_chats() -> Iterator[None]:
+    """
+    Stands in for chat info and peer requests, as if both were cached
+    """
+
+    async def write_chat_info(custom_client: CustomClient, chat_id: int) -> None:
+        custom_client.chat_info_map.setdefault(chat_id, Mock(spec=Chat))
+        return None
+
+    with patch.object(
+        Manager, "_write_chat_info_from_id", staticmethod(write_chat_info)
+    ), patch.object(Manager, "_write_chat_peer_from_id", AsyncMock()):
+        yield
+
+
+@pytest.mark.usefixtures("cached_chats")
 class TestUpdate:
     @staticmethod
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
-        "msg_queue, msg_keeper, random_msg, chat_id, emoticons_allowed,"
+        "msg_keys, random_msg, chat_id, emoticons_allowed,"
         "sender_id, response_emoticons, msg_emoticons,"
         "place_emojis_side_effect, should_log_success",
         [
-            # Empty msg_queue
-            (deque(), {}, None, None, None, None, None, None, None, False),
-            # No message from queue
-            (deque([(1,)]), {}, None, None, None, None, None, None, None, False),
+            # Empty message store
+            ([], None, None, None, None, None, None, None, False),
+            # No message from store
+            ([(1, 1)], None, None, None, None, None, None, None, False),
             # No chat_id
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 None,
                 None,
@@ -1386,8 +1931,7 @@ class TestUpdate:
             ),
             # Insufficient emoticons_allowed
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 1,
                 ["👍"],
@@ -1399,8 +1943,7 @@ class TestUpdate:
             ),
             # No sender_id
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 1,
                 ["👍", "👎"],
@@ -1412,8 +1955,7 @@ class TestUpdate:
             ),
             # No response_emoticons
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 1,
                 ["👍", "👎"],
@@ -1425,8 +1967,7 @@ class TestUpdate:
             ),
             # No msg_emoticons
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 1,
                 ["👍", "👎"],
@@ -1438,8 +1979,7 @@ class TestUpdate:
             ),
             # Same response_emoticons
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message),
                 1,
                 ["👍", "👎"],
@@ -1451,8 +1991,7 @@ class TestUpdate:
             ),
             # Successful update
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message, id=1),
                 1,
                 ["👍", "👎"],
@@ -1464,8 +2003,7 @@ class TestUpdate:
             ),
             # Place emojis exception
             (
-                deque([(1,)]),
-                {},
+                [(1, 1)],
                 Mock(spec=Message, id=1),
                 1,
                 ["👍", "👎"],
@@ -1478,8 +2016,7 @@ class TestUpdate:
         ],
     )
     async def test(
-        msg_queue: deque,
-        msg_keeper: LRUCache,
+        msg_keys: list[tuple[int, int]],
         random_msg: Message | None,
         chat_id: int | None,
         emoticons_allowed: Sequence[str] | None,
@@ -1492,10 +2029,10 @@ class TestUpdate:
     ) -> None:
         manager: Manager = Manager()
 
-        test_custom_client.msg_queue = msg_queue
-        test_custom_client.msg_keeper = msg_keeper
+        for msg_key in msg_keys:
+            test_custom_client.msg_store.add(key=msg_key)
 
-        manager._get_random_msg_from_queue = (  # type: ignore
+        manager._get_random_msg_from_store = (  # type: ignore
             AsyncMock(return_value=random_msg)
         )
         manager._chat_id_from_msg = Mock(return_value=chat_id)  # type: ignore
@@ -1539,12 +2076,12 @@ class TestUpdate:
         test_custom_client: CustomClient,
     ) -> None:
         manager = Manager()
-        test_custom_client.msg_queue = deque([(1,)])
+        test_custom_client.msg_store.add(key=(1, 1))
         mock_message = Mock(spec=Message)
         mock_message.id = 1
 
         with patch.object(
-            manager, "_get_random_msg_from_queue", return_value=mock_message
+            manager, "_get_random_msg_from_store", return_value=mock_message
         ), patch.object(manager, "_chat_id_from_msg", return_value=1), patch.object(
             manager, "_chat_emoticons_from_chat_id", return_value=["👍", "👎"]
         ), patch.object(
@@ -1565,3 +2102,280 @@ class TestUpdate:
             await manager.update(test_custom_client)
             mock_place_emojis.assert_not_called()
         return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_skip_message(
+        test_custom_client: CustomClient, mock_message: Message
+    ) -> None:
+        manager: Manager = Manager()
+        chat_id: int = mock_message.chat.id
+        test_custom_client.msg_store.add(key=(chat_id, mock_message.id))
+        test_custom_client.msg_store.add(key=(chat_id, mock_message.id + 1))
+        manager._get_random_msg_from_store = AsyncMock(  # type: ignore
+            return_value=mock_message
+        )
+        manager._chat_emoticons_from_chat_id = Mock(  # type: ignore
+            return_value=["👍", "👎"]
+        )
+        manager._get_response_emoticons = Mock(return_value=["👍"])  # type: ignore
+        manager._current_emoticons = Mock(return_value=["👍", "👎"])  # type: ignore
+        manager._place_emojis = AsyncMock()  # type: ignore
+
+        # the reactions are already there, so the message is skipped
+        await manager.update(test_custom_client)
+        manager._place_emojis.assert_not_awaited()
+        assert test_custom_client.msg_store.sample(k=2) == [
+            (chat_id, mock_message.id + 1)
+        ]
+
+        # until the chat settings change
+        test_custom_client.forget_chat_reactions(chat_id=chat_id)
+        assert test_custom_client.msg_store.eligible == 2
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_memoized_mask(
+        test_custom_client: CustomClient, mock_message: Message
+    ) -> None:
+        manager: Manager = Manager()
+        chat_id: int = mock_message.chat.id
+        test_custom_client.msg_store.add(key=(chat_id, mock_message.id))
+        test_custom_client.emoticon_index.build(
+            chat_id=chat_id,
+            is_friend=manager._sender_is_friend(
+                custom_client=test_custom_client,
+                sender_id=mock_message.from_user.id,
+            ),
+            emoticons_allowed=["👍", "👎"],
+            emoticons_from_friendship=["👍"],
+        )
+        manager._get_random_msg_from_store = AsyncMock(  # type: ignore
+            return_value=mock_message
+        )
+        manager._chat_emoticons_from_chat_id = Mock(  # type: ignore
+            return_value=["👍", "👎"]
+        )
+        manager._current_emoticons = Mock(return_value=["👍", "👎"])  # type: ignore
+        manager._place_emojis = AsyncMock()  # type: ignore
+
+        with patch.object(
+            emoticon_registry, "mask", wraps=emoticon_registry.mask
+        ) as mock_mask:
+            await manager.update(test_custom_client)
+        # the response emoticons come as a mask from the index
+        mock_mask.assert_called_once_with(["👍", "👎"])
+        manager._place_emojis.assert_not_awaited()
+        return None
+
+
+class TestUpdateExpiredChat:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        clock: Mock = Mock(return_value=0.0)
+        test_custom_client.user_settings = test_custom_client.user_settings.model_copy(
+            update={"emoticons_for_enemies": ("🤡", "💩")}
+        )
+        test_custom_client.chat_info_map = StatsTTLCache(maxsize=10, ttl=1, timer=clock)
+        test_custom_client.chat_peer_map = StatsTTLCache(maxsize=10, ttl=1, timer=clock)
+        network: StubNetwork = StubNetwork()
+        network.install(custom_client=test_custom_client)
+        picks: Iterator[str] = itertools.cycle(("🤡", "💩"))
+        test_custom_client.emoticon_picker = lambda emoticons: (next(picks),)
+
+        await manager.respond(
+            custom_client=test_custom_client,
+            message=make_message(
+                chat_id=-12345, message_id=1, sender_id=123456789, reactions=()
+            ),
+        )
+        assert test_custom_client.msg_store.eligible == 1
+
+        # the chat info and the peer expire, updates retrieve them again
+        clock.return_value = 2.0
+        for _ in range(5):
+            await manager.update(custom_client=test_custom_client)
+
+        assert test_custom_client.msg_store.eligible == 1
+        assert network.calls["GetChat"] == 2
+        assert network.calls["ResolvePeer"] == 2
+        assert network.calls["SendReaction"] == 6
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_chat_info_unavailable(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.msg_store.add(
+            key=(-12345, 1),
+            sender_id=123456789,
+            message=make_message(chat_id=-12345, message_id=1, sender_id=123456789),
+        )
+        manager._write_chat_info_from_id = AsyncMock()  # type: ignore
+        manager._place_emojis = AsyncMock()  # type: ignore
+
+        await manager.update(custom_client=test_custom_client)
+        # a cache miss is not a chat without reactions, the message is kept
+        manager._write_chat_info_from_id.assert_awaited_once()
+        manager._place_emojis.assert_not_awaited()
+        assert test_custom_client.msg_store.eligible == 1
+        return None
+
+
+class TestUpdateBatch:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_batch(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        test_custom_client.user_settings.update_batch_size = 3
+        kept_message: Message = Message(id=1)
+        test_custom_client.msg_store.add(key=(-1, 1), message=kept_message)
+        for msg_key in [(-1, 2), (-2, 3), (-1, 2)]:
+            test_custom_client.msg_store.add(key=msg_key)
+        fetched_messages: dict[int, list[Message]] = {
+            -1: [Message(id=2)],
+            -2: [Message(id=3)],
+        }
+
+        async def get_messages(
+            custom_client: CustomClient, chat_id: int, message_ids: list[int]
+        ) -> list[Message]:
+            return fetched_messages[chat_id]
+
+        manager._get_messages_from_client = AsyncMock(  # type: ignore
+            side_effect=get_messages
+        )
+        manager._update_message = AsyncMock()  # type: ignore
+
+        await manager.update(test_custom_client)
+
+        assert sorted(
+            call.kwargs["chat_id"]
+            for call in manager._get_messages_from_client.call_args_list
+        ) == [-2, -1]
+        assert {
+            call.kwargs["message"].id for call in manager._update_message.call_args_list
+        } == {1, 2, 3}
+        assert test_custom_client.msg_store.get(key=(-2, 3)) is fetched_messages[-2][0]
+        return None
+
+
+class TestGetMessagesFromClient:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test(test_custom_client: CustomClient) -> None:
+        messages: list[Message] = [Message(id=1), Message(id=2, empty=True)]
+        for message_id in (1, 2, 3):
+            test_custom_client.msg_store.add(key=(-1, message_id))
+            test_custom_client.reaction_mirror.record_sent(
+                chat_id=-1, message_id=message_id, emoticons=["👍"]
+            )
+        with patch.object(
+            test_custom_client, "get_messages", AsyncMock(return_value=messages)
+        ) as mock_get_messages:
+            result = await Manager._get_messages_from_client(
+                custom_client=test_custom_client, chat_id=-1, message_ids=[1, 2, 3]
+            )
+
+        mock_get_messages.assert_awaited_once_with(-1, [1, 2, 3])
+        assert result == [messages[0]]
+        # deleted and missing messages are forgotten
+        assert [key for key, _ in test_custom_client.msg_store.senders()] == [(-1, 1)]
+        assert (-1, 1) in test_custom_client.reaction_mirror
+        assert (-1, 2) not in test_custom_client.reaction_mirror
+        assert (-1, 3) not in test_custom_client.reaction_mirror
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_flood_wait(
+        test_custom_client: CustomClient, flood_wait_error: FloodWait
+    ) -> None:
+        with patch.object(
+            test_custom_client,
+            "get_messages",
+            AsyncMock(side_effect=flood_wait_error),
+        ), patch.object(FloodWaitManager, "handle", new_callable=Mock) as mock_handle:
+            result = await Manager._get_messages_from_client(
+                custom_client=test_custom_client, chat_id=-1, message_ids=[1]
+            )
+
+        assert result == []
+        mock_handle.assert_called_once()
+        return None
+
+
+class TestMirrorReactions:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test(test_custom_client: CustomClient) -> None:
+        test_custom_client.reaction_mirror.track(
+            chat_id=-1001234567890,
+            message_id=5,
+            reactions=[Reaction(emoji="👍", count=1)],
+        )
+        test_custom_client.msg_store.add(key=(-1001234567890, 5))
+        test_custom_client.msg_store.set_eligible(
+            key=(-1001234567890, 5), is_eligible=False
+        )
+        update: UpdateMessageReactions = UpdateMessageReactions(
+            peer=PeerChannel(channel_id=1234567890),
+            msg_id=5,
+            reactions=MessageReactions(
+                results=[ReactionCount(reaction=ReactionEmoji(emoticon="🔥"), count=2)]
+            ),
+        )
+
+        await Manager.mirror_reactions(
+            custom_client=test_custom_client, update=update, users={}, chats={}
+        )
+
+        assert test_custom_client.reaction_mirror.emoticons(
+            chat_id=-1001234567890, message_id=5
+        ) == ("🔥",)
+        # the message may be worth updating with the new reactions
+        assert test_custom_client.msg_store.choice() == (-1001234567890, 5)
+        return None
+
+
+class TestCurrentEmoticons:
+    @staticmethod
+    def test_mirrored(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        manager._msg_emoticons_from_msg = Mock()  # type: ignore
+        test_custom_client.reaction_mirror.record_sent(
+            chat_id=-1, message_id=1, emoticons=["👍"]
+        )
+
+        assert manager._current_emoticons(
+            custom_client=test_custom_client, chat_id=-1, message=Message(id=1)
+        ) == ("👍",)
+        manager._msg_emoticons_from_msg.assert_not_called()
+        return None
+
+    @staticmethod
+    def test_snapshot(test_custom_client: CustomClient) -> None:
+        manager: Manager = Manager()
+        message: Message = Mock(
+            spec=Message,
+            id=1,
+            reactions=Mock(
+                reactions=[
+                    Reaction(emoji="🤡", count=2, chosen_order=0),
+                    Reaction(emoji="👍", count=1),
+                ]
+            ),
+        )
+
+        assert manager._current_emoticons(
+            custom_client=test_custom_client, chat_id=-1, message=message
+        ) == ("🤡", "👍")
+        assert test_custom_client.reaction_mirror.emoticons(
+            chat_id=-1, message_id=1
+        ) == ("🤡", "👍")
+        # the own reaction of the fetched message is known
+        assert test_custom_client.reaction_mirror.states[(-1, 1)].chosen == ("🤡",)
+        return None
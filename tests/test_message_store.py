@@ -0,0 +1,184 @@
+from unittest.mock import patch
+
+import pytest
+from pyrogram.types import Message
+
+from src.message_store import IndexedSet, MessageStore, round_robin
+
+
+class TestIndexedSet:
+    @staticmethod
+    def test_add_discard() -> None:
+        indexed_set: IndexedSet = IndexedSet()
+        for item in (1, 2, 3, 2):
+            indexed_set.add(item)
+        assert list(indexed_set) == [1, 2, 3]
+
+        # the last item takes the place of the discarded one
+        indexed_set.discard(1)
+        indexed_set.discard(4)
+        assert list(indexed_set) == [3, 2]
+        assert 1 not in indexed_set
+        assert len(indexed_set) == 2
+
+        indexed_set.discard(2)
+        indexed_set.discard(3)
+        assert not indexed_set
+        with pytest.raises(IndexError):
+            indexed_set.choice()
+        return None
+
+    @staticmethod
+    def test_sample() -> None:
+        indexed_set: IndexedSet = IndexedSet()
+        for item in (1, 2, 3):
+            indexed_set.add(item)
+
+        assert sorted(indexed_set.sample(k=5)) == [1, 2, 3]
+        assert len(indexed_set.sample(k=2)) == 2
+        with patch("random.choice", return_value=2):
+            assert indexed_set.choice() == 2
+        return None
+
+
+class TestRoundRobin:
+    @staticmethod
+    def test() -> None:
+        assert list(round_robin([[1, 2, 3], [], [4], [5, 6]])) == [1, 4, 5, 2, 6, 3]
+        return None
+
+
+class TestMessageStore:
+    @staticmethod
+    def test_add() -> None:
+        message_store: MessageStore = MessageStore(maxsize=2)
+        message: Message = Message(id=1)
+        message_store.add(key=(-1, 1), message=message)
+        message_store.add(key=(-1, 2))
+        # adding again keeps the message object and makes the key the newest
+        message_store.add(key=(-1, 1))
+        assert message_store.get(key=(-1, 1)) is message
+        assert list(message_store) == [(-1, 2), (-1, 1)]
+
+        # the oldest message is evicted
+        message_store.add(key=(-2, 3))
+        assert list(message_store) == [(-1, 1), (-2, 3)]
+        assert sorted(message_store.sample(k=5)) == [(-2, 3), (-1, 1)]
+        assert message_store.evictions == 1
+        return None
+
+    @staticmethod
+    def test_get_remember() -> None:
+        message_store: MessageStore = MessageStore(maxsize=10)
+        message_store.add(key=(-1, 1))
+        assert message_store.get(key=(-1, 1)) is None
+
+        message: Message = Message(id=1)
+        message_store.remember(key=(-1, 1), message=message)
+        # unknown messages are not remembered
+        message_store.remember(key=(-1, 2), message=Message(id=2))
+        assert message_store.get(key=(-1, 1)) is message
+        assert (-1, 2) not in message_store
+        assert list(message_store.messages()) == [message]
+        assert message_store.hit_rate == 0.5
+        return None
+
+    @staticmethod
+    def test_eligible() -> None:
+        message_store: MessageStore = MessageStore(maxsize=10)
+        for key in ((-1, 1), (-1, 2), (-2, 3)):
+            message_store.add(key=key)
+
+        message_store.set_eligible(key=(-1, 1), is_eligible=False)
+        message_store.set_eligible(key=(-2, 3), is_eligible=False)
+        assert message_store.eligible == 1
+        assert message_store.choice() == (-1, 2)
+
+        message_store.reset_chat(chat_id=-1)
+        assert sorted(message_store.sample(k=5)) == [(-1, 1), (-1, 2)]
+
+        # unknown messages don't become eligible
+        message_store.set_eligible(key=(-3, 4), is_eligible=True)
+        message_store.reset()
+        assert message_store.eligible == 3
+        return None
+
+    @staticmethod
+    def test_remove() -> None:
+        message_store: MessageStore = MessageStore(maxsize=10)
+        message_store.add(key=(-1, 1))
+        message_store.add(key=(-1, 2))
+
+        message_store.remove(key=(-1, 1))
+        message_store.remove(key=(-1, 3))
+        assert list(message_store) == [(-1, 2)]
+        assert message_store.sample(k=5) == [(-1, 2)]
+
+        message_store.remove(key=(-1, 2))
+        message_store.reset_chat(chat_id=-1)
+        assert not message_store
+        assert message_store.choice() is None
+        return None
+
+    @staticmethod
+    def test_remove_chat_sender() -> None:
+        message_store: MessageStore = MessageStore(maxsize=10)
+        message_store.add(key=(-1, 1), sender_id=1)
+        message_store.add(key=(-1, 2), sender_id=2)
+        message_store.add(key=(-2, 1), sender_id=1)
+        message_store.add(key=(-2, 2), sender_id=2)
+
+        message_store.remove_sender(sender_id=1)
+        assert list(message_store) == [(-1, 2), (-2, 2)]
+
+        message_store.remove_chat(chat_id=-1)
+        message_store.remove_chat(chat_id=-3)
+        assert list(message_store) == [(-2, 2)]
+        assert message_store.eligible == 1
+        assert message_store.chats == 1
+        return None
+
+    @staticmethod
+    def test_partition_limits() -> None:
+        message_store: MessageStore = MessageStore(
+            maxsize=10, chat_maxsize=3, sender_maxsize=2
+        )
+        for message_id in range(1, 4):
+            message_store.add(key=(-1, message_id), sender_id=1)
+        # a chatty sender pushes out their own messages only
+        assert list(message_store) == [(-1, 2), (-1, 3)]
+
+        message_store.add(key=(-2, 1), sender_id=1)
+        message_store.add(key=(-1, 4), sender_id=2)
+        message_store.add(key=(-1, 5), sender_id=2)
+        # a busy chat pushes out its own messages only
+        assert list(message_store.senders()) == [
+            ((-1, 3), 1),
+            ((-2, 1), 1),
+            ((-1, 4), 2),
+            ((-1, 5), 2),
+        ]
+        assert message_store.evictions == 2
+        return None
+
+    @staticmethod
+    def test_fair_sample() -> None:
+        message_store: MessageStore = MessageStore(maxsize=100)
+        # a chatty sender in a busy chat
+        for message_id in range(50):
+            message_store.add(key=(-1, message_id), sender_id=1)
+        message_store.add(key=(-1, 50), sender_id=2)
+        message_store.add(key=(-2, 1), sender_id=1)
+        assert message_store.chats == 2
+
+        # every chat and every sender in a chat take turns
+        for _ in range(10):
+            sample: list[tuple[int, int]] = message_store.sample(k=3)
+            assert len(set(sample)) == 3
+            assert (-2, 1) in sample
+            assert (-1, 50) in sample
+
+        message_store.set_eligible(key=(-2, 1), is_eligible=False)
+        assert message_store.chats == 1
+        assert all(message_store.choice()[0] == -1 for _ in range(10))  # type: ignore
+        return None
@@ -0,0 +1,72 @@
+from src.metrics import Histogram, Metrics
+
+
+class TestHistogram:
+    @staticmethod
+    def test_samples() -> None:
+        histogram: Histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.samples(name="latency", labels='method="respond"') == [
+            'latency_bucket{method="respond",le="0.1"} 2',
+            'latency_bucket{method="respond",le="1.0"} 3',
+            'latency_bucket{method="respond",le="+Inf"} 4',
+            'latency_sum{method="respond"} 2.65',
+            'latency_count{method="respond"} 4',
+        ]
+        return None
+
+
+class TestMetrics:
+    @staticmethod
+    def test_labels() -> None:
+        assert Metrics.labels(method="respond", chat=1) == 'method="respond",chat="1"'
+        assert Metrics.labels() == ""
+        return None
+
+    @staticmethod
+    def test_render() -> None:
+        metrics: Metrics = Metrics(buckets=(1.0,))
+        metrics.inc("floodwait_total", labels=Metrics.labels(method="GetMessages"))
+        metrics.inc("floodwait_total", labels=Metrics.labels(method="GetMessages"))
+        metrics.inc("floodwait_seconds_total", value=30)
+        with metrics.measure("send_reaction_seconds"):
+            pass
+
+        lines: list[str] = metrics.render()
+        assert "# TYPE clownizer_floodwait_total counter" in lines
+        assert 'clownizer_floodwait_total{method="GetMessages"} 2.0' in lines
+        assert "clownizer_floodwait_seconds_total 30.0" in lines
+        assert "# TYPE clownizer_send_reaction_seconds histogram" in lines
+        assert 'clownizer_send_reaction_seconds_bucket{le="1.0"} 1' in lines
+        assert "clownizer_send_reaction_seconds_count 1" in lines
+        return None
+
+    @staticmethod
+    def test_child() -> None:
+        metrics: Metrics = Metrics()
+        child: Metrics = metrics.child(account="alice")
+        child.inc("floodwait_total", labels=Metrics.labels(method="GetMessages"))
+        metrics.inc("floodwait_total")
+
+        lines: list[str] = metrics.render()
+        assert (
+            'clownizer_floodwait_total{account="alice",method="GetMessages"} 1.0'
+            in lines
+        )
+        assert "clownizer_floodwait_total 1.0" in lines
+        assert child.with_base("") == 'account="alice"'
+        return None
+
+    @staticmethod
+    def test_measure_on_error() -> None:
+        metrics: Metrics = Metrics()
+        try:
+            with metrics.measure("handler_seconds"):
+                raise ValueError
+        except ValueError:
+            pass
+
+        assert metrics.histograms["handler_seconds"][""].count == 1
+        return None
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from src.boot import BootReport
+from src.custom_client import CustomClient
+from src.main import create_clients
+from src.metrics_server import MetricsServer
+from src.user_settings import UserSettings
+
+
+async def http_get(port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection(host="127.0.0.1", port=port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response: bytes = await reader.read()
+    writer.close()
+    return response.decode()
+
+
+class TestMetricsServer:
+    @staticmethod
+    def test_render(test_custom_client: CustomClient) -> None:
+        test_custom_client.msg_store.add(key=(1, 1))
+        test_custom_client.msg_store.add(key=(1, 2))
+        test_custom_client.msg_store.set_eligible(key=(1, 2), is_eligible=False)
+        test_custom_client.chat_info_map.get(1)
+        test_custom_client.in_flight.coalesced = 2
+
+        text: str = MetricsServer.render(custom_clients=[test_custom_client])
+        assert 'clownizer_cache_misses_total{cache="chat_info_map"} 1' in text
+        assert 'clownizer_cache_hit_ratio{cache="msg_store"} 0.0' in text
+        assert "clownizer_msg_store_depth 2" in text
+        assert "clownizer_msg_store_eligible 1" in text
+        assert "clownizer_msg_store_chats 1" in text
+        assert "clownizer_requests_coalesced_total 2" in text
+        assert 'clownizer_cache_expirations_total{cache="chat_info_map"} 0' in text
+        assert 'clownizer_cache_evictions_total{cache="msg_store"} 0' in text
+        # the message store has no TTL
+        assert 'clownizer_cache_expirations_total{cache="msg_store"}' not in text
+        assert "# TYPE clownizer_scheduler_runs_total counter" in text
+        assert text.endswith("\n")
+        return None
+
+    @staticmethod
+    def test_render_reaction_sender(test_custom_client: CustomClient) -> None:
+        test_custom_client.reaction_sender.processed = 3
+        test_custom_client.reaction_sender.dropped = 1
+
+        text: str = MetricsServer.render(custom_clients=[test_custom_client])
+        assert "# TYPE clownizer_reaction_sender_processed_total counter" in text
+        assert "clownizer_reaction_sender_processed_total 3" in text
+        assert "clownizer_reaction_sender_dropped_total 1" in text
+        return None
+
+    @staticmethod
+    def test_render_boot_report(test_custom_client: CustomClient) -> None:
+        boot_report: BootReport = BootReport()
+        boot_report.add(name="session", seconds=1.5)
+
+        text: str = MetricsServer.render(
+            custom_clients=[test_custom_client], boot_report=boot_report
+        )
+        assert 'clownizer_boot_phase_seconds{phase="session"} 1.5' in text
+        return None
+
+    @staticmethod
+    def test_render_accounts(user_settings: UserSettings) -> None:
+        custom_clients: list[CustomClient] = create_clients(
+            accounts={"alice": user_settings, "bob": user_settings}
+        )
+        custom_clients[1].msg_store.add(key=(1, 1))
+        custom_clients[0].metrics.inc("floodwait_total")
+
+        text: str = MetricsServer.render(custom_clients=custom_clients)
+        assert 'clownizer_floodwait_total{account="alice"} 1.0' in text
+        assert 'clownizer_msg_store_depth{account="bob"} 1' in text
+        assert 'clownizer_msg_store_depth{account="alice"} 0' in text
+        # the shared cache is rendered once
+        assert 'clownizer_cache_hits_total{cache="chat_info_map"} 0' in text
+        assert 'clownizer_cache_hits_total{account="bob",cache="msg_store"} 0' in text
+        assert text.count("# TYPE clownizer_msg_store_depth gauge") == 1
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_disabled(test_custom_client: CustomClient) -> None:
+        test_custom_client.user_settings.metrics_port = None
+        assert await MetricsServer.start(custom_clients=[test_custom_client]) is None
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_serve(test_custom_client: CustomClient) -> None:
+        # a free port is picked by the OS
+        test_custom_client.user_settings.metrics_port = 0
+        test_custom_client.user_settings.metrics_host = "127.0.0.1"
+        server: asyncio.Server | None = await MetricsServer.start(
+            custom_clients=[test_custom_client]
+        )
+        assert server is not None
+        port: int = server.sockets[0].getsockname()[1]
+
+        try:
+            response: str = await http_get(port=port, path="/metrics")
+            assert response.startswith("HTTP/1.1 200 OK")
+            assert "clownizer_msg_store_depth 0" in response
+
+            response = await http_get(port=port, path="/favicon.ico")
+            assert response.startswith("HTTP/1.1 404 Not Found")
+        finally:
+            server.close()
+            await server.wait_closed()
+        return None
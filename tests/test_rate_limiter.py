@@ -0,0 +1,88 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestTokenBucket:
+    @staticmethod
+    def test_reserve() -> None:
+        timer: Mock = Mock(return_value=0)
+        bucket: TokenBucket = TokenBucket(rate=2, capacity=2, timer=timer)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5
+        assert bucket.reserve() == 1.0
+
+        timer.return_value = 10
+        assert bucket.reserve() == 0
+        assert bucket.tokens == 1
+        return None
+
+    @staticmethod
+    def test_reserve_with_factor() -> None:
+        timer: Mock = Mock(return_value=0)
+        bucket: TokenBucket = TokenBucket(rate=2, capacity=1, timer=timer)
+        assert bucket.reserve(factor=0.5) == 0
+        assert bucket.reserve(factor=0.5) == 1.0
+        return None
+
+
+class TestRateLimiter:
+    @staticmethod
+    def test_penalize() -> None:
+        timer: Mock = Mock(return_value=0)
+        rate_limiter: RateLimiter = RateLimiter(
+            rate=10, chat_rate=1, burst=1, recovery_time=100, timer=timer
+        )
+        assert rate_limiter.factor == 1.0
+
+        rate_limiter.penalize()
+        assert rate_limiter.factor == 0.5
+        rate_limiter.penalize()
+        assert rate_limiter.factor == 0.25
+        for _ in range(5):
+            rate_limiter.penalize()
+        assert rate_limiter.factor == rate_limiter.min_factor
+
+        timer.return_value = 50
+        assert rate_limiter.factor == pytest.approx(0.6)
+        timer.return_value = 100
+        assert rate_limiter.factor == 1.0
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_acquire() -> None:
+        timer: Mock = Mock(return_value=0)
+        rate_limiter: RateLimiter = RateLimiter(
+            rate=10, chat_rate=1, burst=1, timer=timer
+        )
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await rate_limiter.acquire(chat_id=1)
+            await rate_limiter.acquire(chat_id=2)
+            mock_sleep.assert_awaited_once_with(pytest.approx(0.1))
+
+            mock_sleep.reset_mock()
+            timer.return_value = 10
+            await rate_limiter.acquire(chat_id=1)
+            await rate_limiter.acquire(chat_id=1)
+            mock_sleep.assert_awaited_once_with(pytest.approx(1.0))
+
+            mock_sleep.reset_mock()
+            timer.return_value = 20
+            await rate_limiter.acquire()
+            mock_sleep.assert_not_awaited()
+        assert rate_limiter.delays == 2
+        assert set(rate_limiter.chat_buckets) == {1, 2}
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_call() -> None:
+        rate_limiter: RateLimiter = RateLimiter(rate=10, chat_rate=1, burst=1)
+        func: AsyncMock = AsyncMock(return_value=42)
+        assert await rate_limiter.call(chat_id=1, func=func) == 42
+        func.assert_awaited_once_with()
+        return None
@@ -0,0 +1,112 @@
+from pyrogram.raw.types import (
+    MessageReactions,
+    ReactionCount,
+    ReactionCustomEmoji,
+    ReactionEmoji,
+)
+from pyrogram.types import Reaction
+
+from src.reaction_mirror import ReactionMirror
+
+
+class TestReactionMirror:
+    @staticmethod
+    def test_track() -> None:
+        reaction_mirror: ReactionMirror = ReactionMirror(maxsize=10)
+        assert reaction_mirror.emoticons(chat_id=-1, message_id=1) is None
+
+        reaction_mirror.track(
+            chat_id=-1,
+            message_id=1,
+            reactions=[
+                Reaction(emoji="👍", count=2, chosen_order=1),
+                Reaction(emoji="🔥", count=1, chosen_order=0),
+                Reaction(emoji="🤡", count=1),
+                Reaction(custom_emoji_id=1, count=1, chosen_order=2),
+            ],
+        )
+        reaction_mirror.track(
+            chat_id=-1, message_id=1, reactions=[Reaction(emoji="🤡", count=1)]
+        )
+        assert reaction_mirror.emoticons(chat_id=-1, message_id=1) == (
+            "👍",
+            "🔥",
+            "🤡",
+        )
+        assert reaction_mirror.states[(-1, 1)].counts == {"👍": 2, "🔥": 1, "🤡": 1}
+        assert reaction_mirror.states[(-1, 1)].chosen == ("🔥", "👍")
+        assert (-1, 1) in reaction_mirror
+        return None
+
+    @staticmethod
+    def test_record_sent() -> None:
+        reaction_mirror: ReactionMirror = ReactionMirror(maxsize=10)
+        reaction_mirror.track(
+            chat_id=-1, message_id=1, reactions=[Reaction(emoji="👍", count=1)]
+        )
+
+        reaction_mirror.record_sent(chat_id=-1, message_id=1, emoticons=["👍", "🔥"])
+        assert reaction_mirror.states[(-1, 1)].counts == {"👍": 2, "🔥": 1}
+
+        # own reactions are replaced, the others stay
+        reaction_mirror.record_sent(chat_id=-1, message_id=1, emoticons=["🤡"])
+        assert reaction_mirror.emoticons(chat_id=-1, message_id=1) == ("👍", "🤡")
+
+        reaction_mirror.record_sent(chat_id=-2, message_id=1, emoticons=["🤡"])
+        assert reaction_mirror.emoticons(chat_id=-2, message_id=1) == ("🤡",)
+        return None
+
+    @staticmethod
+    def test_record_sent_over_chosen() -> None:
+        reaction_mirror: ReactionMirror = ReactionMirror(maxsize=10)
+        # a fetched message already carries an own reaction
+        reaction_mirror.track(
+            chat_id=-1,
+            message_id=1,
+            reactions=[
+                Reaction(emoji="🤡", count=1, chosen_order=0),
+                Reaction(emoji="👍", count=1),
+            ],
+        )
+
+        reaction_mirror.record_sent(chat_id=-1, message_id=1, emoticons=["💩"])
+        assert reaction_mirror.emoticons(chat_id=-1, message_id=1) == ("👍", "💩")
+        assert reaction_mirror.states[(-1, 1)].chosen == ("💩",)
+        return None
+
+    @staticmethod
+    def test_apply() -> None:
+        reaction_mirror: ReactionMirror = ReactionMirror(maxsize=10)
+        reactions: MessageReactions = MessageReactions(
+            results=[
+                ReactionCount(
+                    reaction=ReactionEmoji(emoticon="🔥"), count=3, chosen_order=0
+                ),
+                ReactionCount(reaction=ReactionEmoji(emoticon="👍"), count=1),
+                ReactionCount(reaction=ReactionCustomEmoji(document_id=1), count=1),
+            ]
+        )
+        assert not reaction_mirror.apply(chat_id=-1, message_id=1, reactions=reactions)
+
+        reaction_mirror.record_sent(chat_id=-1, message_id=1, emoticons=["🤡"])
+        assert reaction_mirror.apply(chat_id=-1, message_id=1, reactions=reactions)
+        assert reaction_mirror.emoticons(chat_id=-1, message_id=1) == ("🔥", "👍")
+        assert reaction_mirror.states[(-1, 1)].chosen == ("🔥",)
+
+        # min updates keep the chosen reactions
+        reactions.min = True
+        reactions.results = reactions.results[1:]
+        reaction_mirror.apply(chat_id=-1, message_id=1, reactions=reactions)
+        assert reaction_mirror.states[(-1, 1)].chosen == ("🔥",)
+        return None
+
+    @staticmethod
+    def test_forget() -> None:
+        reaction_mirror: ReactionMirror = ReactionMirror(maxsize=1)
+        reaction_mirror.track(
+            chat_id=-1, message_id=1, reactions=[Reaction(emoji="👍", count=1)]
+        )
+        reaction_mirror.forget(chat_id=-1, message_id=1)
+        reaction_mirror.forget(chat_id=-1, message_id=1)
+        assert len(reaction_mirror) == 0
+        return None
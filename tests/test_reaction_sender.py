@@ -0,0 +1,107 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.metrics import Metrics
+from src.reaction_sender import ReactionJob, ReactionSender
+
+
+def create_job(chat_id: int, message_id: int) -> ReactionJob:
+    return ReactionJob(
+        method_name="respond",
+        chat_id=chat_id,
+        message=Mock(id=message_id),
+        peer=Mock(),
+        emoticons=["👍"],
+        emojis=[],
+        created_at=time.monotonic(),
+    )
+
+
+class TestReactionSender:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_per_chat_order() -> None:
+        metrics: Metrics = Metrics()
+        sender: ReactionSender = ReactionSender(
+            concurrency=2, queue_size=10, metrics=metrics
+        )
+        handled: list[tuple[int, int]] = []
+
+        async def handler(job: ReactionJob) -> None:
+            await asyncio.sleep(0.001 * job.message.id)
+            handled.append((job.chat_id, job.message.id))
+            return None
+
+        sender.start(handler=handler)
+        assert sender.is_running
+        for message_id in (3, 2, 1):
+            for chat_id in (1, 2):
+                assert sender.submit(job=create_job(chat_id, message_id))
+        await sender.stop()
+
+        assert not sender.is_running
+        assert sender.processed == 6
+        assert sender.depth == 0
+        assert sender.latency_avg > 0
+        assert metrics.histograms["reaction_sender_latency_seconds"][""].count == 6
+        for chat_id in (1, 2):
+            assert [
+                message_id
+                for handled_chat_id, message_id in handled
+                if handled_chat_id == chat_id
+            ] == [3, 2, 1]
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_not_running() -> None:
+        sender: ReactionSender = ReactionSender(concurrency=0, queue_size=10)
+        sender.start(handler=Mock())
+        assert not sender.is_running
+        assert not sender.submit(job=create_job(1, 1))
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_queue_full() -> None:
+        sender: ReactionSender = ReactionSender(concurrency=1, queue_size=1)
+        blocker: asyncio.Event = asyncio.Event()
+
+        async def handler(job: ReactionJob) -> None:
+            await blocker.wait()
+            return None
+
+        sender.start(handler=handler)
+        traces: list[Mock] = [Mock() for _ in range(3)]
+        for message_id, trace in enumerate(traces):
+            sender.submit(job=create_job(1, message_id)._replace(trace=trace))
+            await asyncio.sleep(0)
+        assert sender.depth == 1
+        assert sender.dropped == 1
+        # the dropped job finishes its handed off trace
+        traces[2].finish.assert_called_once_with(outcome="dropped")
+        traces[1].finish.assert_not_called()
+        blocker.set()
+        await sender.stop()
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_handler_failure() -> None:
+        sender: ReactionSender = ReactionSender(concurrency=1, queue_size=10)
+        handler: Mock = Mock(side_effect=[ValueError, None])
+
+        async def failing_handler(job: ReactionJob) -> None:
+            handler(job)
+            return None
+
+        sender.start(handler=failing_handler)
+        sender.submit(job=create_job(1, 1))
+        sender.submit(job=create_job(1, 2))
+        await sender.stop()
+        assert handler.call_count == 2
+        assert sender.processed == 2
+        return None
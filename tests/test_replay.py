@@ -0,0 +1,61 @@
+import argparse
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from pyrogram.errors import FloodWait
+
+import src.constants
+from benchmarks.replay import Recording, parse_args, replay
+from benchmarks.stub_client import make_chat, make_message
+from src.stream_recorder import StreamRecorder
+
+
+async def record_stream(path: Path) -> None:
+    """
+    Records a target message answered after a FloodWait on its reaction
+    """
+    recorder: StreamRecorder = StreamRecorder(
+        path=str(path),
+        targets={777: ("Target", src.constants.FriendshipStatus.ENEMY)},
+    )
+    recorder.record_message(
+        message=make_message(chat_id=-100123, message_id=10, sender_id=777)
+    )
+    await recorder.call(
+        method="GetChat",
+        chat_id=-100123,
+        func=AsyncMock(return_value=make_chat(chat_id=-100123, emoticons=["🤡"])),
+    )
+    with pytest.raises(FloodWait):
+        await recorder.call(
+            method="SendReaction",
+            chat_id=-100123,
+            func=AsyncMock(side_effect=FloodWait(value=1)),
+        )
+    await recorder.flush()
+    return None
+
+
+class TestReplay:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_round_trip(tmp_path: Path) -> None:
+        path: Path = tmp_path / "stream.jsonl"
+        await record_stream(path=path)
+
+        recording: Recording = Recording.load(path=path)
+        assert [message["chat"] for message in recording.messages] == [-1]
+        assert recording.statuses == {1: src.constants.FriendshipStatus.ENEMY}
+        assert recording.chat_emoticons == {-1: ["🤡"]}
+        assert list(recording.responses) == ["GetChat", "SendReaction"]
+
+        args: argparse.Namespace = parse_args([str(path), "--speed", "100"])
+        result: dict = await replay(recording=recording, args=args)
+
+        assert result["messages"] == 1
+        assert result["outcomes"]["SendReaction:FloodWait"] == 1
+        # the reaction parked by FloodWait is resumed before shutdown
+        assert result["deferred_queue"] == {"parked": 1, "resumed": 1, "dropped": 0}
+        assert result["requests"]["SendReaction"] == 2
+        return None
@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from pyrogram.errors import FloodWait
+
+from benchmarks.fake_backend import Fault
+from benchmarks.run import Scenario, latency_stats, main, measure_sync, run_scenario
+
+
+def make_scenario(**kwargs) -> Scenario:
+    scenario_kwargs: dict = {
+        "chats": 2,
+        "targets": 2,
+        "msg_queue_size": 10,
+        "hit_ratio": 0.5,
+        "messages": 20,
+        "target_ratio": 1.0,
+        "latency": 0.0,
+        "seed": 0,
+    }
+    scenario_kwargs.update(kwargs)
+    return Scenario(**scenario_kwargs)
+
+
+class TestLatencyStats:
+    @staticmethod
+    def test() -> None:
+        assert latency_stats([0.001 * i for i in range(1, 101)], elapsed=2.0) == {
+            "ops": 100,
+            "ops_per_s": 50.0,
+            "p50_us": 50500.0,
+            "p90_us": 90100.0,
+            "p99_us": 99010.0,
+            "max_us": 100000.0,
+        }
+        return None
+
+    @staticmethod
+    def test_too_few() -> None:
+        assert latency_stats([0.001], elapsed=1.0) == {"ops": 1, "ops_per_s": 0.0}
+        return None
+
+
+class TestMeasureSync:
+    @staticmethod
+    def test() -> None:
+        func: Mock = Mock()
+        assert measure_sync(func, repeat=5)["ops"] == 5
+        assert func.call_count == 5
+        return None
+
+
+class TestScenario:
+    @staticmethod
+    def test_to_dict() -> None:
+        scenario: Scenario = make_scenario(
+            faults=[Fault(method="SendReaction", error=FloodWait, rate=0.1, value=5)]
+        )
+        assert scenario.to_dict()["faults"] == [
+            {"method": "SendReaction", "error": "FloodWait", "rate": 0.1}
+        ]
+        return None
+
+
+class TestRunScenario:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test() -> None:
+        result: dict = await run_scenario(scenario=make_scenario())
+
+        assert result["scenario"]["chats"] == 2
+        assert result["respond"]["ops"] == 20
+        assert result["update"]["ops"] == 20
+        # every message is responded to, updates send more
+        assert result["requests"]["SendReaction"] > 20
+        # half of the messages miss the chat caches
+        assert 0 < result["cache_hit_rate"]["chat_info_map"] < 1
+        assert result["respond_allocations"]["peak_kib"] > 0
+        assert result["get_response_emoticons"]["ops"] == 1000
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_faults() -> None:
+        result: dict = await run_scenario(
+            scenario=make_scenario(
+                hit_ratio=1.0,
+                faults=[
+                    Fault(method="SendReaction", error=FloodWait, rate=1, value=60)
+                ],
+            )
+        )
+
+        # the first FloodWait blocks the method, the client stops sending
+        assert result["errors"]["SendReaction:FloodWait"] >= 1
+        assert result["requests"]["SendReaction"] < 20
+        return None
+
+
+class TestMain:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        # main removes the log sinks of the whole process
+        monkeypatch.setattr("benchmarks.run.logger", Mock())
+        output: Path = tmp_path / "bench.json"
+
+        assert (
+            await main(
+                [
+                    "--chats",
+                    "1",
+                    "--targets",
+                    "1",
+                    "2",
+                    "--msg-queue-sizes",
+                    "10",
+                    "--hit-ratios",
+                    "1",
+                    "--messages",
+                    "10",
+                    "--floodwait-rate",
+                    "0.1",
+                    "--output",
+                    str(output),
+                ]
+            )
+            == output
+        )
+        report: dict = json.loads(output.read_text())
+        assert report["meta"]["args"]["messages"] == "10"
+        assert [result["scenario"]["targets"] for result in report["results"]] == [
+            1,
+            2,
+        ]
+        assert report["results"][0]["scenario"]["faults"] == [
+            {"method": "SendReaction", "error": "FloodWait", "rate": 0.1}
+        ]
+        return None
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_coalesced() -> None:
+        single_flight: SingleFlight = SingleFlight()
+        calls: list[int] = []
+
+        async def func() -> int:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(
+            *(single_flight.run(key="key", func=func) for _ in range(5))
+        )
+        assert results == [42] * 5
+        assert len(calls) == 1
+        assert single_flight.coalesced == 4
+        assert "key" not in single_flight
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_different_keys() -> None:
+        single_flight: SingleFlight = SingleFlight()
+
+        async def func() -> None:
+            await asyncio.sleep(0.01)
+            return None
+
+        await asyncio.gather(
+            single_flight.run(key=1, func=func), single_flight.run(key=2, func=func)
+        )
+        assert single_flight.coalesced == 0
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_exception() -> None:
+        single_flight: SingleFlight = SingleFlight()
+
+        async def func() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError
+
+        results = await asyncio.gather(
+            single_flight.run(key="key", func=func),
+            single_flight.run(key="key", func=func),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "key" not in single_flight
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelled_caller() -> None:
+        single_flight: SingleFlight = SingleFlight()
+
+        async def func() -> int:
+            await asyncio.sleep(0.01)
+            return 42
+
+        first: asyncio.Task = asyncio.create_task(
+            single_flight.run(key="key", func=func)
+        )
+        second: asyncio.Task = asyncio.create_task(
+            single_flight.run(key="key", func=func)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 42
+        return None
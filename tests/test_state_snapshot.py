@@ -0,0 +1,172 @@
+import base64
+import gzip
+import json
+import time
+from pathlib import Path
+
+import pytest
+from pyrogram.enums import ChatType
+from pyrogram.raw.types import GeoPoint, InputPeerChannel
+from pyrogram.types import (
+    Chat,
+    ChatReactions,
+    Message,
+    MessageReactions,
+    Reaction,
+    User,
+)
+
+from src.custom_client import CustomClient
+from src.state_snapshot import SNAPSHOT_VERSION, StateSnapshot
+from tests.fixtures.custom_client import MockUserSettings
+
+
+@pytest.fixture
+def snapshot_client(test_custom_client: CustomClient, tmp_path: Path) -> CustomClient:
+    test_custom_client.workdir = tmp_path
+    return test_custom_client
+
+
+def write_state(custom_client: CustomClient, **state) -> None:
+    with gzip.open(StateSnapshot.path(custom_client), mode="wt") as file:
+        json.dump(state, file)
+    return None
+
+
+class TestStateSnapshot:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_save_load(
+        snapshot_client: CustomClient, user_settings: MockUserSettings
+    ) -> None:
+        chat: Chat = Chat(
+            id=-100123,
+            type=ChatType.SUPERGROUP,
+            title="Test Chat",
+            available_reactions=ChatReactions(
+                reactions=[Reaction(emoji="👍"), Reaction(emoji="🤡")]
+            ),
+        )
+        peer: InputPeerChannel = InputPeerChannel(channel_id=123, access_hash=-77)
+        message: Message = Message(
+            id=5,
+            chat=chat,
+            from_user=User(id=123456789, first_name="Alice"),
+            reactions=MessageReactions(  # type: ignore
+                reactions=[
+                    Reaction(emoji="🤡", count=2, chosen_order=0),
+                    Reaction(emoji="👍", count=1),
+                ]
+            ),
+        )
+        snapshot_client.chat_info_map[chat.id] = chat
+        snapshot_client.chat_peer_map[chat.id] = peer
+        snapshot_client.msg_store.add(
+            key=(chat.id, 5), sender_id=123456789, message=message
+        )
+        snapshot_client.msg_store.add(key=(chat.id, 6), sender_id=234567890)
+
+        await StateSnapshot.save(custom_client=snapshot_client)
+        assert StateSnapshot.path(snapshot_client).exists()
+
+        restored_client: CustomClient = CustomClient(
+            name=snapshot_client.name, user_settings=user_settings  # type: ignore
+        )
+        restored_client.workdir = snapshot_client.workdir
+        assert StateSnapshot.load(custom_client=restored_client)
+
+        restored_chat: Chat = restored_client.chat_info_map[chat.id]
+        assert restored_chat.title == "Test Chat"
+        assert restored_chat.type == ChatType.SUPERGROUP
+        assert [
+            reaction.emoji
+            for reaction in restored_chat.available_reactions.reactions  # type: ignore
+        ] == ["👍", "🤡"]
+        assert restored_client.chat_peer_map[chat.id] == peer
+        assert list(restored_client.msg_store.senders()) == [
+            ((chat.id, 5), 123456789),
+            ((chat.id, 6), 234567890),
+        ]
+        assert restored_client.msg_store.eligible == 2
+        restored_message: Message = restored_client.msg_store.get(  # type: ignore
+            key=(chat.id, 5)
+        )
+        assert restored_message.from_user.id == 123456789
+        assert [
+            (reaction.emoji, reaction.count, reaction.chosen_order)
+            for reaction in restored_message.reactions.reactions  # type: ignore
+        ] == [("🤡", 2, 0), ("👍", 1, None)]
+        assert restored_client.msg_store.get(key=(chat.id, 6)) is None
+        return None
+
+    @staticmethod
+    def test_no_snapshot(snapshot_client: CustomClient) -> None:
+        assert not StateSnapshot.load(custom_client=snapshot_client)
+        return None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "state",
+        [
+            # outdated version
+            {"version": SNAPSHOT_VERSION + 1, "saved_at": time.time()},
+            # another account
+            {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "user_id": 1},
+            # stale snapshot
+            {"version": SNAPSHOT_VERSION, "saved_at": 0},
+        ],
+    )
+    def test_unusable(snapshot_client: CustomClient, state: dict) -> None:
+        snapshot_client.me = User(id=2)
+        write_state(snapshot_client, msg_queue=[[1, 1, 0]], **state)
+        assert not StateSnapshot.load(custom_client=snapshot_client)
+        assert not snapshot_client.msg_store
+        return None
+
+    @staticmethod
+    def test_corrupted(snapshot_client: CustomClient) -> None:
+        StateSnapshot.path(snapshot_client).write_text("not a snapshot")
+        assert not StateSnapshot.load(custom_client=snapshot_client)
+        return None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "entries",
+        [
+            # a message without an id
+            {"messages": [{"chat_id": -100123, "reactions": None}]},
+            # a message queue entry without a sender
+            {"msg_queue": [[-100123, 1, 123456789], [-100123, 5]]},
+            # a peer that is not base64
+            {"peers": {"-100123": "not a peer"}},
+            # a peer cut short
+            {
+                "peers": {
+                    "-100123": base64.b64encode(
+                        InputPeerChannel(channel_id=100123, access_hash=5).write()[:6]
+                    ).decode()
+                }
+            },
+            # a blob cut inside a double
+            {
+                "peers": {
+                    "-100123": base64.b64encode(
+                        GeoPoint(long=1.0, lat=2.0, access_hash=0).write()[:8]
+                    ).decode()
+                }
+            },
+        ],
+    )
+    def test_malformed(snapshot_client: CustomClient, entries: dict) -> None:
+        state: dict = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "chats": [{"id": -100123, "type": "supergroup", "title": "Test Chat"}],
+            "msg_queue": [[-100123, 1, 123456789]],
+        }
+        write_state(snapshot_client, **(state | entries))
+        assert not StateSnapshot.load(custom_client=snapshot_client)
+        # nothing is half restored, the client starts cold
+        assert not snapshot_client.chat_info_map
+        assert not snapshot_client.msg_store
+        return None
@@ -0,0 +1,56 @@
+from unittest.mock import Mock
+
+from src.stats_cache import StatsLRUCache, StatsTTLCache
+
+
+class TestStatsTTLCache:
+    @staticmethod
+    def test_hits_misses() -> None:
+        cache: StatsTTLCache = StatsTTLCache(maxsize=2, ttl=60)
+        assert cache.hit_rate == 0.0
+        cache[1] = "one"
+        assert cache.get(1) == "one"
+        assert cache.get(2) is None
+        assert cache.get(2, "default") == "default"
+        assert cache.hits == 1
+        assert cache.misses == 2
+        assert cache.hit_rate == 1 / 3
+        return None
+
+    @staticmethod
+    def test_evictions() -> None:
+        cache: StatsTTLCache = StatsTTLCache(maxsize=2, ttl=60)
+        for key in range(5):
+            cache.setdefault(key, str(key))
+        assert len(cache) == 2
+        assert cache.evictions == 3
+        assert 4 in cache
+        return None
+
+    @staticmethod
+    def test_expirations() -> None:
+        timer: Mock = Mock(return_value=0)
+        cache: StatsTTLCache = StatsTTLCache(maxsize=2, ttl=60, timer=timer)
+        cache[1] = "one"
+        timer.return_value = 61
+        assert cache.get(1) is None
+        cache.expire()
+        assert cache.expirations == 1
+        assert cache.misses == 1
+        assert len(cache) == 0
+        return None
+
+
+class TestStatsLRUCache:
+    @staticmethod
+    def test_stats() -> None:
+        cache: StatsLRUCache = StatsLRUCache(maxsize=1)
+        cache.setdefault(key=(1, 1), default="one")
+        cache.setdefault(key=(1, 2), default="two")
+        assert cache.get((1, 2)) == "two"
+        assert cache.get((1, 1), None) is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.evictions == 1
+        assert cache.hit_rate == 0.5
+        return None
@@ -0,0 +1,150 @@
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+from pyrogram.enums import ChatType
+from pyrogram.errors import FloodWait
+from pyrogram.types import Chat, ChatReactions, Reaction
+
+import src.constants
+from src.stream_recorder import StreamRecorder
+
+TARGETS: dict = {
+    7: ("Seven", src.constants.FriendshipStatus.FRIEND),
+    8: ("Eight", src.constants.FriendshipStatus.ENEMY),
+}
+
+
+def read_records(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestStreamRecorder:
+    @staticmethod
+    def test_pseudonyms() -> None:
+        recorder: StreamRecorder = StreamRecorder(path=None, targets=TARGETS)
+        assert recorder.chat(-100123) == -1
+        assert recorder.chat(-100456) == -2
+        assert recorder.chat(-100123) == -1
+        assert recorder.chat(42) == 3
+        assert recorder.user(42) == 1
+        assert recorder.message(-100123, 10) == 1
+        assert recorder.message(-100456, 10) == 2
+        assert recorder.message(-100123, 10) == 1
+        return None
+
+    @staticmethod
+    def test_message_pseudonyms_bounded() -> None:
+        recorder: StreamRecorder = StreamRecorder(
+            path=None, targets=TARGETS, message_cache_size=2
+        )
+        assert [recorder.message(-1, message_id) for message_id in (1, 2, 1, 3)] == [
+            1,
+            2,
+            1,
+            3,
+        ]
+        assert len(recorder._message_ids) == 2
+        # an evicted message gets a new pseudonym, it never reuses an old one
+        assert recorder.message(-1, 2) == 4
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_disabled() -> None:
+        recorder: StreamRecorder = StreamRecorder(path=None, targets=TARGETS)
+        func: AsyncMock = AsyncMock(return_value="result")
+
+        assert not recorder.is_enabled
+        recorder.record_message(message=MagicMock())
+        assert await recorder.call(method="GetChat", chat_id=-1, func=func) == "result"
+        await recorder.flush()
+        func.assert_awaited_once_with()
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_record_message(tmp_path: Path) -> None:
+        path: Path = tmp_path / "stream.jsonl"
+        timer: Mock = Mock(return_value=10.0)
+        recorder: StreamRecorder = StreamRecorder(
+            path=str(path), targets=TARGETS, timer=timer
+        )
+        message: MagicMock = MagicMock()
+        message.chat.id = -100123
+        message.from_user.id = 8
+        message.id = 55
+        message.reactions.reactions = [Reaction(emoji="🤡", count=1)]
+
+        timer.return_value = 11.5
+        recorder.record_message(message=message)
+        await recorder.flush()
+
+        header, record = read_records(path)
+        assert header["type"] == "header"
+        assert record == {
+            "type": "message",
+            "t": 1.5,
+            "chat": -1,
+            "sender": 1,
+            "status": "Enemy",
+            "message": 1,
+            "reactions": ["🤡"],
+        }
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_call(tmp_path: Path) -> None:
+        path: Path = tmp_path / "stream.jsonl"
+        recorder: StreamRecorder = StreamRecorder(path=str(path), targets=TARGETS)
+        chat: Chat = Chat(
+            id=-100123,
+            type=ChatType.SUPERGROUP,
+            available_reactions=ChatReactions(
+                reactions=[Reaction(emoji="👍"), Reaction(emoji="🔥")]
+            ),
+        )
+
+        assert (
+            await recorder.call(
+                method="GetChat", chat_id=-100123, func=AsyncMock(return_value=chat)
+            )
+            is chat
+        )
+        with pytest.raises(FloodWait):
+            await recorder.call(
+                method="SendReaction",
+                chat_id=-100123,
+                func=AsyncMock(side_effect=FloodWait(value=30)),
+            )
+        await recorder.flush()
+
+        _, get_chat, send_reaction = read_records(path)
+        assert get_chat["method"] == "GetChat"
+        assert get_chat["chat"] == -1
+        assert get_chat["outcome"] == "ok"
+        assert get_chat["reactions"] == ["👍", "🔥"]
+        assert send_reaction["outcome"] == "FloodWait"
+        assert send_reaction["value"] == 30
+        assert "latency" in send_reaction
+        return None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "available_reactions, expected",
+        [
+            (None, None),
+            (ChatReactions(all_are_enabled=True), "all"),
+            (ChatReactions(reactions=[Reaction(emoji="👍")]), ["👍"]),
+        ],
+    )
+    def test_chat_emoticons(
+        available_reactions: ChatReactions | None, expected: object
+    ) -> None:
+        chat: Chat = Chat(
+            id=-1, type=ChatType.SUPERGROUP, available_reactions=available_reactions
+        )
+        assert StreamRecorder._chat_emoticons(chat=chat) == expected
+        return None
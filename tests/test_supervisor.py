@@ -0,0 +1,129 @@
+import asyncio
+import io
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from src.metrics_server import MetricsServer
+from src.supervisor import Supervisor, merge_metrics
+
+
+def make_supervisor(code: str, **kwargs) -> Supervisor:
+    return Supervisor(
+        accounts=["alice"],
+        command=(sys.executable, "-c", code),
+        output=io.StringIO(),
+        **kwargs,
+    )
+
+
+async def wait_for(condition, timeout: float = 10) -> None:
+    async def poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=timeout)
+    return None
+
+
+class TestMergeMetrics:
+    @staticmethod
+    def test() -> None:
+        lines: list[str] = merge_metrics(
+            texts={
+                "alice": "# HELP clownizer_floodwait_total FloodWait errors received\n"
+                "# TYPE clownizer_floodwait_total counter\n"
+                'clownizer_floodwait_total{method="GetMessages"} 2.0\n'
+                "# TYPE clownizer_handler_seconds histogram\n"
+                'clownizer_handler_seconds_bucket{le="+Inf"} 1\n'
+                "clownizer_handler_seconds_count 1\n",
+                "bob": "# HELP clownizer_floodwait_total FloodWait errors received\n"
+                "# TYPE clownizer_floodwait_total counter\n"
+                "clownizer_floodwait_total 1.0\n",
+                "carol": "",
+            }
+        )
+        assert lines == [
+            "# HELP clownizer_floodwait_total FloodWait errors received",
+            "# TYPE clownizer_floodwait_total counter",
+            'clownizer_floodwait_total{account="alice",method="GetMessages"} 2.0',
+            'clownizer_floodwait_total{account="bob"} 1.0',
+            "# TYPE clownizer_handler_seconds histogram",
+            'clownizer_handler_seconds_bucket{account="alice",le="+Inf"} 1',
+            'clownizer_handler_seconds_count{account="alice"} 1',
+        ]
+        return None
+
+
+class TestSupervisor:
+    @staticmethod
+    def test_workers() -> None:
+        supervisor: Supervisor = Supervisor(
+            accounts=["alice", "bob"], metrics_port=9100
+        )
+        assert supervisor.workers["alice"].metrics_port == 9101
+        assert supervisor.workers["bob"].metrics_port == 9102
+
+        env: dict[str, str] = supervisor._env(worker=supervisor.workers["bob"])
+        assert env["WORKER_ACCOUNT"] == "bob"
+        assert env["WORKER_METRICS_PORT"] == "9102"
+        assert env["LOG_DIR"].endswith("bob")
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_restart() -> None:
+        supervisor: Supervisor = make_supervisor(
+            code="print('crashed'); raise SystemExit(3)",
+            backoff_min=0.01,
+            backoff_max=0.04,
+        )
+        task: asyncio.Task = asyncio.create_task(supervisor.run())
+        await wait_for(lambda: supervisor.workers["alice"].restarts >= 3)
+        supervisor.stop()
+        await task
+
+        # the delay doubles up to the maximum
+        assert supervisor.workers["alice"].backoff == 0.04
+        assert "alice|crashed\n" in supervisor.output.getvalue()  # type: ignore
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stop() -> None:
+        supervisor: Supervisor = make_supervisor(code="import time; time.sleep(30)")
+        task: asyncio.Task = asyncio.create_task(supervisor.run())
+        await wait_for(lambda: supervisor.workers["alice"].is_running)
+        supervisor.stop()
+        await asyncio.wait_for(task, timeout=10)
+
+        assert not supervisor.workers["alice"].is_running
+        assert supervisor.workers["alice"].restarts == 0
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_render() -> None:
+        server: asyncio.Server | None = await MetricsServer.serve(
+            host="127.0.0.1",
+            port=0,
+            render=lambda: "# TYPE clownizer_floodwait_total counter\n"
+            "clownizer_floodwait_total 1.0\n",
+        )
+        assert server is not None
+        supervisor: Supervisor = Supervisor(accounts=["alice", "bob"])
+        supervisor.workers["alice"].metrics_port = server.sockets[0].getsockname()[1]
+        supervisor.workers["alice"].process = Mock(returncode=None)
+
+        try:
+            text: str = await supervisor.render()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        assert 'clownizer_floodwait_total{account="alice"} 1.0' in text
+        assert 'clownizer_worker_up{account="alice"} 1' in text
+        assert 'clownizer_worker_up{account="bob"} 0' in text
+        assert 'clownizer_worker_restarts_total{account="bob"} 0' in text
+        return None
@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.tracer import NULL_TRACE, Trace, Tracer
+
+
+class TestTrace:
+    @staticmethod
+    def test_stages() -> None:
+        timer: Mock = Mock(return_value=10.0)
+        tracer: Mock = Mock()
+        trace: Trace = Trace(tracer=tracer, name="respond", timer=timer)
+
+        timer.return_value = 10.5
+        trace.mark("validate")
+        with trace.span("send"):
+            timer.return_value = 12.0
+        trace.set(chat_id=1)
+
+        trace.finish(outcome="sent")
+        trace.finish(outcome="ignored")
+        tracer.export.assert_called_once_with(trace=trace)
+
+        assert trace.to_dict() == {
+            "trace_id": trace.trace_id,
+            "name": "respond",
+            "time": trace.wall_time,
+            "duration": 2.0,
+            "spans": [["validate", 0.0, 0.5], ["send", 0.5, 1.5]],
+            "outcome": "sent",
+            "chat_id": 1,
+        }
+        return None
+
+    @staticmethod
+    def test_default_outcome() -> None:
+        trace: Trace = Trace(tracer=None, name="update")
+        assert trace.to_dict()["outcome"] == "skipped"
+        return None
+
+    @staticmethod
+    def test_null_trace() -> None:
+        with NULL_TRACE.span("send"):
+            NULL_TRACE.mark("validate")
+        NULL_TRACE.set(chat_id=1)
+        NULL_TRACE.hand_off()
+        NULL_TRACE.finish(outcome="sent")
+        assert not NULL_TRACE.spans
+        assert not NULL_TRACE.attrs
+        assert not NULL_TRACE.is_handed_off
+        return None
+
+
+class TestTracer:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "sample_rate, random_value, is_sampled",
+        [(0, 0.0, False), (0.1, 0.5, False), (0.1, 0.05, True), (1, 0.99, True)],
+    )
+    def test_start(
+        sample_rate: float, random_value: float, is_sampled: bool, tmp_path: Path
+    ) -> None:
+        tracer: Tracer = Tracer(
+            sample_rate=sample_rate, path=str(tmp_path / "traces.jsonl")
+        )
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr("src.tracer.random.random", lambda: random_value)
+            trace: Trace = tracer.start(name="respond", chat_id=1)
+
+        assert (trace is not NULL_TRACE) is is_sampled
+        if is_sampled:
+            assert trace.attrs == {"chat_id": 1}
+        return None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_export(tmp_path: Path) -> None:
+        path: Path = tmp_path / "traces.jsonl"
+        tracer: Tracer = Tracer(sample_rate=1, path=str(path), batch_size=2)
+
+        for name in ("respond", "update", "respond"):
+            tracer.start(name=name).finish()
+        # the first two traces are written as a batch in the background
+        await tracer.flush()
+
+        lines: list[str] = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["name"] for line in lines] == [
+            "respond",
+            "update",
+            "respond",
+        ]
+        assert tracer.exported == 3
+        return None
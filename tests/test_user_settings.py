@@ -6,7 +6,9 @@ from pydantic import ValidationError
 
 from src.user_settings import UserSettings
 
-required_fields: list[str] = list(UserSettings.model_fields.keys())
+required_fields: list[str] = [
+    name for name, field in UserSettings.model_fields.items() if field.is_required()
+]
 
 
 class TestUserSettings:
@@ -38,6 +40,44 @@ class TestUserSettings:
             UserSettings.from_config(str(config_file))
         return None
 
+    @staticmethod
+    def test_accounts_from_config(valid_config_content: str, tmp_path: Path) -> None:
+        config_file: Path = tmp_path / "config.yaml"
+        config_file.write_text(valid_config_content)
+
+        accounts: dict[str, UserSettings] = UserSettings.accounts_from_config(
+            str(config_file)
+        )
+        assert list(accounts) == ["my_app"]
+
+        config_file.write_text(valid_config_content + """
+accounts:
+  alice:
+  bob:
+    api_id: 654321
+    update_timeout: 10
+""")
+        accounts = UserSettings.accounts_from_config(str(config_file))
+        assert list(accounts) == ["alice", "bob"]
+        assert accounts["alice"].api_id == 123456
+        assert accounts["bob"].api_id == 654321
+        assert accounts["bob"].update_timeout == 10
+        assert accounts["bob"].targets == accounts["alice"].targets
+        return None
+
+    @staticmethod
+    def test_accounts_from_config_invalid(
+        valid_config_content: str, tmp_path: Path
+    ) -> None:
+        config_file: Path = tmp_path / "config.yaml"
+        config_file.write_text(
+            valid_config_content + "accounts:\n  bob:\n    update_timeout: 1\n"
+        )
+
+        with pytest.raises(ValidationError):
+            UserSettings.accounts_from_config(str(config_file))
+        return None
+
     @staticmethod
     def test_creation_valid(valid_config: dict) -> None:
         settings: UserSettings = UserSettings(**valid_config)  # type: ignore
@@ -68,6 +108,23 @@ class TestUserSettings:
             ({"msg_queue_size": 0}, ValidationError),
             ({"update_timeout": 1}, ValidationError),
             ({"update_jitter": -1}, ValidationError),
+            ({"chat_cache_size": 0}, ValidationError),
+            ({"chat_cache_ttl": 0}, ValidationError),
+            ({"snapshot_interval": -1}, ValidationError),
+            ({"snapshot_max_age": 0}, ValidationError),
+            ({"warmup_concurrency": -1}, ValidationError),
+            ({"sender_concurrency": -1}, ValidationError),
+            ({"sender_queue_size": 0}, ValidationError),
+            ({"rate_limit": 0}, ValidationError),
+            ({"rate_limit_per_chat": 0}, ValidationError),
+            ({"rate_limit_burst": 0}, ValidationError),
+            ({"deferred_queue_size": 0}, ValidationError),
+            ({"deferred_max_age": 0}, ValidationError),
+            ({"log_summary_interval": -1}, ValidationError),
+            ({"metrics_port": 0}, ValidationError),
+            ({"metrics_port": 65536}, ValidationError),
+            ({"trace_sample_rate": -0.1}, ValidationError),
+            ({"trace_sample_rate": 1.1}, ValidationError),
         ],
     )
     def test_invalid_cases(